@@ -0,0 +1,54 @@
+"""
+Benchmarks of graph operations on generated models, run from the root of the repository, e.g.
+    python -m benchmarks.hierarchy
+Settings are taken from .env.example, unless they are given in the environment.
+To compare with another revision, pass its checkout, expose is imported from there:
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.hierarchy --tree /tmp/before
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from decouple import RepositoryEnv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup(description: str) -> argparse.Namespace:
+    """
+    Parses arguments and prepares the environment, should be called before expose is imported
+    :param description: description of the benchmark
+    :return: arguments: tree, repeat
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--tree", default=ROOT, help="checkout of the repository with expose to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs, the best one is reported")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_FILE_NAME", os.path.join(tempfile.gettempdir(), "expose-benchmarks.log"))
+    for key, value in RepositoryEnv(os.path.join(ROOT, ".env.example")).data.items():
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, os.path.abspath(args.tree))
+    sys.setrecursionlimit(20000)  # recursive folds of the previous revisions
+    logging.getLogger("expose").disabled = True
+    return args
+
+
+def measure(prepare: Callable, run: Callable, repeat: int) -> float:
+    """
+    Returns the best time of run in ms, each run gets a new result of prepare
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        data = prepare()
+        gc.collect()  # garbage of the previous runs is not collected during this one
+        start = time.perf_counter()
+        run(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
@@ -0,0 +1,44 @@
+"""
+Abstraction of a large model: time of abstract_parthoods, abstract_aspects and of all of them
+together with abstract_hierarchies, most of it is spent on copying of the moved relations
+"""
+import copy
+
+from benchmarks import measure, setup
+from benchmarks.models import generate_model
+from tests.builder import add_diagrams
+
+args = setup(__doc__)
+from expose.project.jsongraph import JSONGraph  # noqa: E402
+from expose.project.relation import Generalization, Relation  # noqa: E402
+
+MODEL = add_diagrams(generate_model(seed=7, kinds=150, depth=4, relators=60, modes=40, parts=120), 4)
+
+
+def abstract_all(graph: JSONGraph):
+    graph.abstract_parthoods(False, True)
+    graph.abstract_hierarchies(False, True)
+    graph.abstract_aspects(False, True, True)
+
+
+OPERATIONS = {
+    "abstract_parthoods": lambda graph: graph.abstract_parthoods(False, True),
+    "abstract_aspects": lambda graph: graph.abstract_aspects(False, True, True),
+    "all abstractions": abstract_all,
+}
+
+
+def run(title: str):
+    print(title)
+    for name, operation in OPERATIONS.items():
+        time = measure(lambda: JSONGraph(copy.deepcopy(MODEL)), operation, args.repeat)
+        print(f"{name:>20}: {time:8.1f} ms")
+
+
+if __name__ == "__main__":
+    if hasattr(Relation, "clone"):
+        run("clone")
+        Relation.clone = Generalization.clone = copy.deepcopy
+        run("deepcopy instead of clone")
+    else:  # before clone was added
+        run("deepcopy")
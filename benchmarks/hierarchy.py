@@ -0,0 +1,47 @@
+"""
+Abstraction of hierarchies: time of abstract_hierarchies and the number of times
+generalizations are abstracted, compared with the number of generalizations in the model
+"""
+import copy
+
+from benchmarks import measure, setup
+from benchmarks.models import generate_chain, generate_model
+
+args = setup(__doc__)
+from expose.project import GENERAL_TYPE  # noqa: E402
+from expose.project.jsongraph import JSONGraph  # noqa: E402
+
+MODELS = {
+    "chain of 50": generate_chain(50),
+    "chain of 200": generate_chain(200),
+    "deep (12 levels)": generate_model(seed=3, kinds=40, depth=12, relators=10, modes=5, parts=10),
+    "wide (5 levels)": generate_model(seed=4, kinds=200, depth=5, relators=40, modes=20, parts=40),
+}
+
+
+def count_abstractions(model: dict) -> (int, int):
+    """
+    Returns the number of generalizations in the model and the number of their abstractions
+    """
+    graph = JSONGraph(copy.deepcopy(model))
+    generalizations = len(graph._relations[GENERAL_TYPE])
+    calls = [0]
+    name = "_abstract_generalization_steps" if hasattr(graph, "_abstract_generalization_steps") \
+        else "_abstract_generalization"  # before the explicit stack
+    abstract = getattr(graph, name)
+
+    def counted(*arguments, **kwargs):
+        calls[0] += 1
+        return abstract(*arguments, **kwargs)
+
+    setattr(graph, name, counted)
+    graph.abstract_hierarchies(False, True)
+    return generalizations, calls[0]
+
+
+if __name__ == "__main__":
+    for title, model in MODELS.items():
+        generalizations, abstractions = count_abstractions(model)
+        time = measure(lambda: JSONGraph(copy.deepcopy(model)), lambda graph: graph.abstract_hierarchies(False, True),
+                       args.repeat)
+        print(f"{title:>18}: {generalizations:4} generalizations, {abstractions:4} abstractions, {time:8.1f} ms")
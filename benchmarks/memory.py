@@ -0,0 +1,67 @@
+"""
+Memory of a parsed model: size of the graph measured by tracemalloc,
+and own sizes of Entities, Relations and Views with edge containers of Entities
+"""
+import copy
+import gc
+import sys
+import tracemalloc
+
+from benchmarks import setup
+from benchmarks.models import generate_model
+from tests.builder import add_diagrams
+
+args = setup(__doc__)
+from expose.project.jsongraph import JSONGraph  # noqa: E402
+
+MODEL = add_diagrams(generate_model(seed=99, kinds=200, depth=4, relators=80, modes=50, parts=120), 3)
+
+
+def get_own_size(element) -> int:
+    """
+    Returns the size of the object with its __dict__, if there is any
+    """
+    return sys.getsizeof(element) + (sys.getsizeof(element.__dict__) if hasattr(element, "__dict__") else 0)
+
+
+def get_edges_size(entity, shared: set) -> int:
+    """
+    Returns the size of dicts of incoming and outgoing edges of the Entity, shared empty ones are not counted
+    """
+    size = 0
+    for edges in (entity.in_edges, entity.out_edges):
+        if id(edges) not in shared:
+            size += sys.getsizeof(edges) + sum(sys.getsizeof(edge_set) for edge_set in edges.values()
+                                               if id(edge_set) not in shared)
+    return size
+
+
+if __name__ == "__main__":
+    data = copy.deepcopy(MODEL)
+    gc.collect()
+    tracemalloc.start()
+    graph = JSONGraph(data)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    views = [view for diagram in graph._diagrams.values() for view in diagram.elements.values()]
+    number = len(graph._entity_ids) + len(graph._relation_ids) + len(graph._generalization_set_ids) + len(views)
+    print(f"{len(graph._entity_ids)} entities, {len(graph._relation_ids)} relations, "
+          f"{len(graph._generalization_set_ids)} sets, {len(views)} views")
+    print(f"graph: {size / 1e6:.2f} MB, {size / number:.0f} B per element (including indexes)")
+
+    # empty containers shared by all Entities, if there are any
+    entities = list(graph._entity_ids.values())
+    counts = {}
+    for entity in entities:
+        for edges in (entity.in_edges, entity.out_edges):
+            counts[id(edges)] = counts.get(id(edges), 0) + 1
+            for edge_set in edges.values():
+                counts[id(edge_set)] = counts.get(id(edge_set), 0) + 1
+    shared = {key for key, count in counts.items() if count > 1}
+    for name, elements in (("Entity", entities), ("Relation", list(graph._relation_ids.values())), ("View", views)):
+        print(f"{name:>9}: {sum(map(get_own_size, elements)) / len(elements):6.0f} B", end="")
+        if name == "Entity":
+            print(f", edges {sum(get_edges_size(entity, shared) for entity in entities) / len(entities):.0f} B", end="")
+        print()
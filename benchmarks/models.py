@@ -0,0 +1,115 @@
+"""Generator of synthetic models in the json format, as exported from OntoUML."""
+import random
+
+from tests.builder import ModelBuilder
+
+
+def generate_model(seed: int = 0, kinds: int = 20, depth: int = 3, fanout: int = 2, relators: int = 8,
+                   modes: int = 6, parts: int = 15, cycles: bool = True) -> dict:
+    """
+    Generates a model with hierarchies of sortals under kinds, categories, relators, modes and parts
+    :param seed: seed of the generator
+    :param kinds: number of kinds, each of them is the root of a hierarchy
+    :param depth: maximal depth of hierarchies
+    :param fanout: maximal number of specific entities of each general one
+    :param relators: number of relators
+    :param modes: number of modes and qualities
+    :param parts: number of parts of the sortals
+    :param cycles: add cycles of parts
+    :return: model with one diagram
+    """
+    generator = random.Random(seed)
+    builder = ModelBuilder()
+    sortals = []
+    for number in range(kinds):
+        kind = builder.add_class(f"Kind{number}", generator.choice(["kind", "kind", "collective", "quantity"]))
+        sortals.append(kind)
+        level = [kind]
+        for _ in range(depth):
+            next_level = []
+            for general in level:
+                if generator.random() < 0.5:
+                    continue
+                generalizations = []
+                for _ in range(generator.randint(1, fanout)):
+                    stereotype = generator.choice(["subkind", "role", "phase"])
+                    specific = builder.add_class(f"{stereotype.title()}{len(sortals)}", stereotype)
+                    generalizations.append(builder.add_generalization(specific, general))
+                    next_level.append(specific)
+                    sortals.append(specific)
+                if (len(generalizations) > 1) and (generator.random() < 0.6):
+                    builder.add_generalization_set(generalizations, generator.random() < 0.7,
+                                                   generator.random() < 0.7)
+            level = next_level
+
+    categories = []
+    for number in range(max(1, kinds // 4)):
+        category = builder.add_class(f"Category{number}", generator.choice(["category", "mixin", "roleMixin"]))
+        categories.append(category)
+        for sortal in generator.sample(sortals, min(len(sortals), generator.randint(1, 3))):
+            builder.add_generalization(sortal, category)
+
+    relator_ids = []
+    for number in range(relators):
+        relator = builder.add_class(f"Relator{number}", "relator")
+        for target in generator.sample(sortals + categories, min(len(sortals) + len(categories),
+                                                                 generator.randint(1, 4))):
+            builder.add_relation(relator, target, "mediation", None, "1..*", "1")
+        if relator_ids and (generator.random() < 0.3):
+            builder.add_relation(relator, generator.choice(relator_ids), "mediation", None, "1", "0..*")
+        relator_ids.append(relator)
+    for number in range(modes):
+        mode = builder.add_class(f"Mode{number}", generator.choice(["mode", "quality"]), "intrinsic-mode")
+        builder.add_relation(mode, generator.choice(sortals), "characterization", None, "0..*", "1")
+        if generator.random() < 0.4:
+            builder.add_relation(mode, generator.choice(sortals), "externalDependence", f"depends{number}")
+    for _ in range(kinds):
+        source, target = generator.sample(sortals, 2)
+        builder.add_relation(source, target, "material", generator.choice(["works for", "owns", "has", None]),
+                             "0..*", "1..2")
+
+    for number in range(parts):
+        part = builder.add_class(f"Part{number}", generator.choice(["kind", "subkind"]))
+        builder.add_part(generator.choice(sortals), part, generator.choice(["componentOf", "subCollectionOf"]))
+        if generator.random() < 0.4:
+            subpart = builder.add_class(f"Subpart{number}")
+            builder.add_part(part, subpart)
+            if cycles and (generator.random() < 0.2):
+                builder.add_part(subpart, part)
+        if generator.random() < 0.3:
+            builder.add_relation(part, generator.choice(sortals), "material", f"uses{number}")
+    return builder.build()
+
+
+def generate_chain(length: int) -> dict:
+    """
+    Generates a chain of subkinds under one kind, each of them with a relation to the kind
+    :param length: number of subkinds
+    """
+    builder = ModelBuilder()
+    kind = general = builder.add_class("Kind")
+    for number in range(length):
+        specific = builder.add_class(f"Subkind{number}", "subkind")
+        builder.add_generalization(specific, general)
+        builder.add_relation(specific, kind, "material", "has")
+        general = specific
+    return builder.build()
+
+
+def nest_packages(model: dict, depth: int) -> dict:
+    """
+    Moves the contents of the model into a chain of nested packages, elements are spread evenly
+    :param model: model without packages
+    :param depth: number of packages
+    :return: the given model
+    """
+    elements = model["model"]["contents"]
+    size = max(1, len(elements) // depth)
+    contents = model["model"]["contents"] = []
+    for number in range(depth):
+        package = {"id": f"package{number}", "name": f"Package{number}", "description": None, "type": "Package",
+                   "propertyAssignments": None,
+                   "contents": elements[number * size:(number + 1) * size if number < depth - 1 else None]}
+        contents.append(package)
+        contents = package["contents"]
+    return model
@@ -0,0 +1,41 @@
+"""
+Parsing of a model whose elements are spread over a chain of nested packages:
+time of the walk over packages and of building JSONGraph for different depths of the chain
+"""
+import copy
+import pickle
+
+from benchmarks import measure, setup
+from benchmarks.models import generate_model, nest_packages
+
+args = setup(__doc__)
+from expose.project.element import Model  # noqa: E402
+from expose.project.jsongraph import JSONGraph  # noqa: E402
+
+MODEL = generate_model(seed=11, kinds=400, depth=6, relators=150, modes=60, parts=200)
+DEPTHS = [1, 50, 300, 900, 3000]
+REPEATED = 10  # the walk does not check ids, so the elements are repeated to get a larger tree
+
+
+def walk(project: dict):
+    """
+    Creates Models of all packages and goes through all elements, without creating them
+    """
+    model = Model(project["model"])
+    if hasattr(JSONGraph, "iter_elements"):
+        for _ in JSONGraph.iter_elements(model, project["model"]):
+            pass
+    else:  # before the single walk Model created nested Models itself
+        JSONGraph.get_all_elements(JSONGraph.__new__(JSONGraph), project["model"]["contents"])
+
+
+if __name__ == "__main__":
+    large = copy.deepcopy(MODEL)
+    large["model"]["contents"] *= REPEATED
+    print(f"{len(MODEL['model']['contents'])} elements, walk over {len(large['model']['contents'])}")
+    for depth in DEPTHS:
+        data = pickle.dumps(nest_packages(copy.deepcopy(MODEL), depth))
+        parse = measure(lambda: pickle.loads(data), JSONGraph, args.repeat)
+        nested = nest_packages(copy.deepcopy(large), depth)
+        walked = measure(lambda: nested, walk, args.repeat)
+        print(f"depth {depth:4}: walk {walked:7.1f} ms, parse {parse:7.1f} ms")
@@ -13,6 +13,36 @@ DEFINE_API_URL: Final[str] = config("DEFINE_API_URL")
 DEFINE_MAX_NUMBER: Final[int] = int(config("DEFINE_MAX_NUMBER"))
 EXPAND_MAX_NUMBER: Final[int] = int(config("EXPAND_MAX_NUMBER"))
 
+"""
+------------------------------------------------------------
+Constants for keeping graphs in memory between requests
+------------------------------------------------------------
+"""
+SESSION_MEMORY_LIMIT: Final[int] = int(config("SESSION_MEMORY_LIMIT")) * 1024 * 1024  # in MB
+SESSION_ELEMENT_SIZE: Final[int] = int(config("SESSION_ELEMENT_SIZE"))  # in bytes
+SESSION_TTL: Final[int] = int(config("SESSION_TTL"))  # in seconds
+TIMELINE_CHECKPOINT: Final[int] = int(config("TIMELINE_CHECKPOINT"))  # in steps
+TIMELINE_MAX_STEPS: Final[int] = int(config("TIMELINE_MAX_STEPS"))
+
+"""
+------------------------------------------------------------
+Constants for caching results of operations
+------------------------------------------------------------
+"""
+RESULT_CACHE_MEMORY_LIMIT: Final[int] = int(config("RESULT_CACHE_MEMORY_LIMIT")) * 1024 * 1024  # in MB
+RESULT_CACHE_DISK_LIMIT: Final[int] = int(config("RESULT_CACHE_DISK_LIMIT")) * 1024 * 1024  # in MB
+RESULT_CACHE_DIR: Final[str] = config("RESULT_CACHE_DIR")  # empty, if results are not kept on disk
+
+"""
+------------------------------------------------------------
+Constants for executing operations in workers
+------------------------------------------------------------
+"""
+WORKER_TYPE: Final[str] = config("WORKER_TYPE")  # "process" or "thread"
+WORKER_NUMBER: Final[int] = int(config("WORKER_NUMBER"))
+WORKER_QUEUE_SIZE: Final[int] = int(config("WORKER_QUEUE_SIZE"))
+WORKER_TIMEOUT: Final[int] = int(config("WORKER_TIMEOUT"))  # in seconds
+
 """
 ------------------------------------------------------------
 Constants for Expo configuration
@@ -56,6 +86,7 @@ KEEP_RELATORS: Final[bool] = config("KEEP_RELATORS") == "True"
 
 MIN_RELATORS_DEGREE: Final[int] = int(config("MIN_RELATORS_DEGREE"))
 ID_LENGTH: Final[int] = int(config("ID_LENGTH"))
+ID_MODE: Final[str] = config("ID_MODE")  # "random" or "deterministic"
 
 """
 ------------------------------------------------------------
@@ -83,6 +114,11 @@ ERR_RECURSION: Final[str] = "The recursion was detected. Please, check the follo
 ERR_NO_MODEL: Final[str] = "The model is not loaded. Please, load the model first."
 ERR_NO_INDEX: Final[str] = "The index file is not loaded. Please, make sure the repository is available."
 ERR_UNKNOWN_ABS: Final[str] = "The abstraction is not known. Please, check the documentation."
+ERR_UNKNOWN_OPERATION: Final[str] = "The operation is not known. Please, check the documentation: "
+ERR_NO_SESSION: Final[str] = "The session is not found or was expired. Please, load the model again."
+ERR_NO_TIMELINE: Final[str] = "The timeline is not built for the session. Please, build it first."
+ERR_QUEUE_FULL: Final[str] = "The server is busy. Please, try again later."
+ERR_TIMEOUT: Final[str] = "The operation took too long. Please, try a smaller model."
 
 # warnings
 WARN_FILE_AND_URL_PARAMS: Final[str] = "Both the file with data and the url are given. The url will be ignored."
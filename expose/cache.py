@@ -0,0 +1,144 @@
+"""This module keeps results of operations, so that the same request is not computed twice."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict
+
+from expose import LOG_NAME, RESULT_CACHE_MEMORY_LIMIT, RESULT_CACHE_DISK_LIMIT, RESULT_CACHE_DIR
+from expose.models import GraphModel
+
+
+class ResultCache:
+    def __init__(self, memory_limit: int = RESULT_CACHE_MEMORY_LIMIT, disk_limit: int = RESULT_CACHE_DISK_LIMIT,
+                 directory: str = RESULT_CACHE_DIR):
+        """
+        Creates LRU cache of results in the json format, results are kept in memory and optionally on disk.
+        Any cached result is a valid model, but new ids are not generated for the repeated request
+        :param memory_limit: memory budget for results in bytes, 0 to keep nothing in memory
+        :param disk_limit: disk budget for results in bytes
+        :param directory: directory for results on disk, empty to keep nothing on disk
+        """
+        self.logger = logging.getLogger(LOG_NAME)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()  # key -> result, least recent first
+        self._memory_limit = memory_limit
+        self._memory = 0
+        self._disk_limit = disk_limit
+        self._directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._pending: Dict[str, asyncio.Task] = {}  # key -> computation that is shared by identical requests
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return (self._memory_limit > 0) or bool(self._directory)
+
+    def get_stats(self) -> dict:
+        return {"hits": self._hits, "disk_hits": self._disk_hits, "misses": self._misses,
+                "entries": len(self._entries), "memory": self._memory}
+
+    @staticmethod
+    def get_key(operation: str, data: GraphModel) -> str:
+        """
+        Calculates the hash of the model and all parameters of the operation, order of keys does not matter
+        :param operation: name of the operation, e.g. 'apply_focus'
+        :param data: parameters of the operation with origin
+        :return: hex digest
+        """
+        content = {"operation": operation, "parameters": data.dict(exclude={"origin", "session_id"}),
+                   "origin": data.origin}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":"),
+                                         ensure_ascii=False).encode()).hexdigest()
+
+    @staticmethod
+    def serialize(result: dict) -> bytes:
+        """
+        Serializes the result in the same way as the JSONResponse,
+        should be called in the worker that computes the result, not in the event loop
+        :param result: result of the operation
+        :return: result in the json format
+        """
+        return json.dumps(result, ensure_ascii=False, allow_nan=False,
+                          indent=None, separators=(",", ":")).encode("utf-8")
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Returns the cached result, otherwise computes it. Identical concurrent requests wait for one computation
+        :param key: key of the request, see get_key()
+        :param compute: coroutine function that returns the serialized result, see serialize()
+        :return: result in the json format
+        """
+        result = self._entries.get(key)
+        if result is not None:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return result
+        if key in self._pending:
+            self._hits += 1
+        else:
+            # the task is not cancelled together with the request that started it
+            self._pending[key] = asyncio.ensure_future(self._compute(key, compute))
+        return await asyncio.shield(self._pending[key])
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        try:
+            result = await asyncio.to_thread(self._read, key) if self._directory else None
+            if result is not None:
+                self._disk_hits += 1
+            else:
+                self._misses += 1
+                result = await compute()
+                if self._directory and (len(result) <= self._disk_limit):
+                    await asyncio.to_thread(self._write, key, result)
+            self._put(key, result)
+            return result
+        finally:
+            del self._pending[key]
+
+    def _put(self, key: str, result: bytes):
+        """
+        Keeps the result in memory, evicts least recently used results if needed
+        """
+        if len(result) > self._memory_limit:
+            return
+        self._entries[key] = result
+        self._memory += len(result)
+        while self._memory > self._memory_limit:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory -= len(evicted)
+
+    def _read(self, key: str) -> bytes | None:
+        path = os.path.join(self._directory, key + ".json")
+        try:
+            with open(path, "rb") as file:
+                result = file.read()
+            os.utime(path)  # marks the result as recently used
+            return result
+        except OSError:
+            return None
+
+    def _write(self, key: str, result: bytes):
+        """
+        Keeps the result on disk, removes least recently used results if the disk budget is exceeded
+        """
+        try:
+            path = os.path.join(self._directory, key + ".json")
+            with open(path + ".tmp", "wb") as file:
+                file.write(result)
+            os.replace(path + ".tmp", path)  # other processes never read a partially written result
+
+            files = [entry for entry in os.scandir(self._directory) if entry.name.endswith(".json")]
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            size = sum(entry.stat().st_size for entry in files)
+            while files and (size > self._disk_limit):
+                entry = files.pop(0)
+                size -= entry.stat().st_size
+                os.remove(entry.path)
+        except OSError as e:
+            self.logger.error(f"Result {key} cannot be written to the cache: {e}")
@@ -0,0 +1,81 @@
+"""This module runs CPU-bound operations over graphs outside the event loop."""
+import asyncio
+import logging
+import threading
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from expose import LOG_NAME, WORKER_TYPE, WORKER_NUMBER, WORKER_QUEUE_SIZE, WORKER_TIMEOUT
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class GraphExecutor:
+    def __init__(self, worker_type: str = WORKER_TYPE, workers: int = WORKER_NUMBER,
+                 queue_size: int = WORKER_QUEUE_SIZE, timeout: int = WORKER_TIMEOUT):
+        """
+        Creates pools of workers with the bounded queue of tasks
+        :param worker_type: 'process' or 'thread', type of workers for stateless tasks
+        :param workers: number of workers in each pool
+        :param queue_size: number of tasks that could wait for a free worker
+        :param timeout: number of seconds after which the client gets an error
+        """
+        self.logger = logging.getLogger(LOG_NAME)
+        # tasks that need objects of this process (e.g. sessions) are always executed in threads
+        self._thread_pool = ThreadPoolExecutor(max_workers=workers)
+        self._process_pool = ProcessPoolExecutor(max_workers=workers) if worker_type == "process" else None
+        self._limit = 2 * workers + queue_size if self._process_pool else workers + queue_size
+        self._timeout = timeout
+        self._pending = 0  # number of submitted, but not yet finished tasks
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _done(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, pool: Executor, func: Callable, *args) -> Future:
+        """
+        Submits the task to the pool, if the queue is not full yet.
+        The task is counted as pending until it is finished, even if the client stopped waiting
+        """
+        with self._lock:
+            if self._pending >= self._limit:
+                raise QueueFullError
+            self._pending += 1
+        try:
+            future = pool.submit(func, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, func: Callable, *args, stateless: bool = True):
+        """
+        Executes func(*args) in a worker and waits for the result
+        Raises QueueFullError if there are too many pending tasks,
+        TimeoutError if the result was not received in time
+        :param func: function to execute, should be picklable if stateless
+        :param stateless: if True, the task could be executed in another process
+        :return: result of the function
+        """
+        pool = self._process_pool if (stateless and self._process_pool) else self._thread_pool
+        future = self._submit(pool, func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self._timeout)
+        except TimeoutError:
+            future.cancel()  # has effect only if the task was not started yet
+            self.logger.error(f"Task {func.__name__} was not finished in {self._timeout} seconds")
+            raise
+
+    def shutdown(self):
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,14 +1,16 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class BaseGraph(ABC):
 
     @abstractmethod
-    def to_expo(self, max_height: int, max_width: int) -> dict:
+    def to_expo(self, max_height: int, max_width: int, with_origin: bool = True) -> dict:
         """
         Converts the graph to the expo format
         :param max_height: maximum height of the graph
         :param max_width: maximum width of the graph
+        :param with_origin: whether to include the graph in the json format
         :return: graph in the expo format
         """
         pass
@@ -22,12 +24,13 @@ class BaseGraph(ABC):
         pass
 
     @abstractmethod
-    def focus(self, node: str, hop: int):
+    def focus(self, node: str | List[str], hop: int, edge_types: List[str] = None):
         """
-        Focuses on the given node and
-        shows only those concepts that are connected to it with the given hop
-        :param node: id of the node for focusing
+        Focuses on the given node(s) and
+        shows only those concepts that are connected to them with the given hop
+        :param node: id of the node for focusing, or list of ids
         :param hop: number of links within the focus
+        :param edge_types: types of links to follow ('PartOf', 'Relation', 'Generalization'), all if not given
         """
         pass
 
@@ -39,6 +42,14 @@ class BaseGraph(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_clusters(self) -> dict:
+        """
+        Calculates clusters of all relators without changing the graph
+        :return: dict relator id -> list of ids of nodes in its cluster
+        """
+        pass
+
     @abstractmethod
     def delete_entity(self, node: str):
         """
@@ -138,6 +149,14 @@ class BaseGraph(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_number_of_elements(self) -> int:
+        """
+        Returns number of all elements in the graph, including views,
+        used for estimating the memory footprint
+        """
+        pass
+
 
 # TODO: implementation for the ttl format
 class TTLGraph(BaseGraph):
@@ -145,18 +164,21 @@ class TTLGraph(BaseGraph):
         super().__init__()
         self.graph = graph
 
-    def to_expo(self, max_height: int, max_width: int) -> dict:
+    def to_expo(self, max_height: int, max_width: int, with_origin: bool = True) -> dict:
         raise NotImplementedError
 
     def to_json(self) -> dict:
         raise NotImplementedError
 
-    def focus(self, node: str, hop: int):
+    def focus(self, node: str | List[str], hop: int, edge_types: List[str] = None):
         raise NotImplementedError
 
     def cluster(self, node: str):
         raise NotImplementedError
 
+    def get_clusters(self) -> dict:
+        raise NotImplementedError
+
     def delete_entity(self, _id: str):
         raise NotImplementedError
 
@@ -192,3 +214,6 @@ class TTLGraph(BaseGraph):
 
     def get_rule(self) -> str:
         raise NotImplementedError
+
+    def get_number_of_elements(self) -> int:
+        raise NotImplementedError
@@ -9,17 +9,24 @@ import csv
 import time
 
 from fastapi import FastAPI, UploadFile, Query, HTTPException, Form, File
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from starlette.middleware.cors import CORSMiddleware
-from typing import List, Annotated
+from typing import List, Annotated, Callable
 from copy import deepcopy
 from collections import deque
 from github import Github
 
 from expose import *
 from expose.models import *
-from expose.graph import TTLGraph
+from expose.graph import BaseGraph
 from expose.schema import ABSTRACTION_TYPE
+from expose.session import Session, SessionStorage
+from expose.cache import ResultCache
+from expose.executor import GraphExecutor, QueueFullError
+from expose.operations import read_graph, export_graph, export_session, run_operation, run_cached_operation, \
+    run_session_operation, run_query, run_session_query, get_clusters, parse_pipeline, apply_focus, apply_cluster, apply_delete, apply_fold, apply_abstract, apply_pipeline, \
+    run_timeline, run_session_timeline, export_timeline_step
+from expose.project.ids import create_id_provider, use_id_provider
 from expose.project.jsongraph import JSONGraph
 
 
@@ -39,6 +46,9 @@ def setup_custom_logger(name, level=logging.INFO):
 
 
 logger = setup_custom_logger(LOG_NAME, logging.DEBUG)
+sessions = SessionStorage()
+executor = GraphExecutor()
+cache = ResultCache()
 
 
 app = FastAPI()
@@ -69,6 +79,14 @@ async def health():
     return {"status": "OK"}
 
 
+@app.get("/cache")
+async def get_cache():
+    """
+    Returns statistics of the cache of results
+    """
+    return cache.get_stats()
+
+
 @app.post("/load")
 async def load(
         file: UploadFile | None = None,
@@ -76,7 +94,8 @@ async def load(
         in_format: Annotated[str, Form()] = "",
         out_format: Annotated[str, Form()] = "",
         height: Annotated[int, Form()] = 0,
-        width: Annotated[int, Form()] = 0
+        width: Annotated[int, Form()] = 0,
+        session: Annotated[bool, Form()] = False
 ):
     """
     Loads model from file or url into graph,
@@ -87,6 +106,7 @@ async def load(
     :param out_format: format of the graph, should be 'expo' or 'json'
     :param height: height of the canvas
     :param width: width of the canvas
+    :param session: keep the graph on the server, returns {"session_id": ..., "graph": ...}
     """
     logger.debug("Loading model...")
 
@@ -101,19 +121,29 @@ async def load(
         raise HTTPException(status_code=400,
                             detail=ERR_NOT_CORRECT_PARAMS + " 'out_format' should be 'expo' or 'json'.")
 
-    try:
-        # the next line throws an exception if the model is not in the right format
-        data = load_from_file(file, in_format) if file else load_from_url(url, in_format)
-        new_graph = JSONGraph(data) if in_format == "json" else TTLGraph(data)
-        return new_graph.to_expo(height, width) if out_format == "expo" else new_graph.to_json()
+    new_graph, result = await run_in_worker(load_graph, file, url, in_format, out_format,
+                                            height, width, session, stateless=False)
+    if session:
+        return {"session_id": sessions.add(new_graph), "graph": result}
+    return result
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
 
+def load_graph(file: UploadFile | None, url: str, in_format: str, out_format: str,
+               height: int, width: int, session: bool) -> (BaseGraph, dict):
+    """
+    Loads model from file or url into graph, and exports it according to the format.
+    N.B. Is executed in a thread, since the graph could be kept in the session
+    :return: graph, graph object according to the format
+    """
+    # the next line throws an exception if the model is not in the right format
+    new_graph = load_from_file(file, in_format) if file else load_from_url(url, in_format)
+    with use_id_provider(create_id_provider(load_graph.__name__, new_graph.to_json)):
+        return new_graph, export_graph(new_graph, out_format, height, width, with_origin=not session)
 
-def load_from_file(file: UploadFile, in_format: str):
+
+def load_from_file(file: UploadFile, in_format: str) -> BaseGraph:
     """
-    Loads the model from file.
+    Loads the model from file, the file is read incrementally.
     Raises exception if the model is not in the right format
     :param file: file with model
     :param in_format: format of the model, should be 'json' or 'ttl'
@@ -121,11 +151,7 @@ def load_from_file(file: UploadFile, in_format: str):
     logger.debug("Loading model from the file...")
 
     try:
-        if in_format == "json":
-            return json.loads(file.file.read())
-        else:
-            # TODO: upload of ttl files
-            raise NotImplementedError
+        return read_graph(file.file, in_format)
     except Exception as e:
         logger.error(e)
         raise Exception(ERR_BAD_FILE) from e
@@ -133,9 +159,9 @@ def load_from_file(file: UploadFile, in_format: str):
         file.file.close()
 
 
-def load_from_url(url: str, in_format: str):
+def load_from_url(url: str, in_format: str) -> BaseGraph:
     """
-    Loads model from url
+    Loads model from url, the model is read incrementally while it is downloaded.
     Raises exception if the model is not in the right format
     :param url: url with model
     :param in_format: format of the model, should be 'json' or 'ttl'
@@ -144,22 +170,55 @@ def load_from_url(url: str, in_format: str):
     logger.info(f"Downloading model from the url: {url}")
 
     try:
-        if in_format == "json":
-            return requests.get(url.strip(), allow_redirects=True).json()
-        else:
-            # TODO: upload of ttl files
-            raise NotImplementedError
+        with requests.get(url.strip(), allow_redirects=True, stream=True) as response:
+            response.raw.decode_content = True  # gzip and deflate are decoded while reading
+            return read_graph(response.raw, in_format)
     except requests.exceptions.Timeout | requests.exceptions.ConnectionError as e:
         logger.error(e.response.text)
         raise Exception(ERR_BAD_CONNECTION) from e
 
 
+def get_existing_session(session_id: str) -> Session:
+    """
+    Returns the session, it could be expired or evicted even after the parameters were checked
+    :param session_id: id of the session
+    """
+    session = sessions.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=ERR_NO_SESSION)
+    return session
+
+
+@app.get("/session/{session_id}")
+async def get_session(session_id: str):
+    """
+    Returns the current state of the graph kept in the session in the json format
+    :param session_id: id of the session
+    """
+    session = get_existing_session(session_id)
+    return await run_in_worker(export_session, session, stateless=False)
+
+
+@app.delete("/session/{session_id}")
+async def delete_session(session_id: str):
+    """
+    Removes the graph kept in the session
+    :param session_id: id of the session
+    """
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=ERR_NO_SESSION)
+    return {"status": "OK"}
+
+
 def data_checks(data: GraphModel):
     """
     Checks if the parameters is correct
     :param data: data to check
     """
-    if not data.origin:
+    if data.session_id:
+        if not sessions.get(data.session_id):
+            raise HTTPException(status_code=404, detail=ERR_NO_SESSION)
+    elif not data.origin:
         raise HTTPException(status_code=400, detail=ERR_NO_MODEL)
     if data.in_format not in ["json", "ttl"]:
         raise HTTPException(status_code=400,
@@ -169,21 +228,83 @@ def data_checks(data: GraphModel):
                             detail=ERR_NOT_CORRECT_PARAMS + " 'out_format' should be 'expo' or 'json'.")
 
 
+async def run_in_worker(func: Callable, *args, stateless: bool = True):
+    """
+    Executes func(*args) in a worker, so that the event loop is not blocked
+    :param func: function to execute
+    :param stateless: if False, the function is always executed in a thread
+    :return: result of the function
+    """
+    try:
+        return await executor.run(func, *args, stateless=stateless)
+
+    except HTTPException:
+        raise
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail=ERR_QUEUE_FULL)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail=ERR_TIMEOUT)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def execute(operation: Callable, data: GraphModel, stateless: bool = True,
+                  cached: bool = False) -> dict | Response:
+    """
+    Executes the operation in a thread for the graph of the session,
+    otherwise in a process (if configured)
+    :param operation: function that modifies the graph, e.g. apply_focus
+    :param data: parameters of the operation
+    :param stateless: if False, the operation is always executed in a thread
+    :param cached: if True, the result for the model with the same parameters is taken from the cache
+    """
+    if data.session_id:
+        session = get_existing_session(data.session_id)
+        result = await run_in_worker(run_session_operation, operation, session, data, stateless=False)
+        sessions.update(data.session_id)
+        return result
+    if cached and cache.enabled:
+        key = await run_in_worker(cache.get_key, operation.__name__, data, stateless=False)
+        result = await cache.get(key, lambda: run_in_worker(run_cached_operation, operation, data,
+                                                                 stateless=stateless))
+        return Response(content=result, media_type="application/json")
+    return await run_in_worker(run_operation, operation, data, stateless=stateless)
+
+
+async def execute_query(query: Callable, data: GraphModel) -> dict:
+    """
+    Executes the query, that does not modify the graph, in the same way as operations
+    :param query: function that reads the graph, e.g. get_clusters
+    :param data: parameters of the query
+    """
+    if data.session_id:
+        session = get_existing_session(data.session_id)
+        return await run_in_worker(run_session_query, query, session, data, stateless=False)
+    return await run_in_worker(run_query, query, data)
+
+
 @app.post("/focus")
 async def focus(data: FocusModel):
     """
-    Focuses on the given node and
-    shows only those concepts that are connected to it with the given hop
-    :param data: dict with node and hop
+    Focuses on the given node(s) and
+    shows only those concepts that are connected to them with the given hop
+    :param data: dict with node, hop, and optionally nodes and edge_types
     """
     data_checks(data)
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        graph.focus(data.node, data.hop)
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
+    focus_checks(data)
+    return await execute(apply_focus, data, cached=True)
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+def focus_checks(data: FocusModel):
+    """
+    Checks if the types of links to follow are correct
+    :param data: data to check
+    """
+    for edge_type in data.edge_types:
+        if edge_type not in ["PartOf", "Relation", "Generalization"]:
+            raise HTTPException(status_code=400,
+                                detail=ERR_NOT_CORRECT_PARAMS +
+                                " 'edge_types' should contain 'PartOf', 'Relation' or 'Generalization'.")
 
 
 @app.post("/cluster")
@@ -193,13 +314,17 @@ async def cluster(data: BasicModel):
     :param data: dict with node
     """
     data_checks(data)
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        graph.cluster(data.node)
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
+    return await execute(apply_cluster, data, cached=True)
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/clusters")
+async def clusters(data: GraphModel):
+    """
+    Calculates clusters of all relators, the graph is not changed
+    :param data: dict with the model or session_id
+    """
+    data_checks(data)
+    return await execute_query(get_clusters, data)
 
 
 @app.post("/delete")
@@ -209,24 +334,19 @@ async def delete(data: DeleteModel):
     :param data: dict with element_id and element_type
     """
     data_checks(data)
+    delete_checks(data)
+    return await execute(apply_delete, data)
+
+
+def delete_checks(data: DeleteModel):
+    """
+    Checks if the type of the element to delete is correct
+    :param data: data to check
+    """
     if data.element_type not in ["node", "link"]:
         raise HTTPException(status_code=400,
                             detail=ERR_NOT_CORRECT_PARAMS + " 'element_type' should be 'node' or 'link'.")
 
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        if data.element_type == "node":
-            graph.delete_entity(data.element_id)
-        elif data.element_type == "link":
-            graph.delete_relation(data.element_id)
-        else:
-            # TODO: place here implementation of constraints deletion
-            pass
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
-
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
 
 # TODO: alternatively consider https://developer.oxforddictionaries.com/
 @app.get("/define")
@@ -327,41 +447,52 @@ def create_catalog_index() -> dict:
     return name_index
 
 
-@app.post("/expand")
-async def expand(data: ExpandModel):
+def load_catalog_index() -> dict:
     """
-    Expand existing concept with information from the catalog
-    :param data: dict with node and limit
+    Loads catalog index from the file, or creates it if the file does not exist
+    :return: index dictionary
     """
-    data_checks(data)
     if not os.path.exists(INDEX_FILE_NAME):
-        name_index = create_catalog_index()
-    else:
-        with open(INDEX_FILE_NAME, 'r', newline='', encoding='utf-8') as f:
-            name_index = json.load(f)
+        return create_catalog_index()
+    with open(INDEX_FILE_NAME, 'r', newline='', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def apply_expand(graph: BaseGraph, data: ExpandModel):
+    """
+    Expands the node with hierarchies of similar concepts from the catalog.
+    N.B. Is executed in a thread, since it loads models from the repository
+    :param graph: graph to expand
+    :param data: dict with node and limit
+    """
+    name_index = load_catalog_index()
     if not name_index:
         raise HTTPException(status_code=400, detail=ERR_NO_INDEX)
 
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        idx = graph.get_node_index(data.node)
-        if (not idx) or (idx not in name_index):
-            logger.info(f"{idx} for {data.node} is not found in the index.")
-            return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
-
-        left_nodes = data.limit
-        contents = get_git_contents(name_index[idx])
-        for content in contents:
-            graph_json = json.loads(content.decoded_content.decode())
-            graph_hierarchy_dict = JSONGraph(graph_json).get_hierarchy(idx)
-            left_nodes -= len(graph_hierarchy_dict["nodes"])
-            graph.expand(data.node, graph_hierarchy_dict)
-            if (data.limit > 0) and (left_nodes <= 0):
-                break
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
+    idx = graph.get_node_index(data.node)
+    if (not idx) or (idx not in name_index):
+        logger.info(f"{idx} for {data.node} is not found in the index.")
+        return
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    left_nodes = data.limit
+    contents = get_git_contents(name_index[idx])
+    for content in contents:
+        graph_json = json.loads(content.decoded_content.decode())
+        graph_hierarchy_dict = JSONGraph(graph_json).get_hierarchy(idx)
+        left_nodes -= len(graph_hierarchy_dict["nodes"])
+        graph.expand(data.node, graph_hierarchy_dict)
+        if (data.limit > 0) and (left_nodes <= 0):
+            break
+
+
+@app.post("/expand")
+async def expand(data: ExpandModel):
+    """
+    Expand existing concept with information from the catalog
+    :param data: dict with node and limit
+    """
+    data_checks(data)
+    return await execute(apply_expand, data, stateless=False)
 
 
 @app.post("/fold")
@@ -371,13 +502,7 @@ async def fold(data: FoldModel):
     :param data: dict with node
     """
     data_checks(data)
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        graph.fold(data.node, data.long_names, data.mult_relations)
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
-
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await execute(apply_fold, data, cached=True)
 
 
 @app.post("/abstract")
@@ -388,32 +513,92 @@ async def abstract(data: AbstractModel):
     """
 
     data_checks(data)
+    abstract_checks(data)
+    # TODO: adapt the code to the TTLGraph
+    return await execute(apply_abstract, data, cached=True)
+
+
+def abstract_checks(data: AbstractModel):
+    """
+    Checks if the abstraction types are known
+    :param data: data to check
+    """
     if data.abs_type:  # for the case when we are iterating on abstractions
         for abs_type in data.abs_type:
             if abs_type not in ABSTRACTION_TYPE:
                 raise HTTPException(status_code=400, detail=ERR_UNKNOWN_ABS)
 
-    # TODO: adapt the code to the TTLGraph
-    try:
-        graph = JSONGraph(data.origin) if data.in_format == "json" else TTLGraph(data.origin)
-        if data.abs_type:
-            for abs_type in data.abs_type:
-                match abs_type:
-                    case "parthood":
-                        graph.abstract_parthoods(data.long_names, data.mult_relations)
-                    case "hierarchy":
-                        graph.abstract_hierarchies(data.long_names, data.mult_relations)
-                    case "aspects":
-                        graph.abstract_aspects(data.long_names, data.mult_relations, data.keep_relators)
-        else:  # if no abstraction type is given, return next possible abstraction
-            try:
-                graph.next_abstraction(data.long_names, data.mult_relations, data.keep_relators)
-            except StopIteration:
-                logger.info("No more abstractions are possible.")
-        return graph.to_expo(data.height, data.width) if data.out_format == "expo" else graph.to_json()
 
-    except Exception as e:
+@app.post("/timeline")
+async def timeline(data: TimelineModel):
+    """
+    Applies the next possible abstraction until there is none and keeps all intermediate states in the session,
+    so that each step could be requested without recomputing
+    :param data: dict with the model or session_id
+    :return: {"session_id": ..., "rules": [...]}, rule of the step 0 is empty
+    """
+    data_checks(data)
+    if data.session_id:
+        session_id = data.session_id
+        new_timeline = await run_in_worker(run_session_timeline, get_existing_session(session_id), data,
+                                           stateless=False)
+    else:
+        if data.in_format != "json":
+            raise HTTPException(status_code=400, detail=ERR_NOT_CORRECT_PARAMS + " 'in_format' should be 'json'.")
+        new_graph, new_timeline = await run_in_worker(run_timeline, data, stateless=False)
+        session_id = sessions.add(new_graph)
+    sessions.set_timeline(session_id, new_timeline)
+    return {"session_id": session_id, "rules": new_timeline.rules}
+
+
+@app.get("/timeline/{session_id}/{step}")
+async def timeline_step(session_id: str, step: int, out_format: str = "json", height: int = 0, width: int = 0):
+    """
+    Returns the model after the given step of the abstraction timeline, see /timeline
+    :param session_id: id of the session
+    :param step: number of the step, 0 is the model before abstraction
+    :param out_format: format of the graph, should be 'expo' or 'json'
+    :param height: height of the canvas
+    :param width: width of the canvas
+    :return: {"step": ..., "rule": ..., "graph": ...}
+    """
+    session = get_existing_session(session_id)
+    if not session.timeline:
+        raise HTTPException(status_code=404, detail=ERR_NO_TIMELINE)
+    if not 0 <= step < len(session.timeline):
+        raise HTTPException(status_code=400, detail=ERR_NOT_CORRECT_PARAMS +
+                            f" 'step' should be between 0 and {len(session.timeline) - 1}.")
+    if out_format not in ["expo", "json"]:
+        raise HTTPException(status_code=400,
+                            detail=ERR_NOT_CORRECT_PARAMS + " 'out_format' should be 'expo' or 'json'.")
+    return await run_in_worker(export_timeline_step, session.timeline, step, out_format, height, width,
+                               stateless=False)
+
+
+@app.post("/pipeline")
+async def pipeline(data: PipelineModel):
+    """
+    Applies the chain of operations to one graph, so that the model is parsed and exported only once
+    :param data: dict with operations, e.g. [{"operation": "focus", "parameters": {"node": ..., "hop": 1}}, ...]
+    """
+    data_checks(data)
+    try:
+        steps = parse_pipeline(data)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    for name, step in steps:
+        if name == "focus":
+            focus_checks(step)
+        elif name == "delete":
+            delete_checks(step)
+        elif name == "abstract":
+            abstract_checks(step)
+    return await execute(apply_pipeline, data)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    executor.shutdown()
 
 
 if __name__ == "__main__":
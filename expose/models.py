@@ -4,7 +4,8 @@ from expose import EXPAND_MAX_NUMBER, LONG_NAMES, MULT_RELATIONS, KEEP_RELATORS
 
 
 class GraphModel(BaseModel):
-    origin: dict
+    origin: dict = {}
+    session_id: str = ""  # if given, origin is taken from the session
     in_format: str
     out_format: str
     height: int = 0
@@ -21,6 +22,8 @@ class ExpandModel(BasicModel):
 
 class FocusModel(BasicModel):
     hop: int
+    nodes: List[str] = []  # additional nodes for focusing
+    edge_types: List[str] = []  # "PartOf", "Relation", "Generalization", all if empty
 
 
 class DeleteModel(GraphModel):
@@ -38,3 +41,18 @@ class AbstractModel(GraphModel):
     long_names: bool = LONG_NAMES
     mult_relations: bool = MULT_RELATIONS
     keep_relators: bool = KEEP_RELATORS
+
+
+class TimelineModel(GraphModel):
+    long_names: bool = LONG_NAMES
+    mult_relations: bool = MULT_RELATIONS
+    keep_relators: bool = KEEP_RELATORS
+
+
+class OperationModel(BaseModel):
+    operation: str  # "focus", "cluster", "delete", "fold", "abstract"
+    parameters: dict = {}  # the same as for the endpoint of the operation, except origin and formats
+
+
+class PipelineModel(GraphModel):
+    operations: List[OperationModel]
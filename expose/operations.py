@@ -0,0 +1,270 @@
+"""This module describes operations over graphs, that could be run in a separate worker."""
+import copy
+import logging
+
+from typing import BinaryIO, Callable, Dict, List, Tuple, Type
+
+from expose import LOG_NAME, ERR_UNKNOWN_OPERATION, TIMELINE_MAX_STEPS
+from expose.models import *
+from expose.cache import ResultCache
+from expose.graph import BaseGraph, TTLGraph
+from expose.session import Session
+from expose.timeline import Timeline
+from expose.project.ids import create_id_provider, use_id_provider
+from expose.project.jsongraph import JSONGraph
+
+
+logger = logging.getLogger(LOG_NAME)
+
+
+def build_graph(origin: dict, in_format: str) -> BaseGraph:
+    """
+    Creates a new graph out of the model
+    :param origin: model in the given format
+    :param in_format: format of the model, should be 'json' or 'ttl'
+    """
+    return JSONGraph(origin) if in_format == "json" else TTLGraph(origin)
+
+
+def read_graph(stream: BinaryIO, in_format: str) -> BaseGraph:
+    """
+    Creates a new graph out of the model that is read incrementally from the stream
+    :param stream: file-like object with the model
+    :param in_format: format of the model, should be 'json' or 'ttl'
+    """
+    if in_format == "json":
+        return JSONGraph.from_stream(stream)
+    # TODO: upload of ttl files
+    raise NotImplementedError
+
+
+def export_graph(graph: BaseGraph, out_format: str, height: int, width: int, with_origin: bool = True) -> dict:
+    """
+    Returns graph object according to the format
+    :param graph: graph to export
+    :param out_format: format of the graph, should be 'expo' or 'json'
+    :param height: height of the canvas
+    :param width: width of the canvas
+    :param with_origin: include the model into the expo format
+    """
+    if out_format == "expo":
+        return graph.to_expo(height, width, with_origin=with_origin)
+    return graph.to_json()
+
+
+def apply_focus(graph: BaseGraph, data: FocusModel):
+    graph.focus([data.node] + data.nodes, data.hop, data.edge_types)
+
+
+def apply_cluster(graph: BaseGraph, data: BasicModel):
+    graph.cluster(data.node)
+
+
+def get_clusters(graph: BaseGraph, _data: GraphModel) -> dict:
+    return {"clusters": graph.get_clusters()}
+
+
+def apply_delete(graph: BaseGraph, data: DeleteModel):
+    if data.element_type == "node":
+        graph.delete_entity(data.element_id)
+    elif data.element_type == "link":
+        graph.delete_relation(data.element_id)
+    else:
+        # TODO: place here implementation of constraints deletion
+        pass
+
+
+def apply_fold(graph: BaseGraph, data: FoldModel):
+    graph.fold(data.node, data.long_names, data.mult_relations)
+
+
+def apply_abstract(graph: BaseGraph, data: AbstractModel):
+    if data.abs_type:
+        for abs_type in data.abs_type:
+            match abs_type:
+                case "parthood":
+                    graph.abstract_parthoods(data.long_names, data.mult_relations)
+                case "hierarchy":
+                    graph.abstract_hierarchies(data.long_names, data.mult_relations)
+                case "aspects":
+                    graph.abstract_aspects(data.long_names, data.mult_relations, data.keep_relators)
+    else:  # if no abstraction type is given, return next possible abstraction
+        try:
+            graph.next_abstraction(data.long_names, data.mult_relations, data.keep_relators)
+        except StopIteration:
+            logger.info("No more abstractions are possible.")
+
+
+# operation name -> (function that modifies the graph, model of its parameters)
+OPERATIONS: Dict[str, Tuple[Callable, Type[GraphModel]]] = {
+    "focus": (apply_focus, FocusModel),
+    "cluster": (apply_cluster, BasicModel),
+    "delete": (apply_delete, DeleteModel),
+    "fold": (apply_fold, FoldModel),
+    "abstract": (apply_abstract, AbstractModel),
+}
+
+
+def parse_pipeline(data: PipelineModel) -> List[Tuple[str, GraphModel]]:
+    """
+    Validates parameters of each operation of the pipeline against the model of the operation
+    :param data: pipeline, formats and size of the canvas are shared by all operations
+    :return: list of (operation name, its parameters)
+    """
+    common = {"in_format": data.in_format, "out_format": data.out_format,
+              "height": data.height, "width": data.width}
+    steps = []
+    for step in data.operations:
+        if step.operation not in OPERATIONS:
+            raise ValueError(ERR_UNKNOWN_OPERATION + step.operation)
+        _, model = OPERATIONS[step.operation]
+        steps.append((step.operation, model.parse_obj({**step.parameters, **common})))
+    return steps
+
+
+def apply_pipeline(graph: BaseGraph, data: PipelineModel):
+    for name, step in parse_pipeline(data):
+        operation, _ = OPERATIONS[name]
+        operation(graph, step)
+
+
+def get_source(data: GraphModel) -> dict:
+    """
+    Returns the model and parameters of the operation, from which deterministic ids are derived
+    :param data: parameters of the operation
+    """
+    return {"origin": data.origin, "parameters": data.dict(exclude={"origin", "session_id"})}
+
+
+def run_operation(operation: Callable, data: GraphModel) -> dict:
+    """
+    Builds the graph out of origin, applies the operation and exports the result.
+    N.B. Could be executed in a worker process, so all arguments should be picklable
+    :param operation: function that modifies the graph, e.g. apply_focus
+    :param data: parameters of the operation
+    """
+    with use_id_provider(create_id_provider(operation.__name__, lambda: get_source(data))):
+        graph = build_graph(data.origin, data.in_format)
+        operation(graph, data)
+        return export_graph(graph, data.out_format, data.height, data.width)
+
+
+def run_cached_operation(operation: Callable, data: GraphModel) -> bytes:
+    """
+    The same as run_operation, but the result is serialized in the worker, so that the event loop is not blocked
+    :param operation: function that modifies the graph, e.g. apply_focus
+    :param data: parameters of the operation
+    :return: result in the json format, see ResultCache.serialize()
+    """
+    return ResultCache.serialize(run_operation(operation, data))
+
+
+def run_session_operation(operation: Callable, session: Session, data: GraphModel) -> dict:
+    """
+    Applies the operation to the graph of the session and exports the result without origin.
+    If the operation fails, the session is invalidated and removed on the next request.
+    N.B. Should be executed in a thread, since the graph is kept in memory of this process
+    :param operation: function that modifies the graph, e.g. apply_focus
+    :param session: session with the graph
+    :param data: parameters of the operation
+    """
+    with session.lock, use_id_provider(session.id_provider):
+        try:
+            operation(session.graph, data)
+        except Exception:
+            session.invalidate()  # the graph could be left partially changed
+            raise
+        return export_graph(session.graph, data.out_format, data.height, data.width, with_origin=False)
+
+
+def run_query(query: Callable, data: GraphModel) -> dict:
+    """
+    Builds the graph out of origin and returns the result of the query, the graph is not exported.
+    N.B. Could be executed in a worker process, so all arguments should be picklable
+    :param query: function that reads the graph, e.g. get_clusters
+    :param data: parameters of the query
+    """
+    with use_id_provider(create_id_provider(query.__name__, lambda: get_source(data))):
+        return query(build_graph(data.origin, data.in_format), data)
+
+
+def run_session_query(query: Callable, session: Session, data: GraphModel) -> dict:
+    """
+    Returns the result of the query over the graph of the session
+    :param query: function that reads the graph, e.g. get_clusters
+    :param session: session with the graph
+    :param data: parameters of the query
+    """
+    with session.lock, use_id_provider(session.id_provider):
+        return query(session.graph, data)
+
+
+def export_session(session: Session) -> dict:
+    """
+    Returns the graph of the session in the json format
+    :param session: session with the graph
+    """
+    with session.lock:
+        return session.graph.to_json()
+
+
+def build_timeline(graph: BaseGraph, data: TimelineModel) -> Timeline:
+    """
+    Applies the next possible abstraction until there is none, each step is applied
+    to the exported result of the previous one, as if the result was uploaded again
+    :param graph: graph to abstract, is changed
+    :param data: parameters of the abstraction
+    :return: timeline with all intermediate states
+    """
+    timeline = Timeline(graph.to_json())
+    while len(timeline) <= TIMELINE_MAX_STEPS:
+        try:
+            graph.next_abstraction(data.long_names, data.mult_relations, data.keep_relators)
+        except StopIteration:
+            break
+        state = graph.to_json()
+        timeline.add(graph.get_rule(), state)
+        graph = JSONGraph(state)
+    logger.info(f"Timeline of {len(timeline) - 1} abstraction steps is built.")
+    return timeline
+
+
+def run_timeline(data: TimelineModel) -> (BaseGraph, Timeline):
+    """
+    Builds the graph out of origin and the abstraction timeline for its copy.
+    N.B. Is executed in a thread, since the graph is kept in the session
+    :param data: parameters of the abstraction
+    :return: graph, timeline
+    """
+    with use_id_provider(create_id_provider(run_timeline.__name__, lambda: get_source(data))):
+        graph = build_graph(data.origin, data.in_format)
+        return graph, build_timeline(copy.deepcopy(graph), data)
+
+
+def run_session_timeline(session: Session, data: TimelineModel) -> Timeline:
+    """
+    Builds the abstraction timeline for the copy of the graph of the session, the graph is not changed
+    :param session: session with the graph
+    :param data: parameters of the abstraction
+    """
+    with session.lock:
+        graph = copy.deepcopy(session.graph)
+    with use_id_provider(create_id_provider(run_session_timeline.__name__, graph.to_json)):
+        return build_timeline(graph, data)
+
+
+def export_timeline_step(timeline: Timeline, step: int, out_format: str, height: int, width: int) -> dict:
+    """
+    Restores the model after the given step of the timeline and exports it according to the format
+    :param timeline: timeline of the abstraction
+    :param step: number of the step, 0 is the original model
+    :param out_format: format of the graph, should be 'expo' or 'json'
+    :param height: height of the canvas
+    :param width: width of the canvas
+    :return: {"step": ..., "rule": ..., "graph": ...}
+    """
+    graph = timeline.get_state(step)
+    if out_format == "expo":
+        graph = JSONGraph(graph).to_expo(height, width, with_origin=False)
+        graph["rule"] = timeline.get_rule(step)
+    return {"step": step, "rule": timeline.get_rule(step), "graph": graph}
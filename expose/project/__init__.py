@@ -1,11 +1,11 @@
 """This package describes Graph structure."""
-import random
-import string
-
+from collections.abc import MutableMapping
 from enum import Enum
-from typing import List, TypedDict, Final, Literal
+from itertools import islice
+from typing import Any, Iterable, List, TypedDict, Final, Literal
 
 from expose import ID_LENGTH
+from expose.project.ids import get_id_provider
 
 
 """
@@ -48,6 +48,10 @@ class ElementDict(BasicDict, total=False):
     stereotype: str
 
 
+# keys that are kept as attributes of Elements, and not in their rest
+ELEMENT_KEYS: Final[frozenset] = frozenset(ElementDict.__annotations__)
+
+
 class PointDict(TypedDict):
     x: int
     y: int
@@ -68,6 +72,123 @@ class RelationsDict(TypedDict):
     Generalization: List
 
 
+"""
+------------------------------------------------------------
+Containers
+------------------------------------------------------------
+"""
+
+
+class ElementBucket:
+    def __init__(self, elements: Iterable = ()):
+        """
+        Insertion-ordered collection of Elements with O(1) add and remove by id.
+        Iteration returns Elements in the order they were added
+        :param elements: initial Elements
+        """
+        self._elements: dict = {element.id: element for element in elements}  # id -> Element
+
+    def __contains__(self, element) -> bool:
+        return element.id in self._elements
+
+    def __iter__(self):
+        return iter(self._elements.values())
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def add(self, element):
+        self._elements[element.id] = element
+
+    def remove(self, element):
+        del self._elements[element.id]
+
+    def nth(self, idx: int):
+        """
+        Returns Element by its position, O(idx)
+        N.B. Only for loops that take the first suitable Element from the beginning
+        """
+        for element in islice(self._elements.values(), idx, None):
+            return element
+        raise IndexError("ElementBucket index out of range")
+
+
+class RestDict(MutableMapping):
+    __slots__ = ("_base", "_hidden", "_changes")
+
+    def __init__(self, base: dict, hidden: frozenset = frozenset(), changes: dict = None):
+        """
+        Copy-on-write mapping over the json object, e.g. over the element given to the constructor.
+        The base is never changed, so it could be shared, e.g. by several graphs parsed from the same model.
+        Changed keys are kept separately, nested values should be changed only through own()
+        :param base: json object, is only read
+        :param hidden: keys of the base that are not visible, e.g. those that are kept as attributes or deleted
+        :param changes: keys with new values
+        """
+        self._base = base
+        self._hidden = hidden
+        self._changes = changes if changes is not None else {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._changes:
+            return self._changes[key]
+        if key in self._hidden:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._changes[key] = value
+
+    def __delitem__(self, key: str):
+        self[key]  # raises KeyError if there is no such key
+        self._changes.pop(key, None)
+        if key in self._base:
+            self._hidden = self._hidden | {key}  # if the key is set again, it is at the end, as in dict
+
+    def __iter__(self):
+        """
+        Returns keys in the order of the base, new keys are at the end, as if the base was changed
+        """
+        base, hidden = self._base, self._hidden
+        for key in base:
+            if key not in hidden:
+                yield key
+        for key in self._changes:
+            if (key not in base) or (key in hidden):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RestDict({dict(self)!r})"
+
+    def own(self, key: str) -> Any:
+        """
+        Returns the value that could be changed in place, the value of the base is copied once
+        :param key: key of the json object, e.g. 'properties'
+        """
+        value = self[key]
+        if key not in self._changes:
+            value = self._changes[key] = copy_json(value)
+        return value
+
+    def to_json(self) -> dict:
+        """
+        Returns the json object with all changes, in the same order as __iter__, values are not copied
+        """
+        hidden = self._hidden
+        result = {key: value for key, value in self._base.items() if key not in hidden}
+        result.update(self._changes)
+        return result
+
+    def copy(self) -> "RestDict":
+        """
+        Returns a copy, that shares the base, but not the changed values
+        """
+        return RestDict(self._base, self._hidden, copy_json(self._changes))
+
+
 """
 ------------------------------------------------------------
 Structure for work with stereotypes
@@ -184,9 +305,9 @@ ID generation function
 
 def generate_id(length: int = ID_LENGTH) -> str:
     """
-    Generates ids for new Elements
+    Generates ids for new Elements with the provider of the current context, see expose.project.ids
     """
-    return "".join([random.choice(string.ascii_letters + string.digits) for _ in range(length)])
+    return get_id_provider().generate(length)
 
 
 def color_variant(hex_color, brightness_offset=1) -> str:
@@ -194,3 +315,15 @@ def color_variant(hex_color, brightness_offset=1) -> str:
     new_rgb_int = [int(hex_value, 16) + brightness_offset for hex_value in rgb_hex]
     new_rgb_int = [min([255, max([0, i])]) for i in new_rgb_int]
     return "#" + "".join([hex(i)[2:] for i in new_rgb_int]).upper()
+
+
+def copy_json(obj):
+    """
+    Copies json-like structure (dicts, lists and immutable values),
+    which is much faster than copy.deepcopy
+    """
+    if isinstance(obj, dict):
+        return {key: copy_json(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [copy_json(value) for value in obj]
+    return obj
@@ -0,0 +1,177 @@
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+OUTGOING, INCOMING = 0, 1
+# the core is rebuilt when the overlay exceeds this share of its edges
+REBUILD_RATIO = 4
+REBUILD_MINIMUM = 64
+
+
+class AdjacencyIndex:
+    def __init__(self, edge_types: List[str]):
+        """
+        Creates index of links between nodes, where ids of nodes are interned to dense integers
+        and neighbours of each edge type are kept in compressed arrays (CSR), built on demand.
+        Edges added or removed after the arrays were built are kept in the overlay,
+        arrays are rebuilt once the overlay becomes too large
+        :param edge_types: types of edges, e.g. PART_OF_TYPE
+        """
+        self._edge_types = edge_types
+        self._edges: Dict[str, Tuple[str, str, str]] = {}  # edge id -> (edge_type, from id, to id)
+        self._built = False
+        self._node_numbers: Dict[str, int] = {}  # node id -> number
+        self._nodes: List[str] = []  # number -> node id
+        self._edge_numbers: Dict[str, int] = {}  # edge id -> number, for edges in arrays
+        # (edge_type, direction) -> (offsets by node number, numbers of neighbours, numbers of edges)
+        self._arrays: Dict[Tuple[str, int], Tuple[array, array, array]] = {}
+        # overlay: (edge_type, direction) -> node number -> edge id -> number of neighbour
+        self._added: Dict[Tuple[str, int], Dict[int, Dict[str, int]]] = {}
+        self._removed: Set[int] = set()  # numbers of edges in arrays
+        self._overlay = 0  # number of changes since arrays were built
+        self._limit = 0  # arrays are rebuilt when the number of changes exceeds the limit
+
+    def add(self, edge: str, edge_type: str, from_id: str, to_id: str):
+        """
+        Adds the directed edge between two nodes
+        :param edge: id of the edge, e.g. of Relation
+        :param edge_type: type of the edge
+        :param from_id: id of the source node
+        :param to_id: id of the target node
+        """
+        self._edges[edge] = (edge_type, from_id, to_id)
+        if self._built:
+            self._overlay += 1
+            from_number, to_number = self._intern(from_id), self._intern(to_id)
+            self._added[(edge_type, OUTGOING)].setdefault(from_number, {})[edge] = to_number
+            self._added[(edge_type, INCOMING)].setdefault(to_number, {})[edge] = from_number
+
+    def remove(self, edge: str):
+        """
+        Removes the edge, if exists
+        :param edge: id of the edge
+        """
+        if edge not in self._edges:
+            return
+        edge_type, from_id, to_id = self._edges.pop(edge)
+        if not self._built:
+            return
+        self._overlay += 1
+        if edge in self._edge_numbers:
+            self._removed.add(self._edge_numbers[edge])
+        else:
+            self._added[(edge_type, OUTGOING)][self._node_numbers[from_id]].pop(edge)
+            self._added[(edge_type, INCOMING)][self._node_numbers[to_id]].pop(edge)
+
+    def retain(self, edges: Set[str]):
+        """
+        Keeps only the given edges, arrays are rebuilt on the next request
+        :param edges: ids of edges to keep
+        """
+        self._edges = {edge: value for edge, value in self._edges.items() if edge in edges}
+        self._built = False
+
+    def get_neighbours(self, node: str, edge_type: str, direction: int = OUTGOING) -> List[str]:
+        """
+        Returns direct neighbours of the node
+        :param node: id of the node
+        :param edge_type: type of edges to follow
+        :param direction: OUTGOING to follow edges from the node, INCOMING to follow edges to the node
+        :return: list of ids of nodes, in the order edges were added (with repetitions)
+        """
+        if (not self._built) or (self._overlay > self._limit):
+            self._build()
+        number = self._node_numbers.get(node)
+        if number is None:
+            return []
+        key = (edge_type, direction)
+        offsets, neighbours, edges = self._arrays[key]
+        if number < len(offsets) - 1:
+            start, end = offsets[number], offsets[number + 1]
+            if self._removed:
+                removed = self._removed
+                result = [neighbours[idx] for idx in range(start, end) if edges[idx] not in removed]
+            else:
+                result = neighbours[start:end]
+        else:
+            result = []
+        added = self._added[key].get(number)
+        if added:
+            result = [*result, *added.values()]
+        return list(map(self._nodes.__getitem__, result))
+
+    def get_reachable(self, nodes: Iterable[str], hop: int, edge_types: List[str]) -> Set[str]:
+        """
+        Returns nodes that are connected to any of the given nodes with at most the given hop
+        in any direction, each node is expanded only once (breadth-first search)
+        :param nodes: ids of the start nodes
+        :param hop: number of edges to follow
+        :param edge_types: types of edges to follow
+        :return: set of ids of nodes, including the given ones
+        """
+        if (not self._built) or (self._overlay > self._limit):
+            self._build()
+        result = set(nodes)
+        frontier = {self._node_numbers[node] for node in result if node in self._node_numbers}
+        visited = set(frontier)
+        tables = [(*self._arrays[key], self._added[key]) for key in
+                  [(edge_type, direction) for edge_type in edge_types for direction in (OUTGOING, INCOMING)]]
+        removed = self._removed
+        while (hop > 0) and frontier:
+            found = []
+            for offsets, neighbours, edges, added in tables:
+                size = len(offsets) - 1
+                for number in frontier:
+                    if number < size:
+                        start, end = offsets[number], offsets[number + 1]
+                        if not removed:
+                            found += neighbours[start:end]
+                        else:
+                            found += [neighbours[idx] for idx in range(start, end) if edges[idx] not in removed]
+                    if number in added:
+                        found += added[number].values()
+            frontier = set(found) - visited
+            visited |= frontier
+            hop -= 1
+        result.update(map(self._nodes.__getitem__, visited))
+        return result
+
+    def _intern(self, node: str) -> int:
+        number = self._node_numbers.get(node)
+        if number is None:
+            number = self._node_numbers[node] = len(self._nodes)
+            self._nodes.append(node)
+        return number
+
+    def _build(self):
+        self._node_numbers, self._nodes = {}, []
+        self._edge_numbers = {}
+        # edge_type -> [(from number, to number, edge number)]
+        by_type: Dict[str, list] = {edge_type: [] for edge_type in self._edge_types}
+        for edge, (edge_type, from_id, to_id) in self._edges.items():
+            number = self._edge_numbers[edge] = len(self._edge_numbers)
+            by_type[edge_type].append((self._intern(from_id), self._intern(to_id), number))
+
+        size = len(self._nodes)
+        for edge_type, edges in by_type.items():
+            for direction in (OUTGOING, INCOMING):
+                source, target = (0, 1) if direction == OUTGOING else (1, 0)
+                # counting sort of edges by the source node keeps the order in which edges were added
+                offsets = array("q", bytes(8 * (size + 1)))
+                for edge in edges:
+                    offsets[edge[source] + 1] += 1
+                for idx in range(size):
+                    offsets[idx + 1] += offsets[idx]
+                positions = array("q", offsets)
+                neighbours = array("q", bytes(8 * len(edges)))
+                numbers = array("q", bytes(8 * len(edges)))
+                for edge in edges:
+                    position = positions[edge[source]]
+                    neighbours[position] = edge[target]
+                    numbers[position] = edge[2]
+                    positions[edge[source]] = position + 1
+                self._arrays[(edge_type, direction)] = (offsets, neighbours, numbers)
+                self._added[(edge_type, direction)] = {}
+        self._removed = set()
+        self._overlay = 0
+        self._limit = max(REBUILD_MINIMUM, len(self._edges) // REBUILD_RATIO)
+        self._built = True
@@ -1,17 +1,27 @@
-from typing import List
+import copy
+
+from typing import Dict, List, Set
 
 from expose.project.view import View
 from expose.project import PACKAGE_TYPE, PROPERTY_TYPE, LITERAL_TYPE, \
-    generate_id, ElementDict, BasicDict
+    generate_id, copy_json, ElementDict, BasicDict
 
 
 class Element:
+    __slots__ = ("_id", "_name", "_type", "_description", "_views", "_diagram_views", "_view_ids", "_all_diagrams",
+                 "_json")
+
     def __init__(self, element: dict):
         self._id = element["id"]
         self._name = element["name"]
         self._type = element["type"]
         self._description = element["description"] if "description" in element else None
         self._views: List[View] = []  # all views on all the diagrams
+        # indexes of views, allocated with the first view
+        self._diagram_views: Dict[str, View] | None = None  # diagram id -> first View on it
+        self._view_ids: Set[str] | None = None  # ids of all Views
+        self._all_diagrams: frozenset | None = None  # ids of Diagrams, cached by get_all_diagrams()
+        self._json: dict | None = None  # cached by get_json(), until the Element is changed
 
     @property
     def id(self) -> str:
@@ -24,6 +34,7 @@ class Element:
     @name.setter
     def name(self, new_name: str):
         self._name = new_name
+        self._changed()
 
     @property
     def type(self) -> str:
@@ -39,19 +50,64 @@ class Element:
                 "description": self._description,
                 "type": self._type}
 
+    def get_json(self) -> dict:
+        """
+        Returns the Element in the json format, the result is built once and reused until the Element is changed,
+        so it is shared between exports and should not be changed
+        """
+        if self._json is None:
+            self._json = self.to_json()
+        return self._json
+
+    def _changed(self):
+        """
+        Should be called by every function that changes the json of the Element
+        """
+        self._json = None
+
+    def clone(self):
+        """
+        Creates a copy of the Element with its own views,
+        all other referenced objects are shared with the original
+        """
+        element = copy.copy(self)
+        element._views = [view.clone() for view in self._views]
+        element.reindex_views()
+        return element
+
     def add_view(self, view: View):
         self._views.append(view)
+        if self._diagram_views is None:
+            self._diagram_views, self._view_ids = {}, set()
+        self._diagram_views.setdefault(view.diagram_id, view)
+        self._view_ids.add(view.id)
+        self._all_diagrams = None
+
+    def del_view(self, view_id: str):
+        """
+        Removes View with the given id from the Element, but not from the Diagram
+        :param view_id: id of the View
+        """
+        if self._view_ids and (view_id in self._view_ids):
+            self._views = [view for view in self._views if view.id != view_id]
+            self.reindex_views()
+
+    def reindex_views(self):
+        """
+        Rebuilds indexes of views, should be called when ids of views are changed
+        """
+        views, self._views = self._views, []
+        self._diagram_views, self._view_ids, self._all_diagrams = None, None, None
+        for view in views:
+            self.add_view(view)
 
     def get_view(self, diagram_id) -> View | None:
         """
         Returns view on the given diagram
         :param diagram_id: id of the Diagram
-        :return: View if found
+        :return: View if found, the first one if there are several
         """
-        for view in self._views:
-            if view.diagram_id == diagram_id:
-                return view
-        return None
+        return self._diagram_views.get(diagram_id) if self._diagram_views else None
 
     def has_view(self, view_id: str) -> bool:
         """
@@ -60,36 +116,32 @@ class Element:
         possible inversion of Relations
         :param view_id: id of the View to be checked
         """
-        for view in self._views:
-            if view.id == view_id:
-                return True
-        return False
+        return bool(self._view_ids) and (view_id in self._view_ids)
 
-    def get_all_diagrams(self) -> set:
+    def get_all_diagrams(self) -> frozenset:
         """
         Returns all diagrams on which the Element can be found
         :return: set of diagrams' ids
         """
-        diagrams = set()
-        for view in self._views:
-            diagrams.add(view.diagram_id)
-        return diagrams
+        if self._all_diagrams is None:
+            self._all_diagrams = frozenset(self._diagram_views) if self._diagram_views else frozenset()
+        return self._all_diagrams
 
 
 class Model(Element):
+    __slots__ = ("_property", "_contents")
+
     def __init__(self, model: dict):
+        """
+        Creates Model (or Package) without nested Packages, they are added while the model is parsed
+        :param model: dict with all properties
+        """
         super().__init__(model)
         self._property = model["propertyAssignments"]
-        self._contents = self.get_all_packages(model["contents"])
-
-    @staticmethod
-    def get_all_packages(contents: List) -> List:
-        result = []
-        if contents:
-            for element in contents:
-                if element["type"] == PACKAGE_TYPE:
-                    result.append(Model(element))
-        return result
+        self._contents: List[Model] = []  # nested Packages
+
+    def add_package(self, package: "Model"):
+        self._contents.append(package)
 
     def to_json(self) -> dict:
         result = super().to_json()
@@ -99,6 +151,8 @@ class Model(Element):
 
 
 class Diagram(Element):
+    __slots__ = ("_owner", "_elements")
+
     def __init__(self, diagram: dict):
         super().__init__(diagram)
         self._owner: BasicDict = diagram["owner"]
@@ -107,7 +161,7 @@ class Diagram(Element):
     def to_json(self) -> dict:
         result = super().to_json()
         result["owner"] = self._owner
-        result["contents"] = [view.to_json() for view in self._elements.values()]
+        result["contents"] = [view.get_json() for view in self._elements.values()]
         return result
 
     @property
@@ -126,6 +180,8 @@ class Diagram(Element):
 
 
 class Property(Element):
+    __slots__ = ("_propertyType", "_cardinality")
+
     def __init__(self, name: str, property_type: BasicDict = None, cardinality: str = None):
         super().__init__(ElementDict(
             id=generate_id(), name=name, type=PROPERTY_TYPE
@@ -149,6 +205,8 @@ class Property(Element):
 
 
 class Literal(Element):
+    __slots__ = ()
+
     def __init__(self, name: str):
         super().__init__(ElementDict(
             id=generate_id(), name=name, type=LITERAL_TYPE
@@ -1,9 +1,85 @@
+from itertools import chain, islice
+from typing import Iterator
+
 from expose import *
 from expose.project import *
 from expose.project.element import Element, Property
 
 
+class EdgeSet(dict):
+    """
+    Insertion-ordered set of relation ids with O(1) add and remove.
+    Ids are kept as keys of the dict, so iteration, len and 'in' are native
+    """
+    __slots__ = ()
+
+    def add(self, relation_id: str):
+        self[relation_id] = None
+
+    def remove(self, relation_id: str):
+        del self[relation_id]
+
+    def nth(self, idx: int) -> str:
+        """
+        Returns id by its position, O(idx)
+        N.B. Only for loops that take the first suitable id from the beginning
+        """
+        for relation_id in islice(self, idx, None):
+            return relation_id
+        raise IndexError("EdgeSet index out of range")
+
+
+class EdgeMap(dict):
+    """
+    relation_type -> EdgeSet, EdgeSet is created for the first relation of the type,
+    otherwise the shared empty one is returned
+    """
+    __slots__ = ()
+
+    def __missing__(self, relation_type: str) -> EdgeSet:
+        return NO_EDGES
+
+    def add(self, relation_type: str, relation_id: str):
+        if relation_type not in self:
+            self[relation_type] = EdgeSet()
+        self[relation_type].add(relation_id)
+
+
+class _Shared:
+    """
+    Mixin for empty containers that are shared by all Entities, any change of them raises TypeError
+    """
+    __slots__ = ()
+
+    def _change(self, *args, **kwargs):
+        raise TypeError(f"Shared empty {type(self).__name__} could not be changed")
+
+    add = remove = _change
+    __setitem__ = __delitem__ = __ior__ = _change
+    clear = pop = popitem = setdefault = update = _change
+
+
+class _NoEdges(_Shared, EdgeSet):
+    """
+    Empty EdgeSet of Entities without relations of some type
+    """
+    __slots__ = ()
+
+
+class _NoEdgeMap(_Shared, EdgeMap):
+    """
+    Empty EdgeMap of Entities without relations
+    """
+    __slots__ = ()
+
+
+NO_EDGES = _NoEdges()
+NO_EDGE_MAP = _NoEdgeMap()
+
+
 class Entity(Element):
+    __slots__ = ("_stereotype", "_rest", "_in_edges", "_out_edges")
+
     def __init__(self, entity: dict):
         """
         Complete initialization out of the dict
@@ -11,13 +87,11 @@ class Entity(Element):
         """
         super().__init__(entity)
         self._stereotype = entity["stereotype"]
-        for key in ElementDict.__annotations__.keys():
-            entity.pop(key, "")
-        self._rest = entity
+        self._rest = RestDict(entity, ELEMENT_KEYS)  # the given dict is not changed
 
-        # relation_type -> [id_relation]
-        self._in_edges: RelationsDict = {PART_OF_TYPE: [], RELATION_TYPE: [], GENERAL_TYPE: []}
-        self._out_edges: RelationsDict = {PART_OF_TYPE: [], RELATION_TYPE: [], GENERAL_TYPE: []}
+        # relation_type -> {id_relation}, are created for the first relation
+        self._in_edges: EdgeMap | None = None
+        self._out_edges: EdgeMap | None = None
 
     @classmethod
     def init_from_id(cls, _id: str):
@@ -37,14 +111,13 @@ class Entity(Element):
         self._description = entity["description"]
         self._type = entity["type"]
         self._stereotype = entity["stereotype"]
-        for key in ElementDict.__annotations__.keys():
-            entity.pop(key, "")
-        self._rest = entity
+        self._rest = RestDict(entity, ELEMENT_KEYS)
+        self._changed()
 
     def to_json(self) -> dict:
         result = super().to_json()
         result["stereotype"] = self._stereotype
-        result.update(self._rest)
+        result.update(self._rest.to_json())
         return result
 
     def to_expo(self) -> dict:
@@ -186,16 +259,16 @@ class Entity(Element):
         return self._stereotype
 
     @property
-    def rest(self) -> dict:
+    def rest(self) -> RestDict:
         return self._rest
 
     @property
-    def in_edges(self) -> RelationsDict:
-        return self._in_edges
+    def in_edges(self) -> dict[str, EdgeSet]:
+        return self._in_edges if self._in_edges is not None else NO_EDGE_MAP
 
     @property
-    def out_edges(self) -> RelationsDict:
-        return self._out_edges
+    def out_edges(self) -> dict[str, EdgeSet]:
+        return self._out_edges if self._out_edges is not None else NO_EDGE_MAP
 
     def add_outgoing(self, relation_type: EdgeType, relation_id: str):
         """
@@ -203,7 +276,9 @@ class Entity(Element):
         :param relation_type: PART_OF_TYPE | GENERAL_TYPE | RELATION_TYPE
         :param relation_id: id of the relation
         """
-        self._out_edges[relation_type].append(relation_id)
+        if self._out_edges is None:
+            self._out_edges = EdgeMap()
+        self._out_edges.add(relation_type, relation_id)
 
     def del_outgoing(self, relation_type: EdgeType, relation_id: str):
         """
@@ -211,7 +286,7 @@ class Entity(Element):
         :param relation_type: PART_OF_TYPE | GENERAL_TYPE | RELATION_TYPE
         :param relation_id: id of the relation
         """
-        self._out_edges[relation_type].remove(relation_id)
+        self.out_edges[relation_type].remove(relation_id)
 
     def add_incoming(self, relation_type: EdgeType, relation_id: str):
         """
@@ -219,7 +294,9 @@ class Entity(Element):
         :param relation_type: PART_OF_TYPE | GENERAL_TYPE | RELATION_TYPE
         :param relation_id: id of the relation
         """
-        self._in_edges[relation_type].append(relation_id)
+        if self._in_edges is None:
+            self._in_edges = EdgeMap()
+        self._in_edges.add(relation_type, relation_id)
 
     def del_incoming(self, relation_type: EdgeType, relation_id: str):
         """
@@ -227,7 +304,7 @@ class Entity(Element):
         :param relation_type: PART_OF_TYPE | GENERAL_TYPE | RELATION_TYPE
         :param relation_id: id of the relation
         """
-        self._in_edges[relation_type].remove(relation_id)
+        self.in_edges[relation_type].remove(relation_id)
 
     def has_other_up_edges(self) -> bool:
         """
@@ -235,29 +312,58 @@ class Entity(Element):
         that would require edges movement
         :return: True, if there are other relations
         """
-        return len(self._out_edges["PartOf"] + self._out_edges["Generalization"]) > 1
+        return len(self.out_edges[PART_OF_TYPE]) + len(self.out_edges[GENERAL_TYPE]) > 1
 
-    def get_in_edges(self, edge_type=None) -> List[str]:
+    def get_in_edges(self, edge_type=None) -> EdgeSet | List[str]:
+        """
+        Returns ids of incoming relations of the given type (not a copy),
+        or a new list with ids of all incoming relations
+        """
         if edge_type:
             if edge_type in ["PartOf", "Relation", "Generalization"]:
-                return self._in_edges[edge_type]
+                return self.in_edges[edge_type]
             else:
                 return []
         else:
-            return self._in_edges["PartOf"] \
-                   + self._in_edges["Relation"] \
-                   + self._in_edges["Generalization"]
+            return list(self.iter_in_edges())
 
-    def get_out_edges(self, edge_type=None) -> List[str]:
+    def get_out_edges(self, edge_type=None) -> EdgeSet | List[str]:
+        """
+        Returns ids of outgoing relations of the given type (not a copy),
+        or a new list with ids of all outgoing relations
+        """
         if edge_type:
             if edge_type in ["PartOf", "Relation", "Generalization"]:
-                return self._out_edges[edge_type]
+                return self.out_edges[edge_type]
             else:
                 return []
         else:
-            return self._out_edges["PartOf"] \
-                   + self._out_edges["Relation"] \
-                   + self._out_edges["Generalization"]
+            return list(self.iter_out_edges())
+
+    def iter_in_edges(self) -> Iterator[str]:
+        """
+        Iterates over ids of all incoming relations without copying them.
+        N.B. Relations should not be added or deleted during the iteration
+        """
+        in_edges = self.in_edges
+        return chain(in_edges[PART_OF_TYPE], in_edges[RELATION_TYPE], in_edges[GENERAL_TYPE])
+
+    def iter_out_edges(self) -> Iterator[str]:
+        """
+        Iterates over ids of all outgoing relations without copying them.
+        N.B. Relations should not be added or deleted during the iteration
+        """
+        out_edges = self.out_edges
+        return chain(out_edges[PART_OF_TYPE], out_edges[RELATION_TYPE], out_edges[GENERAL_TYPE])
+
+    def retain_edges(self, relation_ids: set):
+        """
+        Removes ids of all relations that are not in the given set, the order of others is kept
+        :param relation_ids: ids of relations to keep
+        """
+        for edges in chain(self.in_edges.values(), self.out_edges.values()):
+            for relation_id in [_id for _id in edges if _id not in relation_ids]:
+                edges.remove(relation_id)
 
     def get_all_edges(self) -> (List[str], List[str]):
         """
@@ -273,7 +379,8 @@ class Entity(Element):
         used for Relators
         :return: number of edges for this Entity
         """
-        return len(self.get_in_edges()) + len(self.get_out_edges())
+        return sum(len(edges) for edges in self.in_edges.values()) + \
+            sum(len(edges) for edges in self.out_edges.values())
 
     def add_attribute(self, attribute_name: str):
         """
@@ -286,6 +393,7 @@ class Entity(Element):
             self._rest["properties"] = self._rest["properties"] + [_property]
         else:
             self._rest["properties"] = [_property]
+        self._changed()
 
         for view in self._views:
             view.increase_shape_height(ATTRIBUTE_HEIGHT)
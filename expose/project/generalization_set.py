@@ -1,11 +1,16 @@
 from typing import List
 
-from expose.project import GENERAL_TYPE, GEN_SET_TYPE, ElementDict, BasicDict, generate_id
+from expose.project import GENERAL_TYPE, GEN_SET_TYPE, ELEMENT_KEYS, BasicDict, RestDict, generate_id
 from expose.project.element import Element
 from expose.project.relation import Generalization
 
 
+GEN_SET_KEYS = ELEMENT_KEYS | {"generalizations"}  # generalizations are kept as objects
+
+
 class GeneralizationSet(Element):
+    __slots__ = ("_generalizations", "_rest")
+
     def __init__(self, entity: dict, generalizations: List[Generalization], names: dict):
         """
         Creates GeneralizationSet object
@@ -15,16 +20,13 @@ class GeneralizationSet(Element):
         """
         super().__init__(entity)
         self._generalizations = generalizations
-        entity.pop("generalizations")
-        for key in ElementDict.__annotations__.keys():
-            entity.pop(key, "")
+        self._rest = RestDict(entity, GEN_SET_KEYS)
 
         # processing "categorizer" attribute
         if entity["categorizer"] is not None:
             if entity["categorizer"]["id"] in names:
                 self.name = names[entity["categorizer"]["id"]]
-            entity["categorizer"] = None
-        self._rest = entity
+            self._rest["categorizer"] = None
 
     @classmethod
     def get_ids(cls, element: dict) -> List[str]:
@@ -46,12 +48,12 @@ class GeneralizationSet(Element):
         return self._generalizations
 
     @property
-    def rest(self) -> dict:
+    def rest(self) -> RestDict:
         return self._rest
 
     def to_json(self) -> dict:
         result = super().to_json()
-        result.update(self._rest)
+        result.update(self._rest.to_json())
         result["generalizations"] = [BasicDict(id=g.id, type=GENERAL_TYPE) for g in self._generalizations]
         return result
 
@@ -115,3 +117,4 @@ class GeneralizationSet(Element):
         if self._rest["isComplete"]:
             self._rest["isComplete"] = False
         self._generalizations.remove(generalization)
+        self._changed()
@@ -0,0 +1,72 @@
+from typing import Callable, Dict, Iterable, List
+
+
+class HierarchyIndex:
+    def __init__(self, successors: Dict[str, Callable[[str], List[str]]],
+                 values: Dict[str, Callable[[str], tuple]] = None):
+        """
+        Creates lazily built index of closures over generalizations,
+        e.g. ancestors or descendants of each entity
+        :param successors: kind of closure -> function that returns ids of the next nodes for the given one
+        :param values: kind of value -> function that returns the value of the given node, e.g. its GeneralizationSets
+        """
+        self._successors = successors
+        self._closures: Dict[str, Dict[str, frozenset]] = {kind: {} for kind in successors}  # kind -> id -> closure
+        self._functions = values if values else {}
+        self._values: Dict[str, Dict[str, tuple]] = {kind: {} for kind in self._functions}  # kind -> id -> value
+
+    def get(self, kind: str, node: str) -> frozenset:
+        """
+        Returns all nodes reachable from the given one, calculated closures are reused
+        :param kind: kind of closure, e.g. 'ancestors'
+        :param node: id of the node
+        :return: set of ids of nodes, including the given one
+        """
+        closures = self._closures[kind]
+        if node in closures:
+            return closures[node]
+        successors = self._successors[kind]
+        closure = {node}
+        stack = [node]
+        while stack:
+            for successor in successors(stack.pop()):
+                if successor not in closure:
+                    if successor in closures:
+                        closure |= closures[successor]  # nodes reachable from it are already there
+                    else:
+                        closure.add(successor)
+                        stack.append(successor)
+        closures[node] = frozenset(closure)
+        return closures[node]
+
+    def get_value(self, kind: str, node: str) -> tuple:
+        """
+        Returns the value of the given node, calculated values are reused
+        :param kind: kind of value, e.g. 'sets'
+        :param node: id of the node
+        """
+        values = self._values[kind]
+        if node not in values:
+            values[node] = self._functions[kind](node)
+        return values[node]
+
+    def invalidate(self, nodes: Iterable[str]):
+        """
+        Forgets closures that pass through any of the given nodes and values of these nodes,
+        should be called when generalizations or stereotypes of these nodes are changed
+        :param nodes: ids of changed nodes
+        """
+        nodes = set(nodes)
+        for kind, closures in self._closures.items():
+            if closures:
+                self._closures[kind] = {node: closure for node, closure in closures.items()
+                                        if closure.isdisjoint(nodes)}
+        for values in self._values.values():
+            for node in nodes:
+                values.pop(node, None)
+
+    def clear(self):
+        for closures in self._closures.values():
+            closures.clear()
+        for values in self._values.values():
+            values.clear()
@@ -0,0 +1,99 @@
+"""This module provides ids for new elements, either random or derived from the operation."""
+import json
+import os
+import string
+import threading
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import blake2b
+from itertools import count
+from typing import Any, Callable
+
+from expose import ID_LENGTH, ID_MODE
+
+ALPHABET = string.ascii_letters + string.digits
+# maps a random byte to a character, bytes >= 248 are dropped, so that all 62 characters are equally likely
+_BYTE_TABLE = bytes(ord(ALPHABET[byte % len(ALPHABET)]) for byte in range(256))
+_DROPPED_BYTES = bytes(range(len(ALPHABET) * (256 // len(ALPHABET)), 256))
+
+
+class IdProvider:
+    def generate(self, length: int = ID_LENGTH) -> str:
+        raise NotImplementedError
+
+
+class RandomIdProvider(IdProvider):
+    def __init__(self, buffer_size: int = 4096):
+        """
+        Creates provider of random ids, random bytes are taken from the OS in bulk and encoded in base62
+        :param buffer_size: number of random bytes taken at once
+        """
+        self._buffer_size = buffer_size
+        self._buffer = ""
+        self._position = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def generate(self, length: int = ID_LENGTH) -> str:
+        with self._lock:
+            if self._pid != os.getpid():  # forked worker should not repeat ids of the parent
+                self._buffer, self._position, self._pid = "", 0, os.getpid()
+            while self._position + length > len(self._buffer):
+                random_bytes = os.urandom(max(self._buffer_size, 2 * length))
+                self._buffer = self._buffer[self._position:] + \
+                    random_bytes.translate(_BYTE_TABLE, _DROPPED_BYTES).decode("ascii")
+                self._position = 0
+            self._position += length
+            return self._buffer[self._position - length:self._position]
+
+
+class DeterministicIdProvider(IdProvider):
+    def __init__(self, source: str, operation: str):
+        """
+        Creates provider of ids derived from (source, operation, counter),
+        so that the same operation over the same model always gives the same ids
+        :param source: hash of the model (and parameters) the operation is applied to
+        :param operation: name of the operation
+        """
+        self._prefix = f"{source}:{operation}:"
+        self._counter = count()
+
+    def generate(self, length: int = ID_LENGTH) -> str:
+        key = (self._prefix + str(next(self._counter))).encode()
+        # one byte of the hash per character, length should not exceed 64
+        return blake2b(key, digest_size=length).digest().translate(_BYTE_TABLE).decode("ascii")
+
+
+_random_provider = RandomIdProvider()
+_current_provider: ContextVar[IdProvider] = ContextVar("id_provider", default=_random_provider)
+
+
+def get_id_provider() -> IdProvider:
+    return _current_provider.get()
+
+
+def create_id_provider(operation: str, get_source: Callable[[], Any]) -> IdProvider:
+    """
+    Returns provider of ids for the operation according to ID_MODE
+    :param operation: name of the operation
+    :param get_source: function that returns json-like source of new elements, e.g. the model,
+    is called only in the deterministic mode
+    """
+    if ID_MODE == "deterministic":
+        source = json.dumps(get_source(), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return DeterministicIdProvider(blake2b(source.encode()).hexdigest(), operation)
+    return _random_provider
+
+
+@contextmanager
+def use_id_provider(provider: IdProvider):
+    """
+    Generates ids with the given provider within the context, e.g. within an operation executed in a worker
+    :param provider: provider of ids
+    """
+    token = _current_provider.set(provider)
+    try:
+        yield provider
+    finally:
+        _current_provider.reset(token)
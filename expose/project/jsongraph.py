@@ -1,13 +1,19 @@
 import copy
 import logging
 
+from typing import BinaryIO, Generator, Iterable
+
 from expose import *
 from expose.graph import BaseGraph
 from expose.project import *
+from expose.project.adjacency import AdjacencyIndex, INCOMING, OUTGOING
 from expose.project.element import Element, Model, Diagram, Literal
-from expose.project.entity import Entity
+from expose.project.entity import Entity, EdgeSet
 from expose.project.relation import Generalization, Relation
 from expose.project.generalization_set import GeneralizationSet
+from expose.project.reader import ProjectReader
+from expose.project.hierarchy import HierarchyIndex
+from expose.project.worklist import Worklist
 from expose.project.view import View
 
 
@@ -15,44 +21,88 @@ class JSONGraph(BaseGraph, Element):
     def __init__(self, project: dict):
         self.logger = logging.getLogger(LOG_NAME)
         self.logger.debug(f"Initialising graph of the model...{project['name']}...")
-        self._rule: str = ""
-
         Element.__init__(self, project)
-        self._entities: dict[str, List[Entity]] = {}  # stereotype -> [Entity]
+        self._init_containers()
+
+        # creating graph of all elements in the model
+        self._model = Model(project["model"])  # Packages are added to the Model while elements are processed
+        self.add_elements(self.iter_elements(self._model, project["model"]))
+        # creating all diagrams and adding views to the elements
+        self.add_diagrams(project["diagrams"] or [])
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO) -> "JSONGraph":
+        """
+        Creates graph out of the model that is read incrementally, elements are added as soon as they are read,
+        so the whole model is never kept in memory as a dict
+        :param stream: file-like object with the model in the json format
+        :return: graph of the model
+        """
+        graph = cls.__new__(cls)
+        graph.logger = logging.getLogger(LOG_NAME)
+        graph.logger.debug("Initialising graph of the model from the stream...")
+        graph._init_containers()
+
+        reader = ProjectReader(stream)
+        graph.add_elements(reader.iter_elements())
+        graph._model = reader.model
+        graph.add_diagrams(reader.iter_diagrams())
+        Element.__init__(graph, reader.header)  # the header of the project is complete only at the end
+        return graph
+
+    def _init_containers(self):
+        self._rule: str = ""
+        self._entities: dict[str, ElementBucket] = {}  # stereotype -> {Entity}
         self._entity_ids: dict[str, Entity] = {}  # id -> Entity
-        self._relations: RelationsDict = {PART_OF_TYPE: [], RELATION_TYPE: [], GENERAL_TYPE: []}
+        # relation_type -> {Relation}
+        self._relations: dict[str, ElementBucket] = {PART_OF_TYPE: ElementBucket(), RELATION_TYPE: ElementBucket(),
+                                                     GENERAL_TYPE: ElementBucket()}
         self._relation_ids: dict[str, Relation | Generalization] = {}  # id -> Relation
+        self._relation_pairs: dict[tuple, EdgeSet] = {}  # (id, id, relation_type) -> {id_relation}
+        # links between Entities with integer ids, for traversals
+        self._adjacency = AdjacencyIndex([PART_OF_TYPE, RELATION_TYPE, GENERAL_TYPE])
         self._generalization_set_ids: dict[str, GeneralizationSet] = {}  # id -> GeneralizationSet
         self._diagrams: dict[str, Diagram] = {}  # id -> Diagram
         self._additional_entities: dict[str, Diagram] = {}  # id -> Name
-
-        self._stack = []
+        # kind -> id -> closure over generalizations, built on demand
+        self._hierarchy = HierarchyIndex({"ancestors": self._get_parent_nodes, "descendants": self._get_child_nodes,
+                                          "top": self._get_upper_nodes, "bottom": self._get_lower_nodes},
+                                         {"sets": self._get_specific_sets})
+        # candidates for next_abstraction: parthood relations (except MEMBER_OF), generalizations, aspects
+        self._worklist = Worklist([PART_OF_TYPE, GENERAL_TYPE] + ASPECTS)
+
+        self._folding_ids = set()  # ids of Entities that are being folded
+        self._abstracting_ids = set()  # ids of aspects that are being abstracted
         self._ids_to_be_abstracted = []
 
-        # creating graph of all elements in the model
-        self._model = Model(project["model"])  # create Model with all Packages in it
-        all_contents = self.get_all_elements(project["model"]["contents"])  # get all Elements as list
-        if all_contents:
-            for element in all_contents:
-                if element["type"] == CLASS_TYPE:
-                    self.add_entity(element)
-                elif element["type"] == GEN_SET_TYPE:
-                    self.add_generalization_set(element)
-                else:
-                    self.add_relation(element)
+    def add_elements(self, elements: Iterable[dict]):
+        """
+        Adds elements of the model to the Graph
+        :param elements: json objects of entities, relations and generalization sets
+        """
+        for element in elements:
+            if element["type"] == CLASS_TYPE:
+                self.add_entity(element)
+            elif element["type"] == GEN_SET_TYPE:
+                self.add_generalization_set(element)
+            else:
+                self.add_relation(element)
 
-        # creating all diagrams and adding views to the elements
-        if project["diagrams"]:
-            for diagram in project["diagrams"]:
-                d = Diagram(diagram)
-                if diagram["contents"]:
-                    views = {}
-                    for view in diagram["contents"]:
-                        v = View(view, d.id)
-                        if self.attach_view(v):  # add View to the corresponding element
-                            views[v.id] = v  # if was successfully added, then also add to the Diagram
-                    d.elements = views  # save all those Views in the Diagram
-                self._diagrams[d.id] = d
+    def add_diagrams(self, diagrams: Iterable[dict]):
+        """
+        Adds diagrams to the Graph and their views to the elements, should be called after all elements are added
+        :param diagrams: json objects of diagrams
+        """
+        for diagram in diagrams:
+            d = Diagram(diagram)
+            if diagram["contents"]:
+                views = {}
+                for view in diagram["contents"]:
+                    v = View(view, d.id)
+                    if self.attach_view(v):  # add View to the corresponding element
+                        views[v.id] = v  # if was successfully added, then also add to the Diagram
+                d.elements = views  # save all those Views in the Diagram
+            self._diagrams[d.id] = d
 
         for diagram in self._diagrams.values():
             for view in diagram.elements.values():
@@ -73,16 +123,19 @@ class JSONGraph(BaseGraph, Element):
                         else:
                             self.logger.error(f"Check inversion of relation {relation.id}")
 
-    def _add_to_stack(self, name: str) -> bool:
+    @staticmethod
+    def _run(steps: Generator):
         """
-        Check if there is a possibility of recursion
-        :param name: name of the Entity for the abstraction
-        :return: True if was not processed before
+        Executes steps of the abstraction with an explicit stack instead of recursion:
+        each step could yield other steps, that are executed before it continues
+        :param steps: generator of the abstraction, e.g. _fold_entity_steps
         """
-        if name not in self._stack:
-            self._stack.append(name)
-            return True
-        return False
+        stack = [steps]
+        while stack:
+            try:
+                stack.append(next(stack[-1]))
+            except StopIteration:
+                stack.pop()
 
     def get_rule(self) -> str:
         """
@@ -113,24 +166,28 @@ class JSONGraph(BaseGraph, Element):
     ------------------------------------------------------------
     """
 
-    def get_all_elements(self, contents: dict) -> List:
-        """
-        Forms a list of all model elements (entities, relations),
-        Packages themselves are ignored, but their content is processed.
-        N.B. Recursive function
-        :param contents: dict of all content
-        :return: list of separated json objects (~ all elements)
-        """
-        if not contents:
-            return []
-
-        result = []
-        for content in contents:
-            if content["type"] == PACKAGE_TYPE:
-                result += self.get_all_elements(content["contents"])
+    @staticmethod
+    def iter_elements(model: Model, contents: dict) -> Generator[dict, None, None]:
+        """
+        Walks the tree of Packages once, depth-first with an explicit stack.
+        Nested Packages are added to their Models, all other elements (entities, relations) are yielded
+        in the order they appear in the tree
+        :param model: Model (or Package) created for the contents
+        :param contents: json of the Model, with all Packages and elements in it
+        :return: generator of json objects of elements
+        """
+        stack = [(model, iter(contents["contents"] or []))]
+        while stack:
+            package, elements = stack[-1]
+            for element in elements:
+                if element["type"] == PACKAGE_TYPE:
+                    nested = Model(element)
+                    package.add_package(nested)
+                    stack.append((nested, iter(element["contents"] or [])))
+                    break  # continue with the nested Package, the rest of this one is processed later
+                yield element
             else:
-                result += [content]
-        return result
+                stack.pop()
 
     def _existing_entity(self, _id) -> Entity | None:
         """
@@ -151,13 +208,14 @@ class JSONGraph(BaseGraph, Element):
         entity = self._existing_entity(element["id"])
         if entity:  # this entity was already created by relation
             entity.update(element)
+            self._hierarchy.invalidate([entity.id])  # stereotype could be changed
         else:  # entity with this id does not exist
             entity = Entity(element)
             self._entity_ids[entity.id] = entity
-        if entity.stereotype in self._entities:
-            self._entities[entity.stereotype].append(entity)
-        else:
-            self._entities[entity.stereotype] = [entity]
+        if entity.stereotype not in self._entities:
+            self._entities[entity.stereotype] = ElementBucket()
+        self._entities[entity.stereotype].add(entity)
+        self._add_candidate(entity)
 
     def _get_entity(self, _id: str) -> Entity:
         """
@@ -221,12 +279,65 @@ class JSONGraph(BaseGraph, Element):
                         relation.invert()
                         entity_from, entity_to = entity_to, entity_from
 
-            self._relations[_type].append(relation)
+            self._relations[_type].add(relation)
             self._relation_ids[relation.id] = relation
+            self._add_to_pairs(relation)
+            self._add_candidate(relation)
+            if _type == GENERAL_TYPE:
+                self._invalidate_hierarchy([relation])
 
             # create link between nodes
             entity_from.add_outgoing(_type, relation.id)
             entity_to.add_incoming(_type, relation.id)
+            self._adjacency.add(relation.id, _type, entity_from.id, entity_to.id)
+
+    @staticmethod
+    def _get_candidate_kind(element: Entity | Relation | Generalization) -> str | None:
+        """
+        Returns the kind of the element in the worklist of next_abstraction
+        """
+        if isinstance(element, Entity):
+            return element.stereotype
+        if (element.type == PART_OF_TYPE) and (element.stereotype == RelationStereotype.MEMBER_OF.value):
+            return None  # MEMBER_OF relations are kept
+        return element.type
+
+    def _add_candidate(self, element: Entity | Relation | Generalization):
+        self._worklist.add(self._get_candidate_kind(element), element.id)
+
+    def _del_candidate(self, element: Entity | Relation | Generalization):
+        self._worklist.discard(self._get_candidate_kind(element), element.id)
+
+    @staticmethod
+    def _get_pair_key(from_id: str, to_id: str, relation_type: EdgeType) -> tuple:
+        """
+        Returns key of the relation_pairs index, the order of entities is not important
+        """
+        return (from_id, to_id, relation_type) if from_id <= to_id else (to_id, from_id, relation_type)
+
+    def _add_to_pairs(self, relation: Relation | Generalization):
+        key = self._get_pair_key(relation.from_entity.id, relation.to_entity.id, relation.type)
+        if key in self._relation_pairs:
+            self._relation_pairs[key].add(relation.id)
+        else:
+            self._relation_pairs[key] = EdgeSet({relation.id: None})
+
+    def _del_from_pairs(self, relation: Relation | Generalization):
+        key = self._get_pair_key(relation.from_entity.id, relation.to_entity.id, relation.type)
+        relations = self._relation_pairs.get(key)
+        if relations and (relation.id in relations):
+            relations.remove(relation.id)
+            if not relations:
+                del self._relation_pairs[key]
+
+    def _get_relations_between(self, from_entity: Entity, to_entity: Entity, relation_type: EdgeType) -> EdgeSet:
+        """
+        Returns ids of relations of the given type between two Entities in any direction
+        :param from_entity: one Node of the relation
+        :param to_entity: another Node of the relation
+        :param relation_type: PART_OF_TYPE | GENERAL_TYPE | RELATION_TYPE
+        """
+        return self._relation_pairs.get(self._get_pair_key(from_entity.id, to_entity.id, relation_type), EdgeSet())
 
     def _get_generalization(self, _id: str) -> Generalization:
         """
@@ -254,8 +365,17 @@ class JSONGraph(BaseGraph, Element):
         self._generalization_set_ids[generalization_set.id] = generalization_set
         for generalization in generalizations:
             generalization.add_to_set(generalization_set.id)
+        self._invalidate_hierarchy(generalizations)
         return generalization_set.id
 
+    def _invalidate_hierarchy(self, generalizations: List[Generalization]):
+        """
+        Forgets closures over generalizations that pass through entities of the given Generalizations
+        :param generalizations: changed Generalizations
+        """
+        self._hierarchy.invalidate([entity.id for generalization in generalizations
+                                    for entity in (generalization.from_entity, generalization.to_entity) if entity])
+
     def attach_view(self, view: View) -> bool:
         """
         Adds the given View to the corresponding Element
@@ -285,40 +405,46 @@ class JSONGraph(BaseGraph, Element):
     """
 
     def to_json(self) -> dict:
+        """
+        Exports the current project to the json format. Json of elements and views is reused from the previous
+        export, if they were not changed, so the result should not be changed in place
+        """
         project_json = Element.to_json(self)
         project_json["model"] = self._model.to_json()
 
         element_list = []
         if self._entity_ids:
             for entity in self._entity_ids.values():
-                element_list.append(entity.to_json())
+                element_list.append(entity.get_json())
 
         if self._relation_ids:
             for relation in self._relation_ids.values():
-                element_list.append(relation.to_json())
+                element_list.append(relation.get_json())
 
         if self._generalization_set_ids:
             for generalization_set in self._generalization_set_ids.values():
-                element_list.append(generalization_set.to_json())
+                element_list.append(generalization_set.get_json())
 
         project_json["model"]["contents"] += element_list
         project_json["diagrams"] = [diagram.to_json() for diagram in self._diagrams.values()]
 
         return project_json
 
-    def to_expo(self, max_height: int, max_width: int) -> dict:
+    def to_expo(self, max_height: int, max_width: int, with_origin: bool = True) -> dict:
         """
         Exports the current project to the Expo format
         :param max_height: maximum height of the canvas
         :param max_width: maximum width of the canvas
+        :param with_origin: include the project in the json format
         :return: dict with the Expo project
         """
         result = {
             "rule": self.get_rule(),
-            "graph": {"nodes": [], "links": []},
-            "origin": self.to_json(),
-            "constraints": []
+            "graph": {"nodes": [], "links": []}
         }
+        if with_origin:
+            result["origin"] = self.to_json()
+        result["constraints"] = []
 
         height = max_height
         width = max_width
@@ -409,6 +535,13 @@ class JSONGraph(BaseGraph, Element):
         result += "\n----------------------------------------------------------------------"
         return result
 
+    def get_number_of_elements(self) -> int:
+        """
+        Returns number of all elements in the graph, including views
+        """
+        return len(self._entity_ids) + len(self._relation_ids) + len(self._generalization_set_ids) + \
+            sum(len(diagram.elements) for diagram in self._diagrams.values())
+
     def to_row(self):
         return [
             len(self._entity_ids.values()),
@@ -439,6 +572,7 @@ class JSONGraph(BaseGraph, Element):
         """
         generalization_set = self._generalization_set_ids.pop(_id)
         self._remove_views(generalization_set.views)
+        self._invalidate_hierarchy(generalization_set.generalizations)
         for generalization in generalization_set.generalizations:
             self._relation_ids[generalization.id].remove_from_set()
 
@@ -451,19 +585,25 @@ class JSONGraph(BaseGraph, Element):
         relation = self._relation_ids.pop(_id)
         _type = relation.type
         self._relations[_type].remove(relation)
+        self._del_from_pairs(relation)
+        self._del_candidate(relation)
 
         # delete views
         self._remove_views(relation.views)
 
-        # remove from outgoing
-        self._entity_ids[relation.from_entity.id].del_outgoing(_type, relation.id)
-        # remove from incoming
-        self._entity_ids[relation.to_entity.id].del_incoming(_type, relation.id)
+        # remove from outgoing and incoming, ends could be already removed in case of recursion
+        if relation.from_entity.id in self._entity_ids:
+            self._entity_ids[relation.from_entity.id].del_outgoing(_type, relation.id)
+        if relation.to_entity.id in self._entity_ids:
+            self._entity_ids[relation.to_entity.id].del_incoming(_type, relation.id)
+        self._adjacency.remove(relation.id)
 
         if _type == GENERAL_TYPE:
+            self._invalidate_hierarchy([relation])
             # remove from generalization set
             if relation.set:
                 generalization_set = self._generalization_set_ids[relation.set]
+                self._invalidate_hierarchy(generalization_set.generalizations)  # completeness could be changed
                 # delete completeness if there was any
                 # and remove generalization from the set
                 generalization_set.del_generalization(relation)
@@ -488,11 +628,65 @@ class JSONGraph(BaseGraph, Element):
 
             # pop entity from dictionary
             self._entity_ids.pop(_id)
+            self._hierarchy.invalidate([_id])
             if entity.stereotype in self._entities:
                 self._entities[entity.stereotype].remove(entity)
+            self._del_candidate(entity)
             # remove views
             self._remove_views(entity.views)
 
+    def _extract_subgraph(self, entity_ids: set):
+        """
+        Keeps only the given Entities and relations between them, the result is the same
+        as after deleting all other Entities, but the containers are rebuilt at once
+        instead of deleting elements one by one
+        :param entity_ids: ids of Entities to keep
+        """
+        # relations between kept Entities, prototypes of Generalizations are never deleted
+        relation_ids = {_id for _id, relation in self._relation_ids.items() if relation.from_entity is None}
+        for _id in entity_ids:
+            for edge in self._entity_ids[_id].iter_out_edges():
+                if self._relation_ids[edge].to_entity.id in entity_ids:
+                    relation_ids.add(edge)
+
+        # generalization sets lose deleted generalizations, and are deleted with less than 2 of them
+        set_ids = set()
+        for generalization_set in self._generalization_set_ids.values():
+            deleted = [g for g in generalization_set.generalizations if g.id not in relation_ids]
+            for generalization in deleted:
+                generalization_set.del_generalization(generalization)
+            if deleted and (len(generalization_set.generalizations) < 2):
+                for generalization in generalization_set.generalizations:
+                    generalization.remove_from_set()
+            else:
+                set_ids.add(generalization_set.id)
+
+        # views of deleted elements are removed from diagrams
+        deleted_ids = (self._entity_ids.keys() - entity_ids) | (self._relation_ids.keys() - relation_ids) | \
+                      (self._generalization_set_ids.keys() - set_ids)
+        for diagram in self._diagrams.values():
+            diagram.elements = {view_id: view for view_id, view in diagram.elements.items()
+                                if view.element["id"] not in deleted_ids}
+
+        for _id in entity_ids:
+            self._entity_ids[_id].retain_edges(relation_ids)
+        self._adjacency.retain(relation_ids)
+        self._entity_ids = {_id: entity for _id, entity in self._entity_ids.items() if _id in entity_ids}
+        self._entities = {stereotype: ElementBucket(entity for entity in entities if entity.id in entity_ids)
+                          for stereotype, entities in self._entities.items()}
+        self._relation_ids = {_id: relation for _id, relation in self._relation_ids.items() if _id in relation_ids}
+        self._relations = {_type: ElementBucket(relation for relation in relations if relation.id in relation_ids)
+                           for _type, relations in self._relations.items()}
+        self._relation_pairs = {key: relations for key, relations in self._relation_pairs.items()
+                                if (key[0] in entity_ids) and (key[1] in entity_ids)}
+        self._generalization_set_ids = {_id: generalization_set for _id, generalization_set
+                                        in self._generalization_set_ids.items() if _id in set_ids}
+        self._hierarchy.clear()
+        self._worklist.clear()
+        for elements in [*self._relations.values(), *self._entities.values()]:
+            for element in elements:
+                self._add_candidate(element)
+
     def _create_relation(self, source: Entity, target: Entity, source_view: View,
                          target_view: View, diagram_id: str, name: str = None,
                          cardinality_from: str = None, cardinality_to: str = None):
@@ -561,40 +755,32 @@ class JSONGraph(BaseGraph, Element):
     ------------------------------------------------------------
     """
 
-    def focus(self, node: str, hop: int):
+    def focus(self, node: str | List[str], hop: int, edge_types: List[str] = None):
         """
-        Focuses on the given node and
-        shows only those concepts that are connected to it with the given hop
-        :param node: id of the node for focusing
+        Focuses on the given node(s) and
+        shows only those concepts that are connected to them with the given hop
+        :param node: id of the node for focusing, or list of ids
         :param hop: number of links within the focus
+        :param edge_types: types of links to follow ('PartOf', 'Relation', 'Generalization'), all if not given
         """
-        if node not in self._entity_ids:
-            raise ValueError(f"Concept with id='{node}' does not exist")
+        nodes = [node] if isinstance(node, str) else node
+        for _id in nodes:
+            if _id not in self._entity_ids:
+                raise ValueError(f"Concept with id='{_id}' does not exist")
 
-        focus_nodes = self._get_focus_nodes(node, hop)
-        other_nodes = self._entity_ids.keys() - focus_nodes
-        for node in other_nodes:
-            self.delete_entity(node)
+        self._extract_subgraph(self._get_focus_nodes(nodes, hop, edge_types))
 
-    def _get_focus_nodes(self, node: str, hop: int) -> List[str]:
+    def _get_focus_nodes(self, nodes: List[str], hop: int, edge_types: List[str] = None) -> set:
         """
-        Returns a set of nodes that are connected to the given node with the given hop
-        :param node: id of the node for focusing
+        Returns a set of nodes that are connected to any of the given nodes with at most the given hop,
+        each node is expanded only once (breadth-first search)
+        :param nodes: ids of the nodes for focusing
         :param hop: number of links within the focus
-        :return: list of ids of nodes in focus
+        :param edge_types: types of links to follow, all if not given
+        :return: set of ids of nodes in focus
         """
-        nodes = [node]
-        idx = 0
-        while hop > 0:
-            length = len(nodes)
-            while idx < length:
-                for edge in self._entity_ids[nodes[idx]].get_out_edges():
-                    nodes.append(self._relation_ids[edge].to_entity.id)
-                for edge in self._entity_ids[nodes[idx]].get_in_edges():
-                    nodes.append(self._relation_ids[edge].from_entity.id)
-                idx += 1
-            hop -= 1
-        return nodes
+        edge_types = edge_types if edge_types else [PART_OF_TYPE, RELATION_TYPE, GENERAL_TYPE]
+        return self._adjacency.get_reachable(nodes, hop, edge_types)
 
     def cluster(self, node: str):
         """
@@ -608,105 +794,198 @@ class JSONGraph(BaseGraph, Element):
             # raise ValueError(f"Concept with id='{node}' is not a RELATOR")
             self.logger.warning(f"Concept with id='{node}' is not a RELATOR")
         else:  # cluster on relator
-            cluster_nodes = self._get_cluster_nodes(node)
-            other_nodes = self._entity_ids.keys() - cluster_nodes
-            for node in other_nodes:
-                self.delete_entity(node)
+            self._extract_subgraph(self._get_cluster_nodes(node, {}))
 
-    def _get_cluster_nodes(self, relator: str) -> List[str]:
+    def get_clusters(self) -> dict:
         """
-        Returns a set of nodes that belong to the cluster
-        :param node: id of the RELATOR node
-        :return: list of ids of nodes in cluster
+        Calculates clusters of all relators at once, hierarchies are calculated only once
+        :return: dict relator id -> list of ids of nodes in its cluster
         """
-        nodes = self._get_bottom_hierarchy(relator)  # in case the relator has a hierarchy
+        memo = {}
+        order = {_id: idx for idx, _id in enumerate(self._entity_ids)}
+        result = {}
+        for relator in self._entities.get(ClassStereotype.RELATOR.value, []):
+            result[relator.id] = sorted(self._get_cluster_nodes(relator.id, memo), key=order.__getitem__)
+        return result
+
+    def _get_cluster_nodes(self, relator: str, memo: dict) -> set:
+        """
+        Returns a set of nodes that belong to the cluster,
+        including clusters of all (directly or indirectly) mediated relators
+        :param relator: id of the RELATOR node
+        :param memo: own parts of clusters, shared between calls
+        :return: set of ids of nodes in cluster
+        """
+        nodes = set()
+        relators = [relator]
+        visited = {relator}
+        while relators:  # relators could mediate each other, so the visited set is needed
+            own_nodes, mediated_relators = self._get_own_cluster_nodes(relators.pop(), memo)
+            nodes |= own_nodes
+            for mediated_relator in mediated_relators:
+                if mediated_relator not in visited:
+                    visited.add(mediated_relator)
+                    relators.append(mediated_relator)
+        return nodes
+
+    def _get_own_cluster_nodes(self, relator: str, memo: dict) -> (set, List[str]):
+        """
+        Returns nodes of the cluster without clusters of mediated relators
+        :param relator: id of the RELATOR node
+        :param memo: own parts of clusters, relator id -> (set, list)
+        :return: set of ids of nodes, list of ids of mediated relators
+        """
+        if relator in memo:
+            return memo[relator]
+
+        nodes = set(self._get_bottom_hierarchy(relator))  # in case the relator has a hierarchy
         mediated = []
-        for node in nodes:
+        for node in list(nodes):
             for edge in self._entity_ids[node].get_out_edges(edge_type="Relation"):
                 if self._relation_ids[edge].stereotype == RelationStereotype.MEDIATION.value:
                     # include mediated entities in list
                     mediated.append(self._relation_ids[edge].to_entity.id)
 
+        mediated_relators = []
         for node in mediated:
             if self._entity_ids[node].stereotype == ClassStereotype.RELATOR.value:  # if mediates other RELATOR
-                nodes.extend([n for n in self._get_cluster_nodes(node) if n not in nodes])  # recursion
+                mediated_relators.append(node)
             elif self._entity_ids[node].stereotype in NON_SORTAL_STEREOTYPES:
-                new_nodes = self._get_bottom_hierarchy(node)  # get all bottom concepts
-                for new_node in new_nodes:  # for each find a top hierarchy
-                    nodes.extend([n for n in self._get_top_hierarchy(new_node) if n not in nodes])
+                for new_node in self._get_bottom_hierarchy(node):  # for each bottom concept
+                    nodes |= self._get_top_hierarchy(new_node)  # find a top hierarchy
             elif self._entity_ids[node].stereotype in SORTAL_STEREOTYPES:
-                nodes.extend([n for n in self._get_top_hierarchy(node) if n not in nodes]) # get top hierarchy
-        return nodes
+                nodes |= self._get_top_hierarchy(node)  # get top hierarchy
 
-    def _get_top_hierarchy(self, node: str) -> List[str]:
+        memo[relator] = (nodes, mediated_relators)
+        return memo[relator]
+
+    def _get_upper_nodes(self, node: str) -> List[str]:
         """
-        Returns a list of nodes that include all concepts upto Kind level
+        Returns nodes that are more general than the given one upto Kind level,
+        together with the nodes from complete and disjoint GeneralizationSets
         :param node: id of the node
-        :return: list of ids of nodes in hierarchy starting from the given node
+        :return: list of ids of nodes
         """
-        nodes = [node]
-        idx = 0
-
-        while idx < len(nodes):
-            if self._entity_ids[nodes[idx]].stereotype and \
-               (not self._entity_ids[nodes[idx]].stereotype in KINDS_STEREOTYPES):
-                out_edges = self._entity_ids[nodes[idx]].get_out_edges(edge_type="Generalization")
-                for out_edge in out_edges:
-                    top_concept = self._relation_ids[out_edge].to_entity.id
-                    nodes.extend([n for n in self._get_bottom_hierarchy(top_concept, out_edge) if n not in nodes])
-            idx += 1
+        nodes = []
+        entity = self._entity_ids[node]
+        if entity.stereotype and (entity.stereotype not in KINDS_STEREOTYPES):
+            for out_edge in entity.get_out_edges(edge_type="Generalization"):
+                generalization = self._relation_ids[out_edge]
+                nodes.append(generalization.to_entity.id)
+                if generalization.set and self._generalization_set_ids[generalization.set].is_complete_and_disjoint():
+                    # each Generalization in the set
+                    for gen in self._generalization_set_ids[generalization.set].generalizations:
+                        nodes.append(self._relation_ids[gen.id].from_entity.id)
         return nodes
 
-    def _get_bottom_hierarchy(self, node: str, desc_edge: str = "") -> List[str]:
+    def _get_lower_nodes(self, node: str) -> List[str]:
         """
-        Returns a list of bottom concepts in the hierarchy
-        If desc_edge is given, returns only those concepts that are in the same GeneralizationSet
+        Returns nodes that are generalized to the given one, if it is NON_SORTAL or RELATOR
         :param node: id of the node
-        :param desc_edge: id of the generalization edge, optional
-        :return: list of ids of nodes in hierarchy starting from the given node
-        """
-        nodes = [node]
-        if desc_edge:  # if there is an edge in which one we are interested
-            set_id = self._relation_ids[desc_edge].set
-            if not set_id:  # if it is not in GeneralizationSet
-                nodes.append(self._relation_ids[desc_edge].from_entity.id)
-            else:
-                if self._generalization_set_ids[set_id].is_complete_and_disjoint():
-                    gens = self._generalization_set_ids[set_id].generalizations
-                    for gen in gens:  # for each Generalization in the set
-                        nodes.append(self._relation_ids[gen.id].from_entity.id)
-                else:  # if GS is not complete and disjoint
-                    nodes.append(self._relation_ids[desc_edge].from_entity.id)
-        else:  # return all concepts that are generalized to this one
-            idx = 0
-            while idx < len(nodes):
-                if self._entity_ids[nodes[idx]].stereotype in NON_SORTAL_STEREOTYPES + [ClassStereotype.RELATOR.value]:
-                    for edge in self._entity_ids[nodes[idx]].get_in_edges(edge_type="Generalization"):
-                        nodes.append(self._relation_ids[edge].from_entity.id)
-                idx += 1
+        :return: list of ids of nodes
+        """
+        nodes = []
+        entity = self._entity_ids[node]
+        if entity.stereotype in NON_SORTAL_STEREOTYPES + [ClassStereotype.RELATOR.value]:
+            nodes = self._adjacency.get_neighbours(node, GENERAL_TYPE, INCOMING)
         return nodes
 
+    def _get_parent_nodes(self, node: str) -> List[str]:
+        """
+        Returns direct general nodes of the given one, if it is not of Kind level
+        :param node: id of the node
+        :return: list of ids of nodes
+        """
+        entity = self._entity_ids[node]
+        if entity.stereotype in KINDS_STEREOTYPES:
+            return []
+        return self._adjacency.get_neighbours(node, GENERAL_TYPE, OUTGOING)
+
+    def _get_child_nodes(self, node: str) -> List[str]:
+        """
+        Returns direct specific nodes of the given one
+        :param node: id of the node
+        :return: list of ids of nodes
+        """
+        return self._adjacency.get_neighbours(node, GENERAL_TYPE, INCOMING)
+
+    def _get_specific_sets(self, node: str) -> tuple:
+        """
+        Returns GeneralizationSets of the specific nodes of the given one
+        :param node: id of the node
+        :return: tuple of ids of GeneralizationSets in the order of generalizations
+        """
+        return tuple(dict.fromkeys(self._relation_ids[_id].set for _id in self._entity_ids[node].in_edges[GENERAL_TYPE]
+                                   if self._relation_ids[_id].set))
+
+    def get_ancestors(self, node: str) -> frozenset:
+        """
+        Returns all general nodes of the given one upto Kind level
+        :param node: id of the node
+        :return: set of ids of nodes, including the given one
+        """
+        return self._hierarchy.get("ancestors", node)
+
+    def get_descendants(self, node: str) -> frozenset:
+        """
+        Returns all specific nodes of the given one
+        :param node: id of the node
+        :return: set of ids of nodes, including the given one
+        """
+        return self._hierarchy.get("descendants", node)
+
+    def get_generalization_sets(self, node: str) -> tuple:
+        """
+        Returns GeneralizationSets in which the given node is the general one
+        :param node: id of the node
+        :return: tuple of ids of GeneralizationSets
+        """
+        return self._hierarchy.get_value("sets", node)
+
+    def _get_top_hierarchy(self, node: str) -> frozenset:
+        """
+        Returns a set of nodes that include all concepts upto Kind level
+        :param node: id of the node
+        :return: set of ids of nodes in hierarchy starting from the given node
+        """
+        return self._hierarchy.get("top", node)
+
+    def _get_bottom_hierarchy(self, node: str) -> frozenset:
+        """
+        Returns a set of bottom concepts in the hierarchy
+        :param node: id of the node
+        :return: set of ids of nodes in hierarchy starting from the given node
+        """
+        return self._hierarchy.get("bottom", node)
+
     def fold_entity(self, entity: Entity, next_only: bool, long_names: bool, mult_relations: bool, part_of_only: bool = False):
         """
         Collapses all parthoods and hierarchies to the Entity itself
-        N.B. Recursive function
         :param entity: Entity that should be folded
         :param next_only: apply only one rule of abstraction
         :param long_names: modify names with 's
         :param mult_relations: create multiple relations between Entities
         :param part_of_only: if True, then only part_of relations are folded
         """
+        self._run(self._fold_entity_steps(entity, next_only, long_names, mult_relations, part_of_only))
+
+    def _fold_entity_steps(self, entity: Entity, next_only: bool, long_names: bool, mult_relations: bool,
+                           part_of_only: bool = False) -> Generator:
+        """
+        Steps of fold_entity, Entities that are being folded are skipped to avoid cycles
+        """
         self.logger.info(f"Folding {entity.name}")
-        if self._add_to_stack(entity.name):
+        if entity.id not in self._folding_ids:
+            self._folding_ids.add(entity.id)
 
             # abstract parthood
             idx = 0
             while self._continue_abstracting(next_only) and (idx < len(entity.in_edges[PART_OF_TYPE])):
-                _id = entity.in_edges[PART_OF_TYPE][idx]
+                _id = entity.in_edges[PART_OF_TYPE].nth(idx)
                 if _id in self._relation_ids:
                     relation = self._relation_ids[_id]
                     if relation.stereotype != RelationStereotype.MEMBER_OF.value:
-                        self.abstract_parthood(relation, next_only, long_names, mult_relations)
+                        yield self._abstract_parthood_steps(relation, next_only, long_names, mult_relations)
                     else:
                         idx += 1
                 else:
@@ -715,19 +994,19 @@ class JSONGraph(BaseGraph, Element):
             # hierarchy abstraction
             if not part_of_only:
                 # get all from NON_SORTALS
-                for out_id in copy.copy(entity.out_edges[GENERAL_TYPE]):
+                for out_id in list(entity.out_edges[GENERAL_TYPE]):
                     if self._continue_abstracting(next_only):
                         if out_id in self._relation_ids:
                             out_relation = self._relation_ids[out_id]
                             if out_relation.to_entity.stereotype in NON_SORTAL_STEREOTYPES:
-                                self.abstract_hierarchy(out_relation, next_only, long_names, mult_relations)
+                                yield self._abstract_hierarchy_steps(out_relation, next_only, long_names, mult_relations)
                 # get all from lower levels
                 while self._continue_abstracting(next_only) and entity.in_edges[GENERAL_TYPE]:
-                    _id = entity.in_edges[GENERAL_TYPE][0]
-                    self.abstract_hierarchy(self._relation_ids[_id], next_only, long_names, mult_relations)
+                    _id = entity.in_edges[GENERAL_TYPE].nth(0)
+                    yield self._abstract_hierarchy_steps(self._relation_ids[_id], next_only, long_names, mult_relations)
 
             self._clear_abstracted_entities()
-            self._stack.pop(-1)
+            self._folding_ids.discard(entity.id)
 
     def fold(self, node: str, long_names: bool, mult_relations: bool):
         """
@@ -768,7 +1047,8 @@ class JSONGraph(BaseGraph, Element):
 
     def get_hierarchy(self, node: str) -> dict:
         """
-        Returns the hierarchy of the node by the given index
+        Returns the hierarchy of the node by the given index,
+        each specific node is visited once, even if it has several general nodes
         """
         result = {"nodes": {}, "sets": {}}
         nodes = []
@@ -776,26 +1056,28 @@ class JSONGraph(BaseGraph, Element):
         name, stereotype = node.split(INDEX_DELIMITER)
         for entity in self._entities[stereotype]:
             if self._clear_name(entity.name) == name:
-                nodes.append(entity)
+                nodes.append(entity.id)
                 break
 
+        visited = set(nodes)
         idx = 0
         while idx < len(nodes):
-            node_idx = self.get_node_index(nodes[idx].id)
+            node_idx = self.get_node_index(nodes[idx])
             if node_idx not in result["nodes"]:
                 result["nodes"][node_idx] = []
-            for edge in nodes[idx].get_in_edges(edge_type="Generalization"):
-                generalization = self._relation_ids[edge]
-                nodes.append(self._entity_ids[generalization.from_entity.id])
-                from_idx = self.get_node_index(generalization.from_entity.id)
-                result["nodes"][node_idx].append(from_idx)
-                if generalization.set:
-                    set_id = generalization.set
-                    if set_id not in result["sets"]:
-                        result["sets"][set_id] = {"to": node_idx, "from": [],
-                                                  "complete": self._generalization_set_ids[set_id].is_complete(),
-                                                  "disjoint": self._generalization_set_ids[set_id].is_disjoint()}
-                    result["sets"][set_id]["from"].append(from_idx)
+            for edge in self._entity_ids[nodes[idx]].get_in_edges(edge_type=GENERAL_TYPE):
+                specific = self._relation_ids[edge].from_entity.id
+                if specific not in visited:
+                    visited.add(specific)
+                    nodes.append(specific)
+                result["nodes"][node_idx].append(self.get_node_index(specific))
+            for set_id in self.get_generalization_sets(nodes[idx]):
+                generalization_set = self._generalization_set_ids[set_id]
+                result["sets"][set_id] = {"to": node_idx,
+                                          "from": [self.get_node_index(generalization.from_entity.id)
+                                                   for generalization in generalization_set.generalizations],
+                                          "complete": generalization_set.is_complete(),
+                                          "disjoint": generalization_set.is_disjoint()}
             idx += 1
 
         return result
@@ -864,10 +1146,14 @@ class JSONGraph(BaseGraph, Element):
         :param to_node: general node
         :param from_node: specific node
         :param diagrams: diagrams to add the node to
+        :return: created or existing Generalization, None if it would create a cycle
         """
-        for edge in to_node.get_in_edges(edge_type="Generalization"):
+        for edge in self._get_relations_between(from_node, to_node, GENERAL_TYPE):
             if self._relation_ids[edge].from_entity.id == from_node.id:
                 return self._relation_ids[edge]
+        if to_node.id in self.get_descendants(from_node.id):
+            self.logger.warning(f"Generalization from {from_node.name} to {to_node.name} would create a cycle")
+            return None
 
         relation_dict = Generalization.init_generalization(from_node.id, to_node.id)
         relation_id = relation_dict["id"]
@@ -892,9 +1178,10 @@ class JSONGraph(BaseGraph, Element):
         """
         generalizations = []
         for node in gen_set["from"]:
-            generalizations.append(gen_idx[gen_set["to"]+node])
+            if gen_idx[gen_set["to"]+node]:  # generalizations that create cycles are skipped
+                generalizations.append(gen_idx[gen_set["to"]+node])
 
-        if not generalizations[0].set:
+        if (len(generalizations) > 1) and not generalizations[0].set:
             gen_set_dict = GeneralizationSet.init_generalization_set(
                 generalizations, gen_set["complete"], gen_set["disjoint"])
             gen_set_id = self.add_generalization_set(gen_set_dict)
@@ -925,18 +1212,23 @@ class JSONGraph(BaseGraph, Element):
         :param role_to: new role name for to-end, if given
         :return: id of new relation
         """
-        new_relation = copy.deepcopy(relation)
+        new_relation = relation.clone()
         new_id = new_relation.update_ids(self._diagrams)  # update ids also in views
         # adding to dictionaries
         self._relation_ids[new_id] = new_relation
         _type = new_relation.type
-        self._relations[_type].append(new_relation)
+        self._relations[_type].add(new_relation)
         # move relation if needed
         if new_from or new_to:
             new_relation.move(new_from, new_to, self._diagrams, new_name, role_from, role_to)
         # adds relation to new Entities
         self._entity_ids[new_relation.from_entity.id].add_outgoing(_type, new_id)
         self._entity_ids[new_relation.to_entity.id].add_incoming(_type, new_id)
+        self._adjacency.add(new_id, _type, new_relation.from_entity.id, new_relation.to_entity.id)
+        self._add_to_pairs(new_relation)
+        self._add_candidate(new_relation)
+        if _type == GENERAL_TYPE:
+            self._invalidate_hierarchy([new_relation])
         return new_id
 
     def _check_for_existence_by_prototype(self, mult_relations: bool, relation: Relation | Generalization,
@@ -968,22 +1260,15 @@ class JSONGraph(BaseGraph, Element):
         :param relation_name: name to be checked
         :return: Relation | Generalization if found
         """
-        for candidate_id in set(from_entity.out_edges[relation_type] + to_entity.in_edges[relation_type] +
-                                from_entity.in_edges[relation_type] + to_entity.out_edges[relation_type]):
-            if candidate_id in self._relation_ids:
+        candidates = self._get_relations_between(from_entity, to_entity, relation_type)
+        if candidates and (not mult_relations):
+            return self._relation_ids[candidates.nth(0)]
+        if candidates and relation_name:
+            name_tokens = set(relation_name.lower().split(" "))
+            for candidate_id in candidates:
                 candidate_relation = self._relation_ids[candidate_id]
-                if ((candidate_relation.from_entity.id == from_entity.id) and
-                    (candidate_relation.to_entity.id == to_entity.id)) or (
-                        (candidate_relation.to_entity.id == from_entity.id) and
-                        (candidate_relation.from_entity.id == to_entity.id)):
-                    if not mult_relations:
-                        return candidate_relation
-                    elif relation_name and (
-                            (not candidate_relation.name) or (
-                            len(set.intersection(set(candidate_relation.name.lower().split(" ")),
-                                                 set(relation_name.lower().split(" ")))
-                                ) > 0)):
-                        return candidate_relation
+                if (not candidate_relation.name) or (not name_tokens.isdisjoint(candidate_relation.name_tokens)):
+                    return candidate_relation
         return None
 
     def _move_relation(self, is_from: bool, mult_relations: bool, relation: Relation | Generalization,
@@ -1036,7 +1321,8 @@ class JSONGraph(BaseGraph, Element):
     ------------------------------------------------------------
     """
 
-    def _abstract_generalization(self, generalization: Generalization, next_only: bool, long_names: bool, mult_relations: bool):
+    def _abstract_generalization_steps(self, generalization: Generalization, next_only: bool, long_names: bool,
+                                       mult_relations: bool) -> Generator:
         """
         Additional function that moves all relations from the specific entity upwards
         :param generalization: Generalization that should be abstracted
@@ -1047,19 +1333,28 @@ class JSONGraph(BaseGraph, Element):
         general_entity = generalization.to_entity
         specific_entity = generalization.from_entity
         self.logger.info(f"Abstracting generalization from {specific_entity.name} to {general_entity.name}")
-        self.fold_entity(specific_entity, next_only, long_names, mult_relations)
+        yield self._fold_entity_steps(specific_entity, next_only, long_names, mult_relations)
 
         if self._continue_abstracting(next_only):
-            for in_id in copy.copy(specific_entity.in_edges[RELATION_TYPE] + specific_entity.in_edges[PART_OF_TYPE]):
+            # in case of recursion fold could lead to deletion of general_entity or specific_entity,
+            # then the relations have nowhere to be moved and specific_entity keeps them
+            if (general_entity.id not in self._entity_ids) or (specific_entity.id not in self._entity_ids):
+                self.logger.error(ERR_RECURSION + f"{specific_entity.name}, {general_entity.name}")
+                if generalization.id in self._relation_ids:
+                    self.delete_relation(generalization.id)
+                return
+
+            for in_id in [*specific_entity.in_edges[RELATION_TYPE], *specific_entity.in_edges[PART_OF_TYPE]]:
                 role = None if self._relation_ids[in_id].role_to else specific_entity.name
                 self._move_relation(False, mult_relations, self._relation_ids[in_id], general_entity, new_role=role)
-            for out_id in copy.copy(specific_entity.out_edges[RELATION_TYPE] + specific_entity.out_edges[PART_OF_TYPE]):
+            for out_id in [*specific_entity.out_edges[RELATION_TYPE], *specific_entity.out_edges[PART_OF_TYPE]]:
                 role = None if self._relation_ids[out_id].role_from else specific_entity.name
                 self._move_relation(True, mult_relations, self._relation_ids[out_id], general_entity, new_role=role)
 
             # remove other entity only if there is no other up-going links
             if specific_entity.has_other_up_edges():
-                self.delete_relation(generalization.id)
+                if generalization.id in self._relation_ids:
+                    self.delete_relation(generalization.id)
                 if general_entity.stereotype not in NON_SORTAL_STEREOTYPES:
                     self._ids_to_be_abstracted.append(specific_entity.id)
             else:
@@ -1070,7 +1365,8 @@ class JSONGraph(BaseGraph, Element):
             else:
                 self.set_rule("H4")
 
-    def _process_generalization_set(self, gs: GeneralizationSet, next_only: bool, long_names: bool, mult_relations: bool):
+    def _process_generalization_set_steps(self, gs: GeneralizationSet, next_only: bool, long_names: bool,
+                                          mult_relations: bool) -> Generator:
         """
         Process GeneralizationSet abstraction if found
         :param gs: GeneralizationSet object
@@ -1088,15 +1384,17 @@ class JSONGraph(BaseGraph, Element):
         local_gs = copy.copy(gs.generalizations)
         for generalization in local_gs:
             if self._continue_abstracting(next_only):
-                self.fold_entity(generalization.from_entity, next_only, long_names, mult_relations)
+                yield self._fold_entity_steps(generalization.from_entity, next_only, long_names, mult_relations)
 
         if self._continue_abstracting(next_only):  # all specific entities are folded
             for generalization in local_gs:
                 if generalization.from_entity.stereotype in GS_STEREOTYPES:
                     literals.append(generalization.from_entity.name)
-                self._abstract_generalization(generalization, False, long_names, mult_relations)  # folded before
+                yield self._abstract_generalization_steps(generalization, False, long_names, mult_relations)  # folded before
 
-            if literals:
+            if literals and (source.id not in self._entity_ids):  # deleted in case of recursion
+                self.logger.error(ERR_RECURSION + source.name)
+            elif literals:
                 literals_obj = [Literal(literal).to_json() for literal in literals]
 
                 # check if there is already enumeration
@@ -1104,7 +1402,7 @@ class JSONGraph(BaseGraph, Element):
                     candidate_entity = self._relation_ids[_id].to_entity
                     if candidate_entity.stereotype == ClassStereotype.ENUMERATION.value:
                         literals_obj += candidate_entity.rest["literals"]
-                        if len(candidate_entity.get_out_edges()) + len(candidate_entity.get_in_edges()) > 1:
+                        if candidate_entity.get_number_of_edges() > 1:
                             self.delete_relation(_id)
                         else:
                             self.delete_entity(candidate_entity.id)
@@ -1124,21 +1422,27 @@ class JSONGraph(BaseGraph, Element):
         :param long_names: create names with 's
         :param mult_relations: create several relations between the same Entities
         """
+        self._run(self._abstract_hierarchy_steps(generalization, next_only, long_names, mult_relations))
+
+    def _abstract_hierarchy_steps(self, generalization: Generalization, next_only: bool, long_names: bool,
+                                  mult_relations: bool) -> Generator:
         general_entity = generalization.to_entity
 
         if general_entity.stereotype in NON_SORTAL_STEREOTYPES:  # H1 implementation
             self.logger.info(f"Pushing all relations from {general_entity.name} down")
-            self.fold_entity(general_entity, next_only, long_names, mult_relations, part_of_only=True)
+            yield self._fold_entity_steps(general_entity, next_only, long_names, mult_relations, part_of_only=True)
 
             if self._continue_abstracting(next_only):
                 # all specific entities that should receive new relations
                 specific_entities = [self._relation_ids[_id].from_entity for _id in general_entity.in_edges[GENERAL_TYPE]]
                 new_role = general_entity.name
-                for in_id in general_entity.in_edges[RELATION_TYPE]:
+                # in case of recursion general_entity is also specific and receives the moved relations,
+                # they should not be moved again
+                for in_id in list(general_entity.in_edges[RELATION_TYPE]):
                     relation = self._relation_ids[in_id]
                     for entity in specific_entities:
                         self._move_relation(False, mult_relations, relation, entity, new_role=new_role)
-                for out_id in general_entity.out_edges[RELATION_TYPE]:
+                for out_id in list(general_entity.out_edges[RELATION_TYPE]):
                     relation = self._relation_ids[out_id]
                     for entity in specific_entities:
                         self._move_relation(True, mult_relations, relation, entity, new_role=new_role)
@@ -1147,10 +1451,10 @@ class JSONGraph(BaseGraph, Element):
 
         else:  # need to go upwards
             if generalization.set:  # H3-H5
-                self._process_generalization_set(self._generalization_set_ids[generalization.set],
-                                                 next_only, long_names, mult_relations)
+                yield self._process_generalization_set_steps(self._generalization_set_ids[generalization.set],
+                                                             next_only, long_names, mult_relations)
             else:  # H2-H4
-                self._abstract_generalization(generalization, next_only, long_names, mult_relations)
+                yield self._abstract_generalization_steps(generalization, next_only, long_names, mult_relations)
 
     def abstract_hierarchies(self, long_names: bool, mult_relations: bool):
         """
@@ -1158,7 +1462,7 @@ class JSONGraph(BaseGraph, Element):
         """
         self.logger.debug("Abstracting all hierarchies")
         while self._relations[GENERAL_TYPE]:
-            self.abstract_hierarchy(self._relations[GENERAL_TYPE][0], False, long_names, mult_relations)
+            self.abstract_hierarchy(self._relations[GENERAL_TYPE].nth(0), False, long_names, mult_relations)
         self._clear_abstracted_entities()
 
     """
@@ -1175,6 +1479,10 @@ class JSONGraph(BaseGraph, Element):
         :param long_names: modify names with 's
         :param mult_relations: create multiple relations between Entities
         """
+        self._run(self._abstract_parthood_steps(relation, next_only, long_names, mult_relations))
+
+    def _abstract_parthood_steps(self, relation: Relation, next_only: bool, long_names: bool,
+                                 mult_relations: bool) -> Generator:
         whole_entity = relation.to_entity
         part_entity = relation.from_entity
         if whole_entity.id == part_entity.id:
@@ -1185,7 +1493,7 @@ class JSONGraph(BaseGraph, Element):
             return
 
         role_name = part_entity.name  # should be here in case of further changes
-        self.fold_entity(part_entity, next_only, long_names, mult_relations)
+        yield self._fold_entity_steps(part_entity, next_only, long_names, mult_relations)
         # could be that another rule was applied in fold
         if self._continue_abstracting(next_only):
             # TODO: check how the whole entity is deleted
@@ -1218,7 +1526,7 @@ class JSONGraph(BaseGraph, Element):
                     else:
                         name = new_name + candidate_relation.name if candidate_relation.name else new_name
                     self._move_relation(False, mult_relations, candidate_relation, whole_entity, name, role_name)
-                    self._relation_ids[in_id].rest["properties"][1]["cardinality"] = "1"
+                    self._relation_ids[in_id].set_cardinality_to("1")
 
                     if candidate_relation.from_entity.stereotype == ClassStereotype.EVENT.value:
                         self.set_rule("P4")
@@ -1235,7 +1543,7 @@ class JSONGraph(BaseGraph, Element):
                     else:
                         name = new_name + candidate_relation.name if candidate_relation.name else new_name
                     self._move_relation(True, mult_relations, candidate_relation, whole_entity, name, role_name)
-                    self._relation_ids[out_id].rest["properties"][0]["cardinality"] = "1"
+                    self._relation_ids[out_id].set_cardinality_from("1")
 
                     if candidate_relation.from_entity.stereotype == ClassStereotype.EVENT.value:
                         self.set_rule("P4")
@@ -1251,7 +1559,8 @@ class JSONGraph(BaseGraph, Element):
 
             # remove other entity only if there is no other up-going links
             if part_entity.has_other_up_edges():
-                self.delete_relation(relation.id)
+                if relation.id in self._relation_ids:  # could be moved while the part was folded
+                    self.delete_relation(relation.id)
             else:
                 self.delete_entity(part_entity.id)
 
@@ -1260,13 +1569,103 @@ class JSONGraph(BaseGraph, Element):
         Abstract all parthood relations that could be found in the graph
         """
         self.logger.debug("Abstracting all parthood relations")
-        idx = 0
-        while idx < len(self._relations[PART_OF_TYPE]):
-            relation = self._relations[PART_OF_TYPE][idx]
-            if relation.stereotype != RelationStereotype.MEMBER_OF.value:
+        order, recursive = self._get_parthood_order()
+        for _id in recursive:  # cycles are resolved before the abstraction
+            relation = self._relation_ids[_id]
+            self.logger.info(f"Abstracting recursion between {relation.from_entity.name} and {relation.to_entity.name}")
+            self.delete_relation(_id)
+            self.set_rule("P1")
+        for _id in order:  # parts are abstracted before their wholes
+            # the order is computed in advance, previous steps could delete the relation or its ends
+            if _id not in self._relation_ids:
+                continue
+            relation = self._relation_ids[_id]
+            if (relation.from_entity.id in self._entity_ids) and (relation.to_entity.id in self._entity_ids):
                 self.abstract_parthood(relation, False, long_names, mult_relations)
-            else:
-                idx += 1
+            else:  # the relation could not be kept without its end
+                self.logger.error(ERR_RECURSION + f"{relation.from_entity.name}, {relation.to_entity.name}")
+                self.delete_relation(_id)
+
+        # parthood relations that were created during the abstraction
+        _id = self._worklist.first(PART_OF_TYPE)
+        while _id:
+            self.abstract_parthood(self._relation_ids[_id], False, long_names, mult_relations)
+            _id = self._worklist.first(PART_OF_TYPE)
+
+    def _get_parthood_order(self) -> (List[str], List[str]):
+        """
+        Decomposes the graph of parthood relations (except MEMBER_OF) into strongly connected components
+        by iterative Tarjan's algorithm, starting from relations in the order of their creation.
+        Relations to a part that is being visited close a cycle and are returned separately,
+        all others are ordered from leaves to roots, i.e. in the same order as fold_entity would abstract them
+        :return: list of ids of relations in the order of abstraction, list of ids of recursive relations
+        """
+        order, recursive = [], []
+        ordered = set()  # ids of relations in order or recursive
+        index, low_link = {}, {}  # id of Entity -> number
+        tarjan_stack, on_tarjan_stack = [], set()
+        path = set()  # ids of Entities that are being visited
+
+        def parts_of(whole_id: str):
+            return iter([_id for _id in self._entity_ids[whole_id].in_edges[PART_OF_TYPE]
+                         if self._relation_ids[_id].stereotype != RelationStereotype.MEMBER_OF.value])
+
+        for root in self._relations[PART_OF_TYPE]:
+            if (root.stereotype == RelationStereotype.MEMBER_OF.value) or (root.id in ordered):
+                continue
+            # depth-first search, frame: [id of Entity, iterator over its parts, relation to its whole]
+            frames = [[root.from_entity.id, None, root.id]]
+            while frames:
+                frame = frames[-1]
+                entity_id = frame[0]
+                if frame[1] is None:
+                    if entity_id in path:  # the part is being visited
+                        recursive.append(frame[2])
+                        ordered.add(frame[2])
+                        low_link[frames[-2][0]] = min(low_link[frames[-2][0]], index[entity_id])
+                        frames.pop()
+                        continue
+                    if entity_id in index:  # the part is already ordered
+                        if entity_id in on_tarjan_stack:
+                            low_link[frames[-2][0]] = min(low_link[frames[-2][0]], index[entity_id])
+                        order.append(frame[2])
+                        ordered.add(frame[2])
+                        frames.pop()
+                        continue
+                    # first visit
+                    index[entity_id] = low_link[entity_id] = len(index)
+                    tarjan_stack.append(entity_id)
+                    on_tarjan_stack.add(entity_id)
+                    path.add(entity_id)
+                    frame[1] = parts_of(entity_id)
+
+                relation_id = next(frame[1], None)
+                if relation_id:
+                    frames.append([self._relation_ids[relation_id].from_entity.id, None, relation_id])
+                    continue
+
+                # all parts are ordered
+                frames.pop()
+                path.discard(entity_id)
+                if frame[2] not in ordered:  # could close a cycle itself
+                    order.append(frame[2])
+                    ordered.add(frame[2])
+                if frames:
+                    low_link[frames[-1][0]] = min(low_link[frames[-1][0]], low_link[entity_id])
+                if low_link[entity_id] == index[entity_id]:
+                    component = []
+                    while True:
+                        member = tarjan_stack.pop()
+                        on_tarjan_stack.discard(member)
+                        component.append(self._entity_ids[member].name)
+                        if member == entity_id:
+                            break
+                    if len(component) > 1:
+                        self.logger.error(ERR_RECURSION + ", ".join(reversed(component)))
+        for _id in recursive:
+            if self._relation_ids[_id].from_entity.id == self._relation_ids[_id].to_entity.id:
+                self.logger.error(ERR_RECURSION + self._relation_ids[_id].from_entity.name)
+        return order, recursive
 
     """
     ------------------------------------------------------------
@@ -1335,31 +1734,43 @@ class JSONGraph(BaseGraph, Element):
 
     def abstract_aspect(self, entity: Entity, next_only: bool, long_names: bool, mult_relations: bool, keep_relators: bool):
         """
-        Abstract the given aspect entity.
-        N.B. Recursive function for processing chains of externally dependent aspects
+        Abstract the given aspect entity, including chains of externally dependent aspects
         :param entity: Entity that represent an Aspect
         :param next_only: apply only one rule of abstraction
         :param long_names: modify names with 's
         :param mult_relations: create multiple relations between Entities
         :param keep_relators: keep relators with more than MIN_RELATORS_DEGREE relations
         """
+        self._run(self._abstract_aspect_steps(entity, next_only, long_names, mult_relations, keep_relators))
+
+    def _abstract_aspect_steps(self, entity: Entity, next_only: bool, long_names: bool, mult_relations: bool,
+                               keep_relators: bool) -> Generator:
+        """
+        Steps of abstract_aspect, aspects that are being abstracted are skipped in chains to avoid cycles
+        """
         if self._continue_abstracting(next_only):
             # if we have a relator but keep_relators is False, we abstract it
             # if we have a relator with more than MIN_RELATORS_DEGREE relations, we keep it
             # we also abstract all other aspects
             if (entity.stereotype != ClassStereotype.RELATOR.value) or (not keep_relators) or \
                     (entity.get_number_of_edges() < MIN_RELATORS_DEGREE):
-                self.fold_entity(entity, next_only, long_names, mult_relations)
+                self._abstracting_ids.add(entity.id)
+                yield self._fold_entity_steps(entity, next_only, long_names, mult_relations)
                 # could be that here another rule was applied in fold
                 # if not, then check if we have a chain of aspects
                 if self._continue_abstracting(next_only):
-                    for _id in entity.in_edges[RELATION_TYPE]:
+                    # N.B. relations could be deleted in the recursive call, so the position is kept
+                    idx = 0
+                    while idx < len(entity.in_edges[RELATION_TYPE]):
+                        _id = entity.in_edges[RELATION_TYPE].nth(idx)
+                        idx += 1
                         in_relation = self._relation_ids[_id]
-                        if (in_relation.from_entity.stereotype in ASPECTS) and (in_relation.from_entity.id != entity.id):
-                            # there is a chain of aspects: recursive call
-                            # but make sure it's not the same entity
-                            self.abstract_aspect(in_relation.from_entity, next_only,
-                                                 long_names, mult_relations, keep_relators)
+                        if (in_relation.from_entity.stereotype in ASPECTS) and \
+                                (in_relation.from_entity.id not in self._abstracting_ids):
+                            # there is a chain of aspects,
+                            # but make sure it's not the same entity or the one that depends on it
+                            yield self._abstract_aspect_steps(in_relation.from_entity, next_only,
+                                                              long_names, mult_relations, keep_relators)
 
                     if self._continue_abstracting(next_only):
                         sinks, in_relations = self._get_aspect_sinks(entity)
@@ -1388,12 +1799,14 @@ class JSONGraph(BaseGraph, Element):
                                     new_id = self.create_relation_from_existing(out_relation, new_from=source,
                                                                                 role_from="", new_name=name)
                                     self._relation_ids[new_id].relax_cardinality_to()
-                                    self._relation_ids[new_id].rest["properties"][0]["cardinality"] = None
+                                    self._relation_ids[new_id].set_cardinality_from(None)
 
                         # create relations between sources (see A1) if there was no any
                         for i in range(0, len(sources) - 1):
                             for j in range(i+1, len(sources)):
-                                diagram_ids = sources[i].get_all_diagrams().intersection(sources[j].get_all_diagrams())
+                                common_ids = sources[i].get_all_diagrams().intersection(sources[j].get_all_diagrams())
+                                # in the order of diagrams, so that new views do not depend on hashing of ids
+                                diagram_ids = [diagram_id for diagram_id in self._diagrams if diagram_id in common_ids]
                                 if not self._check_for_relation_existence(mult_relations, sources[i],
                                                                           sources[j], relation_name=entity.name):
                                     for diagram_id in diagram_ids:
@@ -1410,11 +1823,12 @@ class JSONGraph(BaseGraph, Element):
                                                                               from_entity=source, to_entity=event):
                                     new_id = self.create_relation_from_existing(relation, new_from=source, new_to=event,
                                                                                 role_from="", role_to="")
-                                    self._relation_ids[new_id].rest["properties"][1]["cardinality"] = "1"
-                                    self._relation_ids[new_id].rest["properties"][0]["cardinality"] = None
+                                    self._relation_ids[new_id].set_cardinality_to("1")
+                                    self._relation_ids[new_id].set_cardinality_from(None)
 
                         self.logger.info(f"Abstracting {entity.name}")
                         self.delete_entity(entity.id)
+                self._abstracting_ids.discard(entity.id)
 
     def abstract_aspects(self, long_names: bool, mult_relations: bool, keep_relators: bool):
         """
@@ -1423,7 +1837,7 @@ class JSONGraph(BaseGraph, Element):
         self.logger.debug("Abstracting all aspects")
         for aspect in ASPECTS:
             if aspect in self._entities:
-                for aspect_entity in copy.copy(self._entities[aspect]):
+                for aspect_entity in list(self._entities[aspect]):
                     self.abstract_aspect(aspect_entity, False, long_names, mult_relations, keep_relators)
 
     """
@@ -1442,23 +1856,20 @@ class JSONGraph(BaseGraph, Element):
         """
         self._rule = ""
 
-        # abstract parthood
+        # abstract parthood, candidates are taken from the worklist, MEMBER_OF relations are not there
         self.logger.debug("Check if there are any parthood relations to abstract")
-        # idx is used because MEMBER_OF relations should be kept
-        idx = 0
-        while (self._continue_abstracting(True)) and (idx < len(self._relations[PART_OF_TYPE])):
-            relation = self._relations[PART_OF_TYPE][idx]
-            if relation.stereotype != RelationStereotype.MEMBER_OF.value:
-                self.abstract_parthood(relation, True, long_names, mult_relations)
-            else:
-                idx += 1
+        _id = self._worklist.first(PART_OF_TYPE)
+        while self._continue_abstracting(True) and _id:
+            self.abstract_parthood(self._relation_ids[_id], True, long_names, mult_relations)
+            _id = self._worklist.first(PART_OF_TYPE)
         if self._rule:  # fast exit
             return self
 
         # abstract hierarchy
         self.logger.debug("Check if there are any hierarchies to abstract")
-        if self._continue_abstracting(True) and self._relations[GENERAL_TYPE]:
-            self.abstract_hierarchy(self._relations[GENERAL_TYPE][0], True, long_names, mult_relations)
+        _id = self._worklist.first(GENERAL_TYPE)
+        if self._continue_abstracting(True) and _id:
+            self.abstract_hierarchy(self._relation_ids[_id], True, long_names, mult_relations)
             self._clear_abstracted_entities()
         if self._rule:  # fast exit
             return self
@@ -1466,8 +1877,9 @@ class JSONGraph(BaseGraph, Element):
         # abstract aspects
         self.logger.debug("Check if there are any aspects to abstract")
         for aspect in ASPECTS:
-            if self._continue_abstracting(True) and (aspect in self._entities) and self._entities[aspect]:
-                self.abstract_aspect(self._entities[aspect][0], True, long_names, mult_relations, keep_relators)
+            _id = self._worklist.first(aspect)
+            if self._continue_abstracting(True) and _id:
+                self.abstract_aspect(self._entity_ids[_id], True, long_names, mult_relations, keep_relators)
         if self._rule:
             return self
         else:
@@ -0,0 +1,178 @@
+"""This module reads models in the json format incrementally, so that the whole model is never kept as a dict."""
+import ijson
+
+from typing import Any, BinaryIO, Dict, Generator, List
+
+from expose.project import PACKAGE_TYPE
+from expose.project.element import Model
+
+
+class ProjectReader:
+    def __init__(self, stream: BinaryIO):
+        """
+        Creates reader of the project from the stream of bytes. Elements of the model are read one by one,
+        Packages are turned into Models on the fly, diagrams are read one by one after the model.
+        Keys of the project could be in any order, diagrams that come before the model are kept until it is read
+        :param stream: file-like object with the project in the json format
+        """
+        self._events = ijson.basic_parse(stream, use_float=True)  # the same numbers as of json.loads
+        self._keys = self._iter_keys()
+        self.header: Dict[str, Any] = {}  # all keys of the project, except model and diagrams
+        self.model: Model | None = None
+        self._diagrams: List[dict] = []  # diagrams that were read before the model
+        self._names: Dict[str, str] = {}  # keys of json objects are shared between objects, as in json.loads
+
+    def iter_elements(self) -> Generator[dict, None, None]:
+        """
+        Reads the project up to the end of the model
+        :return: generator of json objects of elements (entities, relations), Packages are not included
+        """
+        for key in self._keys:
+            if key == "model":
+                yield from self._read_model()
+                return
+            if key == "diagrams":
+                self._diagrams = list(self._read_diagrams())
+            else:
+                self.header[key] = self._read_value()
+        raise ValueError("Project does not contain the model")
+
+    def iter_diagrams(self) -> Generator[dict, None, None]:
+        """
+        Reads the rest of the project, should be called after iter_elements()
+        :return: generator of json objects of diagrams
+        """
+        yield from self._diagrams
+        self._diagrams = []
+        for key in self._keys:
+            if key == "diagrams":
+                yield from self._read_diagrams()
+            else:
+                self.header[key] = self._read_value()
+
+    def _iter_keys(self) -> Generator[str, None, None]:
+        """
+        Returns keys of the project, the value of each key should be read before the next one is requested
+        """
+        event, _ = next(self._events)
+        if event != "start_map":
+            raise ValueError("Project should be a json object")
+        for event, value in self._events:
+            if event == "end_map":
+                return
+            yield value
+
+    def _read_value(self) -> Any:
+        """
+        Reads the next value as a whole
+        """
+        return self._build_value(*next(self._events))
+
+    def _build_value(self, event: str, value: Any) -> Any:
+        """
+        Reads the value that starts with the given event as a whole
+        """
+        if event == "start_map":
+            result = {}
+        elif event == "start_array":
+            result = []
+        else:
+            return value
+        names = self._names
+        stack = []  # enclosing containers, the key in the enclosing object is not needed after the value ends
+        container, key = result, None
+        for event, value in self._events:
+            if event == "map_key":
+                key = names.setdefault(value, value)
+            elif (event == "start_map") or (event == "start_array"):
+                nested = {} if event == "start_map" else []
+                if container.__class__ is dict:
+                    container[key] = nested
+                else:
+                    container.append(nested)
+                stack.append(container)
+                container = nested
+            elif (event == "end_map") or (event == "end_array"):
+                if not stack:
+                    return result
+                container = stack.pop()
+            elif container.__class__ is dict:
+                container[key] = value
+            else:
+                container.append(value)
+        raise ValueError("Unexpected end of the project")
+
+    def _read_keys(self, element: dict) -> bool:
+        """
+        Reads keys of the started json object into the element,
+        stops at the end of the object or before contents of the Package
+        :return: True if stopped before contents
+        """
+        for event, key in self._events:
+            if event == "end_map":
+                return False
+            if key == "contents":
+                return True
+            element[self._names.setdefault(key, key)] = self._read_value()
+        raise ValueError("Unexpected end of the project")
+
+    def _start_contents(self) -> bool:
+        """
+        Reads the beginning of contents of the Package
+        :return: True if contents is a list, False if it is null
+        """
+        event, _ = next(self._events)
+        if event == "null":
+            return False
+        if event != "start_array":
+            raise ValueError("Contents of the Package should be a list")
+        return True
+
+    def _read_model(self) -> Generator[dict, None, None]:
+        """
+        Reads the model depth-first with an explicit stack, every json object with contents is a Package.
+        Elements are yielded in the order they appear in the tree, Models are created once Packages are read
+        """
+        event, _ = next(self._events)
+        if event != "start_map":
+            raise ValueError("Model should be a json object")
+        # [json of the Package without contents, nested Models, True if inside contents]
+        stack = [[{"contents": None}, [], False]]
+        while stack:
+            frame = stack[-1]
+            if frame[2]:
+                event, _ = next(self._events)
+                if event == "end_array":
+                    frame[2] = False
+                    continue
+                element = {}
+                if self._read_keys(element):
+                    element["contents"] = None  # the value is not kept, only its elements
+                    stack.append([element, [], self._start_contents()])
+                elif element.get("type") == PACKAGE_TYPE:
+                    frame[1].append(Model(element))
+                else:
+                    yield element
+            elif self._read_keys(frame[0]):
+                frame[2] = self._start_contents()
+            else:
+                stack.pop()
+                package = Model(frame[0])
+                for nested in frame[1]:
+                    package.add_package(nested)
+                if stack:
+                    stack[-1][1].append(package)
+                else:
+                    self.model = package
+
+    def _read_diagrams(self) -> Generator[dict, None, None]:
+        event, _ = next(self._events)
+        if event == "null":
+            return
+        if event != "start_array":
+            raise ValueError("Diagrams should be a list")
+        while True:
+            event, value = next(self._events)
+            if event == "end_array":
+                return
+            yield self._build_value(event, value)  # each diagram is read as a whole
@@ -7,11 +7,14 @@ from expose.project.entity import Entity
 
 
 class AbcRelation(ABC, Element):
+    __slots__ = ("_final_type", "_from", "_to", "_name_tokens")
+
     def __init__(self, entity: dict, entity_from: Entity, entity_to: Entity):
         super().__init__(entity)
         self._final_type = self._type
         self._from = entity_from
         self._to = entity_to
+        self._name_tokens = (None, frozenset())  # (name, lowercase words of the name)
 
     @classmethod
     @abstractmethod
@@ -47,6 +50,15 @@ class AbcRelation(ABC, Element):
     def type(self) -> EdgeType:
         return self._final_type
 
+    @property
+    def name_tokens(self) -> frozenset:
+        """
+        Returns lowercase words of the name, cached until the name is changed
+        """
+        if self._name_tokens[0] != self._name:
+            self._name_tokens = (self._name, frozenset(self._name.lower().split(" ")) if self._name else frozenset())
+        return self._name_tokens[1]
+
     @abstractmethod
     def update_ids(self, diagrams: dict) -> str:
         """
@@ -66,9 +78,11 @@ class AbcRelation(ABC, Element):
         """
         for (i, view) in enumerate(self.views):
             view.id = f"{self._id}_view_{i}"
-            view.element["id"] = self._id
-            view.shape["id"] = view.id + "_path"
+            view.update_model_element_id(self._id)
+            view.shape = {**view.shape, "id": view.id + "_path"}
             diagrams[view.diagram_id].add_element(view)
+        self.reindex_views()
+        self._changed()  # ids are changed
 
     def _update_end(self, is_source: bool, new_entity: Entity) -> List:
         """
@@ -84,10 +98,10 @@ class AbcRelation(ABC, Element):
                 entity_center = new_entity.get_view(diagram_id).get_center()
                 if is_source:
                     view.update_source_point(entity_center)
-                    view.source["id"] = new_entity.get_view(diagram_id).id
+                    view.source = {**view.source, "id": new_entity.get_view(diagram_id).id}
                 else:
                     view.update_target_point(entity_center)
-                    view.target["id"] = new_entity.get_view(diagram_id).id
+                    view.target = {**view.target, "id": new_entity.get_view(diagram_id).id}
             else:
                 # there is no corresponding view in this diagram
                 unnecessary_views.append((diagram_id, view.id))
@@ -110,9 +124,13 @@ class AbcRelation(ABC, Element):
 
         for diagram_id, view_id in views_to_delete:
             diagrams[diagram_id].del_element(view_id)
+            self.del_view(view_id)
+        self._changed()
 
 
 class Generalization(AbcRelation):
+    __slots__ = ("_property", "_set")
+
     def __init__(self, entity: dict, entity_from: Entity, entity_to: Entity):
         super().__init__(entity, entity_from, entity_to)
         self._property = entity["propertyAssignments"] if "propertyAssignments" in entity else None
@@ -139,6 +157,14 @@ class Generalization(AbcRelation):
         """
         return cls(dict(id=_id, name="", type=GENERAL_TYPE), None, None)
 
+    def clone(self):
+        """
+        Creates a copy of the Generalization, from- and to- Entities are shared
+        """
+        generalization = super().clone()
+        generalization._property = copy_json(self._property)
+        return generalization
+
     def update(self, entity: dict, entity_from: Entity, entity_to: Entity):
         """
         Updates prototype to a normal Generalization
@@ -152,6 +178,7 @@ class Generalization(AbcRelation):
         self._property = entity["propertyAssignments"]
         self._from = entity_from
         self._to = entity_to
+        self._changed()
 
     @property
     def set(self) -> str:
@@ -227,12 +254,12 @@ class Generalization(AbcRelation):
 
 
 class Relation(AbcRelation):
+    __slots__ = ("_stereotype", "_rest")
+
     def __init__(self, entity: dict, entity_from: Entity, entity_to: Entity):
         super().__init__(entity, entity_from, entity_to)
         self._stereotype = entity["stereotype"]
-        for key in ElementDict.__annotations__.keys():
-            entity.pop(key, "")
-        self._rest = entity
+        self._rest = RestDict(entity, ELEMENT_KEYS)
 
         if not ((self.rest["properties"][0]["aggregationKind"] == "NONE") &
                 (self.rest["properties"][1]["aggregationKind"] == "NONE")):
@@ -246,6 +273,14 @@ class Relation(AbcRelation):
             return None, None
         return element["properties"][0]["propertyType"]["id"], element["properties"][1]["propertyType"]["id"]
 
+    def clone(self):
+        """
+        Creates a copy of the Relation, from- and to- Entities are shared
+        """
+        relation = super().clone()
+        relation._rest = self._rest.copy()
+        return relation
+
     @property
     def stereotype(self) -> str:
         return self._stereotype
@@ -253,24 +288,32 @@ class Relation(AbcRelation):
     @stereotype.setter
     def stereotype(self, new_stereotype: str):
         self._stereotype = new_stereotype
+        self._changed()
 
     @property
-    def rest(self) -> dict:
+    def rest(self) -> RestDict:
         return self._rest
 
+    def _own_properties(self) -> list:
+        """
+        Returns properties (ends) of the Relation, that could be changed in place
+        """
+        self._changed()
+        return self._rest.own("properties")
+
     @property
     def role_from(self) -> str:
         return self._rest["properties"][0]["name"]
 
     def clear_role_from(self):
-        self._rest["properties"][0]["name"] = ""
+        self._own_properties()[0]["name"] = ""
 
     @property
     def role_to(self) -> str:
         return self._rest["properties"][1]["name"]
 
     def clear_role_to(self):
-        self._rest["properties"][1]["name"] = ""
+        self._own_properties()[1]["name"] = ""
 
     def get_cardinality_from(self) -> str:
         return self._rest["properties"][0]["cardinality"]
@@ -278,6 +321,12 @@ class Relation(AbcRelation):
     def get_cardinality_to(self) -> str:
         return self._rest["properties"][1]["cardinality"]
 
+    def set_cardinality_from(self, cardinality: str | None):
+        self._own_properties()[0]["cardinality"] = cardinality
+
+    def set_cardinality_to(self, cardinality: str | None):
+        self._own_properties()[1]["cardinality"] = cardinality
+
     @staticmethod
     def _relax_cardinality(original: str) -> str:
         """
@@ -302,13 +351,13 @@ class Relation(AbcRelation):
 
     def relax_cardinality_from(self):
         if self._rest["properties"][0]["cardinality"]:  # if cardinality is given
-            self._rest["properties"][0]["cardinality"] = \
-                Relation._relax_cardinality(self._rest["properties"][0]["cardinality"])
+            properties = self._own_properties()
+            properties[0]["cardinality"] = Relation._relax_cardinality(properties[0]["cardinality"])
 
     def relax_cardinality_to(self):
         if self._rest["properties"][1]["cardinality"]:  # if cardinality is given
-            self._rest["properties"][1]["cardinality"] = \
-                Relation._relax_cardinality(self._rest["properties"][1]["cardinality"])
+            properties = self._own_properties()
+            properties[1]["cardinality"] = Relation._relax_cardinality(properties[1]["cardinality"])
 
     @staticmethod
     def _minimal_cardinality(fst: str, snd: str) -> str:
@@ -340,25 +389,29 @@ class Relation(AbcRelation):
             return fst  # not able to process
 
     def set_minimal_cardinality_from(self, other_cardinality: str):
-        if self._rest["properties"][0]["cardinality"] and other_cardinality:
-            self._rest["properties"][0]["cardinality"] = self._minimal_cardinality(
-                self._rest["properties"][0]["cardinality"], other_cardinality)
+        properties = self._own_properties()
+        if properties[0]["cardinality"] and other_cardinality:
+            properties[0]["cardinality"] = self._minimal_cardinality(properties[0]["cardinality"], other_cardinality)
         else:
-            self._rest["properties"][0]["cardinality"] = None
+            properties[0]["cardinality"] = None
 
     def set_minimal_cardinality_to(self, other_cardinality: str):
-        if self._rest["properties"][1]["cardinality"] and other_cardinality:
-            self._rest["properties"][1]["cardinality"] = self._minimal_cardinality(
-                self._rest["properties"][1]["cardinality"], other_cardinality)
+        properties = self._own_properties()
+        if properties[1]["cardinality"] and other_cardinality:
+            properties[1]["cardinality"] = self._minimal_cardinality(properties[1]["cardinality"], other_cardinality)
         else:
-            self._rest["properties"][1]["cardinality"] = None
+            properties[1]["cardinality"] = None
 
     def to_json(self) -> dict:
         result = super().to_json()
         result["stereotype"] = self._stereotype
-        result.update(self._rest)
-        result["properties"][0]["propertyType"]["id"] = self.from_entity.id
-        result["properties"][1]["propertyType"]["id"] = self.to_entity.id
+        properties = self._rest["properties"]
+        if (properties[0]["propertyType"]["id"] != self.from_entity.id) or \
+                (properties[1]["propertyType"]["id"] != self.to_entity.id):
+            properties = self._own_properties()  # ends were moved
+            properties[0]["propertyType"]["id"] = self.from_entity.id
+            properties[1]["propertyType"]["id"] = self.to_entity.id
+        result.update(self._rest.to_json())
         return result
 
     def to_expo(self) -> dict:
@@ -395,8 +448,9 @@ class Relation(AbcRelation):
 
     def update_ids(self, diagrams: dict) -> str:
         self._id = generate_id()
-        self.rest["properties"][0]["id"] = self._id + "_p0"
-        self.rest["properties"][1]["id"] = self._id + "_p1"
+        properties = self._own_properties()
+        properties[0]["id"] = self._id + "_p0"
+        properties[1]["id"] = self._id + "_p1"
         super().update_views(diagrams)
         return self._id
 
@@ -414,10 +468,11 @@ class Relation(AbcRelation):
         super().move(new_from, new_to, diagrams)
         if new_name is not None:
             self._name = new_name
+            self._changed()
         if role_from is not None:
-            self._rest["properties"][0]["name"] = role_from
+            self._own_properties()[0]["name"] = role_from
         if role_to is not None:
-            self._rest["properties"][1]["name"] = role_to
+            self._own_properties()[1]["name"] = role_to
 
     @staticmethod
     def init_relation(source_id: str, target_id: str, name: str = None,
@@ -455,10 +510,10 @@ class Relation(AbcRelation):
         inversion of PartOf Relations
         """
         self._from, self._to = self._to, self._from
-        self.rest["properties"][0], self.rest["properties"][1] = \
-            self.rest["properties"][1], self.rest["properties"][0]
-        self.rest["properties"][0]["aggregationKind"], self.rest["properties"][1]["aggregationKind"] = \
-            self.rest["properties"][1]["aggregationKind"], self.rest["properties"][0]["aggregationKind"]
+        properties = self._own_properties()  # also marks the Relation as changed
+        properties[0], properties[1] = properties[1], properties[0]
+        properties[0]["aggregationKind"], properties[1]["aggregationKind"] = \
+            properties[1]["aggregationKind"], properties[0]["aggregationKind"]
 
     def is_aggregation_from(self):
         """
@@ -7,12 +7,15 @@ from expose import DEFAULT_X, DEFAULT_Y, DEFAULT_WIDTH, \
 
 
 class View:
+    __slots__ = ("_id", "_type", "_element", "_shape", "_diagram_id", "_source", "_target", "_json")
+
     def __init__(self, element_view: dict, diagram_id: str):
         self._id = element_view["id"]
         self._type = element_view["type"]
         self._element: BasicDict = element_view["modelElement"]
         self._shape: ShapeDict = element_view["shape"]
         self._diagram_id = diagram_id
+        self._json: dict | None = None  # cached by get_json(), until the View is changed
 
         # for Relations and Generalizations only
         if self._type in (RELATION_VIEW_TYPE, GENERAL_VIEW_TYPE):
@@ -26,6 +29,7 @@ class View:
     @id.setter
     def id(self, _id: str):
         self._id = _id
+        self._json = None
 
     @property
     def type(self) -> str:
@@ -42,6 +46,7 @@ class View:
     @shape.setter
     def shape(self, new_shape: ShapeDict):
         self._shape = new_shape
+        self._json = None
 
     @property
     def element(self) -> BasicDict:
@@ -50,6 +55,7 @@ class View:
     @element.setter
     def element(self, new_element: BasicDict):
         self._element = new_element
+        self._json = None
 
     @property
     def source(self) -> BasicDict:
@@ -58,6 +64,7 @@ class View:
     @source.setter
     def source(self, new_source: BasicDict):
         self._source = new_source
+        self._json = None
 
     @property
     def target(self) -> BasicDict:
@@ -66,6 +73,7 @@ class View:
     @target.setter
     def target(self, new_target: BasicDict):
         self._target = new_target
+        self._json = None
 
     def get_x(self) -> int:
         if self._type == CLASS_VIEW_TYPE:
@@ -96,8 +104,31 @@ class View:
             result["target"] = self._target
         return result
 
+    def get_json(self) -> dict:
+        """
+        Returns the View in the json format, that is reused until the View is changed and should not be changed
+        """
+        if self._json is None:
+            self._json = self.to_json()
+        return self._json
+
+    def clone(self):
+        """
+        Creates a copy of the View with its own shape and references,
+        so that it could be changed independently of the original one
+        """
+        view = copy.copy(self)
+        view._element = copy.copy(self._element)
+        view._shape = copy_json(self._shape)
+        if self._type in (RELATION_VIEW_TYPE, GENERAL_VIEW_TYPE):
+            view._source = copy.copy(self._source)
+            view._target = copy.copy(self._target)
+        view._json = None
+        return view
+
     def update_model_element_id(self, new_id: str):
-        self._element["id"] = new_id
+        self._element = {**self._element, "id": new_id}  # the dict could be shared with the parsed model
+        self._json = None
 
     def _make_edge_visible(self):
         if (len(self._shape["points"]) == 2) and \
@@ -109,21 +140,25 @@ class View:
             snd["x"] += DEFAULT_WIDTH
             snd["y"] += DEFAULT_HEIGHT
             trd["y"] += DEFAULT_HEIGHT
-            self._shape["points"] = [self._shape["points"][0]] + [fst, snd, trd] + [self._shape["points"][-1]]
+            self._shape = {**self._shape,
+                           "points": [self._shape["points"][0]] + [fst, snd, trd] + [self._shape["points"][-1]]}
 
     def update_source_point(self, new_point: PointDict):
         # TODO: make this function more advanced
-        self._shape["points"] = [new_point] + self._shape["points"][1:]
+        self._shape = {**self._shape, "points": [new_point] + self._shape["points"][1:]}
+        self._json = None
         self._make_edge_visible()
 
     def update_target_point(self, new_point: PointDict):
         # TODO: make this function more advanced
-        self._shape["points"] = self._shape["points"][:-1] + [new_point]
+        self._shape = {**self._shape, "points": self._shape["points"][:-1] + [new_point]}
+        self._json = None
         self._make_edge_visible()
 
     def increase_shape_height(self, value: int = ATTRIBUTE_HEIGHT):
         if self._type == CLASS_VIEW_TYPE:
-            self._shape["height"] = self._shape["height"] + value
+            self._shape = {**self._shape, "height": self._shape["height"] + value}
+            self._json = None
 
     def get_center(self) -> PointDict:
         """
@@ -205,4 +240,5 @@ class View:
         possible inversion of Relations
         """
         self._source, self._target = self._target, self._source
-        self._shape["points"].reverse()
+        self._shape = {**self._shape, "points": self._shape["points"][::-1]}
+        self._json = None
@@ -0,0 +1,57 @@
+from itertools import count
+from typing import Dict, List, Tuple
+
+
+class Worklist:
+    def __init__(self, kinds: List[str]):
+        """
+        Creates queues of candidates for the abstraction, e.g. ids of parthood relations.
+        Candidates of each kind are kept in the order they were added,
+        removed candidates are skipped lazily, so finding the first one is O(1) amortised
+        :param kinds: kinds of candidates in the order of their priority
+        """
+        self._queues: Dict[str, List[Tuple[int, str]]] = {kind: [] for kind in kinds}  # kind -> [(number, id)]
+        self._heads: Dict[str, int] = {kind: 0 for kind in kinds}  # kind -> position of the first candidate
+        self._candidates: Dict[str, Dict[str, int]] = {kind: {} for kind in kinds}  # kind -> id -> number
+        self._numbers = count()
+
+    def add(self, kind: str, _id: str):
+        """
+        Adds the candidate to the end of the queue, if this kind is tracked
+        :param kind: kind of the candidate
+        :param _id: id of the candidate
+        """
+        if (kind in self._queues) and (_id not in self._candidates[kind]):
+            number = next(self._numbers)
+            self._candidates[kind][_id] = number
+            self._queues[kind].append((number, _id))
+
+    def discard(self, kind: str, _id: str):
+        """
+        Removes the candidate, if exists
+        :param kind: kind of the candidate
+        :param _id: id of the candidate
+        """
+        if kind in self._queues:
+            self._candidates[kind].pop(_id, None)
+
+    def first(self, kind: str) -> str | None:
+        """
+        Returns the earliest added candidate of the given kind
+        :param kind: kind of the candidate
+        :return: id of the candidate if exists
+        """
+        queue, candidates, head = self._queues[kind], self._candidates[kind], self._heads[kind]
+        while (head < len(queue)) and (candidates.get(queue[head][1]) != queue[head][0]):
+            head += 1
+        if head > len(candidates):  # keep the queue short, if most of it was removed
+            del queue[:head]
+            head = 0
+        self._heads[kind] = head
+        return queue[head][1] if head < len(queue) else None
+
+    def clear(self):
+        for kind in self._queues:
+            self._queues[kind] = []
+            self._heads[kind] = 0
+            self._candidates[kind] = {}
@@ -0,0 +1,208 @@
+"""This module keeps parsed graphs in memory between requests."""
+import logging
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from expose import LOG_NAME, SESSION_MEMORY_LIMIT, SESSION_ELEMENT_SIZE, SESSION_TTL
+from expose.graph import BaseGraph
+from expose.project.ids import IdProvider, create_id_provider
+from expose.timeline import Timeline
+
+
+class Session:
+    def __init__(self, graph: BaseGraph):
+        """
+        Creates Session object for the already parsed graph
+        :param graph: graph that is kept in memory
+        """
+        self._id = uuid.uuid4().hex
+        self._graph = graph
+        self._timeline: Timeline | None = None
+        self._id_provider: IdProvider | None = None
+        self._lock = threading.Lock()  # operations on the graph are executed one by one
+        self._size = 0
+        self._last_access = time.monotonic()
+        self._valid = True  # False if an operation failed and could leave the graph partially changed
+        self.update_size()
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def graph(self) -> BaseGraph:
+        return self._graph
+
+    @property
+    def timeline(self) -> Timeline | None:
+        return self._timeline
+
+    @timeline.setter
+    def timeline(self, timeline: Timeline):
+        self._timeline = timeline
+
+    @property
+    def id_provider(self) -> IdProvider:
+        """
+        Provider of ids for all operations of the session, is created for the graph before the first operation
+        """
+        if not self._id_provider:
+            self._id_provider = create_id_provider("session", self._graph.to_json)
+        return self._id_provider
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def last_access(self) -> float:
+        return self._last_access
+
+    def touch(self):
+        self._last_access = time.monotonic()
+
+    @property
+    def valid(self) -> bool:
+        return self._valid
+
+    def invalidate(self):
+        """
+        Marks the session to be removed, e.g. after a failed operation, since its graph cannot be trusted anymore
+        """
+        self._valid = False
+
+    def update_size(self) -> int:
+        """
+        Re-estimates the memory used by the graph and its timeline
+        :return: difference with the previous estimation in bytes
+        """
+        old_size = self._size
+        number_of_elements = self._graph.get_number_of_elements()
+        if self._timeline:
+            number_of_elements += self._timeline.get_number_of_elements()
+        self._size = number_of_elements * SESSION_ELEMENT_SIZE
+        return self._size - old_size
+
+
+class SessionStorage:
+    def __init__(self, memory_limit: int = SESSION_MEMORY_LIMIT, ttl: int = SESSION_TTL):
+        """
+        Creates LRU storage of sessions with the memory budget
+        :param memory_limit: memory budget for all sessions in bytes
+        :param ttl: number of seconds after which an idle session is evicted
+        """
+        self.logger = logging.getLogger(LOG_NAME)
+        self._sessions: OrderedDict[str, Session] = OrderedDict()  # id -> Session, least recent first
+        self._memory_limit = memory_limit
+        self._ttl = ttl
+        self._memory = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def memory(self) -> int:
+        return self._memory
+
+    def add(self, graph: BaseGraph) -> str:
+        """
+        Keeps the graph in memory, evicts idle sessions if needed
+        :param graph: parsed graph
+        :return: id of the new session
+        """
+        session = Session(graph)
+        self._sessions[session.id] = session
+        self._memory += session.size
+        self.logger.info(f"Session {session.id} is created, estimated size is {session.size} bytes")
+        self._evict()
+        return session.id
+
+    def get_session(self, session_id: str) -> Session | None:
+        """
+        Returns the session and marks it as recently used, invalidated sessions are removed
+        :param session_id: id of the session
+        :return: Session if exists
+        """
+        self._evict_expired()
+        session = self._sessions.get(session_id)
+        if not session:
+            return None
+        if not session.valid:
+            self.logger.info(f"Session {session_id} is removed after the failed operation")
+            self.delete(session_id)
+            return None
+        session.touch()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def get(self, session_id: str) -> BaseGraph | None:
+        """
+        Returns graph of the session and marks the session as recently used
+        :param session_id: id of the session
+        :return: graph if the session exists
+        """
+        session = self.get_session(session_id)
+        return session.graph if session else None
+
+    def update(self, session_id: str):
+        """
+        Updates memory estimation after the graph of the session was changed
+        :param session_id: id of the session
+        """
+        session = self._sessions.get(session_id)
+        if session:
+            self._memory += session.update_size()
+            self._evict()
+
+    def set_timeline(self, session_id: str, timeline: Timeline):
+        """
+        Keeps the abstraction timeline in the session and updates memory estimation
+        :param session_id: id of the session
+        :param timeline: timeline built for the graph of the session
+        """
+        session = self._sessions.get(session_id)
+        if session:
+            session.timeline = timeline
+            self.update(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Removes the session from the storage
+        :param session_id: id of the session
+        :return: True if the session existed
+        """
+        session = self._sessions.pop(session_id, None)
+        if not session:
+            return False
+        self._memory -= session.size
+        return True
+
+    def _evict_expired(self):
+        """
+        Removes sessions that were not used for more than ttl seconds
+        """
+        deadline = time.monotonic() - self._ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_access > deadline:
+                break
+            self.logger.info(f"Session {session_id} is expired")
+            self.delete(session_id)
+
+    def _evict(self):
+        """
+        Removes expired sessions and then least recently used ones,
+        until the memory budget is met. The most recent session is always kept
+        """
+        self._evict_expired()
+        while (self._memory > self._memory_limit) and (len(self._sessions) > 1):
+            session_id = next(iter(self._sessions))
+            self.logger.info(f"Session {session_id} is evicted, memory used {self._memory} bytes")
+            self.delete(session_id)
@@ -0,0 +1,149 @@
+"""This module keeps all states of the step-by-step abstraction, so that any step is served without recomputing."""
+import copy
+import pickle
+
+from typing import Dict, List, Tuple
+
+from expose import TIMELINE_CHECKPOINT
+from expose.project import GENERAL_TYPE, RELATION_TYPE
+
+# (header of the project, section -> id -> element in the json format)
+State = Tuple[dict, Dict[tuple, Dict[str, dict]]]
+
+
+class Timeline:
+    def __init__(self, origin: dict, checkpoint: int = TIMELINE_CHECKPOINT):
+        """
+        Creates timeline of the abstraction that starts with the given model.
+        Each next state is kept as the difference with the previous one,
+        every checkpoint-th state is kept as a whole, so that any step is restored quickly
+        :param origin: model in the json format, step 0 of the timeline
+        :param checkpoint: number of steps between states that are kept as a whole
+        """
+        self._checkpoint = max(1, checkpoint)
+        self._last: State = self._split(copy.deepcopy(origin))
+        self._rules: List[str] = [""]  # step -> applied rule
+        self._diffs: List[dict | None] = [None]  # step -> difference with the previous state
+        self._checkpoints: Dict[int, State] = {0: self._last}  # step -> state
+        self._size = sum(len(elements) for elements in self._last[1].values())
+
+    def __len__(self):
+        return len(self._rules)
+
+    @property
+    def rules(self) -> List[str]:
+        return self._rules
+
+    def get_number_of_elements(self) -> int:
+        """
+        Returns number of elements (and views) that are kept for all steps
+        """
+        return self._size
+
+    def add(self, rule: str, state: dict):
+        """
+        Adds the next step to the timeline. Only elements that differ from the previous state are copied,
+        so the given state could be changed afterwards
+        :param rule: rule that was applied, see get_rule()
+        :param state: model in the json format after the rule was applied
+        """
+        header, sections = self._split(state)
+        previous_header, previous_sections = self._last
+        diff = {"header": None, "changed": {}, "deleted": {}, "order": {}}
+        if header != previous_header:
+            diff["header"] = copy.deepcopy(header)
+        for key, elements in sections.items():
+            previous = previous_sections.get(key, {})
+            changed = {_id: copy.deepcopy(element) for _id, element in elements.items()
+                       if previous.get(_id) != element}
+            if changed:
+                diff["changed"][key] = changed
+                self._size += len(changed)
+        for key, previous in previous_sections.items():
+            deleted = [_id for _id in previous if _id not in sections.get(key, {})]
+            if deleted:
+                diff["deleted"][key] = deleted
+
+        self._last = self._apply(self._last, diff)
+        for key, elements in sections.items():
+            if list(self._last[1].get(key, {})) != list(elements):  # reordered, not only added to the end
+                diff["order"][key] = list(elements)
+                self._last[1][key] = {_id: self._last[1][key][_id] for _id in diff["order"][key]}
+        self._rules.append(rule)
+        self._diffs.append(diff)
+        if (len(self._rules) - 1) % self._checkpoint == 0:
+            self._checkpoints[len(self._rules) - 1] = self._last
+
+    def get_rule(self, step: int) -> str:
+        return self._rules[step]
+
+    def get_state(self, step: int) -> dict:
+        """
+        Restores the model after the given step from the closest previous checkpoint
+        :param step: number of the step, 0 is the original model
+        :return: model in the json format, that could be freely changed
+        """
+        start = step - step % self._checkpoint
+        state = self._checkpoints[start]
+        for diff in self._diffs[start + 1:step + 1]:
+            state = self._apply(state, diff)
+        return self._join(state)
+
+    @staticmethod
+    def _apply(state: State, diff: dict) -> State:
+        """
+        Returns the next state, the given one is not changed
+        :param state: previous state
+        :param diff: difference with the previous state
+        """
+        header, sections = state
+        sections = dict(sections)
+        for key, deleted in diff["deleted"].items():
+            deleted = set(deleted)
+            sections[key] = {_id: element for _id, element in sections[key].items() if _id not in deleted}
+        for key, changed in diff["changed"].items():
+            sections[key] = {**sections.get(key, {}), **changed}
+        for key, order in diff["order"].items():
+            sections[key] = {_id: sections[key][_id] for _id in order}
+        return diff["header"] or header, sections
+
+    @staticmethod
+    def _split(project: dict) -> State:
+        """
+        Splits the model into the header and sections of elements, contents of the model and diagrams
+        are replaced in the header with keys of their sections
+        :param project: model in the json format
+        """
+        header = {**project, "model": {**project["model"]}}
+        sections = {}
+        keys = []
+        for element in project["model"]["contents"]:
+            # generalizations are exported together with relations
+            key = ("model", RELATION_TYPE if element["type"] == GENERAL_TYPE else element["type"])
+            if key not in sections:
+                sections[key] = {}
+                keys.append(key)
+            sections[key][element["id"]] = element
+        header["model"]["contents"] = keys
+
+        header["diagrams"] = []
+        for diagram in project["diagrams"]:
+            key = ("diagram", diagram["id"])
+            sections[key] = {view["id"]: view for view in diagram["contents"]}
+            header["diagrams"].append({**diagram, "contents": key})
+        return header, sections
+
+    @staticmethod
+    def _join(state: State) -> dict:
+        """
+        Assembles the model out of the header and sections
+        :param state: state of the timeline
+        :return: copy of the model in the json format
+        """
+        header, sections = state
+        project = {**header, "model": {**header["model"]}}
+        project["model"]["contents"] = [element for key in header["model"]["contents"]
+                                        for element in sections[key].values()]
+        project["diagrams"] = [{**diagram, "contents": list(sections.get(diagram["contents"], {}).values())}
+                               for diagram in header["diagrams"]]
+        return pickle.loads(pickle.dumps(project, pickle.HIGHEST_PROTOCOL))  # faster than deepcopy for json
@@ -0,0 +1,239 @@
+"""Builder of small models in the json format for tests."""
+import copy
+import random
+from itertools import count
+from typing import Iterator
+
+
+class ModelBuilder:
+    def __init__(self):
+        self._ids = count()
+        self._contents = []
+        self._views = []
+        self._class_views = {}  # id of Class -> id of ClassView
+
+    def _id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids)}"
+
+    def add_class(self, name: str, stereotype: str = "kind", restricted_to: str = "functional-complex") -> str:
+        _id = self._id("c")
+        self._contents.append({
+            "id": _id, "name": name, "description": None, "type": "Class", "propertyAssignments": None,
+            "stereotype": stereotype, "isAbstract": False, "isDerived": False, "properties": None,
+            "isExtensional": None, "isPowertype": None, "order": "1", "literals": None,
+            "restrictedTo": [restricted_to]
+        })
+        view_id = self._id("v")
+        self._class_views[_id] = view_id
+        self._views.append({
+            "id": view_id, "type": "ClassView", "modelElement": {"id": _id, "type": "Class"},
+            "shape": {"id": view_id + "_shape", "type": "Rectangle", "x": 10 * len(self._views), "y": 0,
+                      "width": 100, "height": 50}
+        })
+        return _id
+
+    @staticmethod
+    def _property(_id: str, class_id: str, cardinality: str | None, aggregation: str) -> dict:
+        return {
+            "id": _id, "name": None, "description": None, "type": "Property", "propertyAssignments": None,
+            "stereotype": None, "isDerived": False, "isReadOnly": False, "isOrdered": False,
+            "cardinality": cardinality, "propertyType": {"id": class_id, "type": "Class"},
+            "subsettedProperties": None, "redefinedProperties": None, "aggregationKind": aggregation
+        }
+
+    def add_relation(self, source: str, target: str, stereotype: str = "material", name: str = None,
+                     cardinality_from: str = "1", cardinality_to: str = "1") -> str:
+        _id = self._id("r")
+        self._contents.append({
+            "id": _id, "name": name, "description": None, "type": "Relation", "propertyAssignments": None,
+            "stereotype": stereotype, "isAbstract": False, "isDerived": False,
+            "properties": [self._property(_id + "_p0", source, cardinality_from, "NONE"),
+                           self._property(_id + "_p1", target, cardinality_to, "NONE")]
+        })
+        self._add_edge_view("RelationView", _id, "Relation", source, target)
+        return _id
+
+    def add_part(self, whole: str, part: str, stereotype: str = "componentOf") -> str:
+        """
+        Adds parthood relation, the whole is the source with the composite aggregation, as in exported models
+        """
+        _id = self._id("r")
+        self._contents.append({
+            "id": _id, "name": None, "description": None, "type": "Relation", "propertyAssignments": None,
+            "stereotype": stereotype, "isAbstract": False, "isDerived": False,
+            "properties": [self._property(_id + "_p0", whole, "1", "COMPOSITE"),
+                           self._property(_id + "_p1", part, "1..*", "NONE")]
+        })
+        self._add_edge_view("RelationView", _id, "Relation", whole, part)
+        return _id
+
+    def add_generalization(self, specific: str, general: str) -> str:
+        _id = self._id("g")
+        self._contents.append({
+            "id": _id, "name": None, "description": None, "type": "Generalization", "propertyAssignments": None,
+            "general": {"id": general, "type": "Class"}, "specific": {"id": specific, "type": "Class"}
+        })
+        self._add_edge_view("GeneralizationView", _id, "Generalization", specific, general)
+        return _id
+
+    def add_generalization_set(self, generalizations: list, complete: bool = True, disjoint: bool = True) -> str:
+        _id = self._id("gs")
+        self._contents.append({
+            "id": _id, "name": None, "description": None, "type": "GeneralizationSet", "propertyAssignments": None,
+            "isDisjoint": disjoint, "isComplete": complete, "categorizer": None,
+            "generalizations": [{"id": g, "type": "Generalization"} for g in generalizations]
+        })
+        return _id
+
+    def _add_edge_view(self, view_type: str, _id: str, element_type: str, source: str, target: str):
+        view_id = self._id("v")
+        self._views.append({
+            "id": view_id, "type": view_type, "modelElement": {"id": _id, "type": element_type},
+            "shape": {"id": view_id + "_path", "type": "Path", "points": [{"x": 0, "y": 0}, {"x": 10, "y": 10}]},
+            "source": {"id": self._class_views[source], "type": "ClassView"},
+            "target": {"id": self._class_views[target], "type": "ClassView"}
+        })
+
+    def build(self) -> dict:
+        return {
+            "id": "project", "name": "Project", "description": None, "type": "Project",
+            "model": {"id": "model", "name": "Model", "description": None, "type": "Package",
+                      "propertyAssignments": None, "contents": list(self._contents)},
+            "diagrams": [{"id": "diagram", "name": "Diagram", "description": None, "type": "Diagram",
+                          "owner": {"id": "model", "type": "Package"}, "contents": list(self._views)}]
+        }
+
+
+def add_diagrams(model: dict, number: int) -> dict:
+    """
+    Adds copies of the first diagram, so that each element has several views
+    :param model: model with one diagram
+    :param number: number of diagrams in the result
+    :return: the given model
+    """
+    diagram = model["diagrams"][0]
+    for copy_number in range(1, number):
+        suffix = f"_{copy_number}"
+        new_diagram = copy.deepcopy(diagram)
+        new_diagram["id"] += suffix
+        for view in new_diagram["contents"]:
+            view["id"] += suffix
+            view["shape"]["id"] += suffix
+            for end in ("source", "target"):
+                if end in view:
+                    view[end]["id"] += suffix
+        model["diagrams"].append(new_diagram)
+    return model
+
+
+def build_sample_model() -> (dict, dict):
+    """
+    Builds a model with parts, generalization set, relator and mode
+    :return: model, name -> id of its elements
+    """
+    builder = ModelBuilder()
+    ids = {
+        "person": builder.add_class("Person"),
+        "child": builder.add_class("Child", "phase"),
+        "adult": builder.add_class("Adult", "phase"),
+        "student": builder.add_class("Student", "role"),
+        "university": builder.add_class("University"),
+        "enrollment": builder.add_class("Enrollment", "relator"),
+        "skill": builder.add_class("Skill", "mode", "intrinsic-mode"),
+        "car": builder.add_class("Car"),
+        "engine": builder.add_class("Engine"),
+        "team": builder.add_class("Team", "collective"),
+        "vehicle": builder.add_class("Vehicle", "category"),
+    }
+    generalizations = [builder.add_generalization(ids["child"], ids["person"]),
+                       builder.add_generalization(ids["adult"], ids["person"])]
+    builder.add_generalization_set(generalizations)
+    builder.add_generalization(ids["student"], ids["adult"])
+    builder.add_generalization(ids["car"], ids["vehicle"])
+    ids["studies"] = builder.add_relation(ids["enrollment"], ids["student"], "mediation", None, "1..*", "1")
+    builder.add_relation(ids["enrollment"], ids["university"], "mediation", None, "0..*", "1")
+    builder.add_relation(ids["skill"], ids["person"], "characterization", None, "0..*", "1")
+    builder.add_relation(ids["adult"], ids["car"], "material", "owns", "1", "0..*")
+    builder.add_part(ids["car"], ids["engine"])
+    builder.add_part(ids["team"], ids["person"], "memberOf")
+    return builder.build(), ids
+
+
+STEREOTYPES = ["kind", "kind", "subkind", "role", "phase", "category", "mixin", "roleMixin", "phaseMixin",
+               "collective", "quantity", "relator", "mode", "quality", "event", "situation"]
+
+
+def build_random_model(seed: int, cyclic: bool) -> dict:
+    """
+    Builds a small random model with generalizations, generalization sets, parts and relations
+    :param seed: seed of the generator
+    :param cyclic: allow cycles of generalizations and parts, otherwise general entities and wholes
+    are always created before their specific entities and parts
+    """
+    generator = random.Random(seed)
+    builder = ModelBuilder()
+    number = generator.randint(3, 10)
+    classes = [builder.add_class(f"C{i}", generator.choice(STEREOTYPES)) for i in range(number)]
+
+    generalizations = {}  # index of general Class -> ids of Generalizations
+    for _ in range(generator.randint(0, number + 2)):
+        specific, general = generator.randrange(number), generator.randrange(number)
+        if not cyclic:
+            if specific == general:
+                continue
+            specific, general = max(specific, general), min(specific, general)
+        generalizations.setdefault(general, []).append(builder.add_generalization(classes[specific], classes[general]))
+    for ids in generalizations.values():
+        if (len(ids) > 1) and (generator.random() < 0.5):
+            builder.add_generalization_set(ids, generator.random() < 0.7, generator.random() < 0.7)
+
+    for _ in range(generator.randint(0, number)):
+        whole, part = generator.randrange(number), generator.randrange(number)
+        if not cyclic:
+            if whole == part:
+                continue
+            whole, part = min(whole, part), max(whole, part)
+        builder.add_part(classes[whole], classes[part],
+                         generator.choice(["componentOf", "subCollectionOf", "memberOf", "subQuantityOf"]))
+    for _ in range(generator.randint(0, number + 2)):
+        builder.add_relation(classes[generator.randrange(number)], classes[generator.randrange(number)],
+                             generator.choice(["material", "mediation", "characterization", "comparative",
+                                               "externalDependence"]),
+                             name=generator.choice([None, "has", "owns", "has part"]),
+                             cardinality_from=generator.choice(["1", "0..1", "1..*", "0..*"]),
+                             cardinality_to=generator.choice(["1", "0..1", "1..*", "0..*"]))
+    return builder.build()
+
+
+def get_changed_graphs(seed: int, steps: int = 30, diagrams: int = 1, model: dict = None) -> Iterator:
+    """
+    Yields the graph of a random model after each of random deletions, folds and abstractions
+    :param seed: seed of the generator, models of odd seeds could have cycles
+    :param steps: maximal number of changes
+    :param diagrams: number of diagrams, each of them shows all elements
+    :param model: model of the graph instead of the random one, diagrams are not added to it
+    """
+    from expose.project.jsongraph import JSONGraph  # settings of expose are loaded by tests, not by benchmarks
+
+    generator = random.Random(seed)
+    if model is None:
+        model = add_diagrams(build_random_model(seed, bool(seed % 2)), diagrams)
+    graph = JSONGraph(model)
+    yield graph
+    for _ in range(steps):
+        entities = list(graph._entity_ids)
+        relations = [_id for _id, relation in graph._relation_ids.items() if relation.from_entity]
+        action = generator.random()
+        if (action < 0.15) and entities:
+            graph.delete_entity(generator.choice(entities))
+        elif (action < 0.3) and relations:
+            graph.delete_relation(generator.choice(relations))
+        elif (action < 0.4) and entities:
+            graph.fold(generator.choice(entities), False, generator.random() < 0.5)
+        else:
+            try:
+                graph.next_abstraction(False, generator.random() < 0.5, generator.random() < 0.5)
+            except StopIteration:
+                if not entities:
+                    return
+        yield graph
@@ -0,0 +1,11 @@
+"""Settings of the server are taken from .env.example, unless they are given in the environment."""
+import os
+import tempfile
+
+from decouple import RepositoryEnv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_FILE_NAME", os.path.join(tempfile.gettempdir(), "expose-tests.log"))
+for key, value in RepositoryEnv(os.path.join(ROOT, ".env.example")).data.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from expose.project import adjacency
+from expose.project.adjacency import AdjacencyIndex, INCOMING, OUTGOING
+
+EDGE_TYPES = ["PartOf", "Relation", "Generalization"]
+NODES = [f"n{i}" for i in range(30)]
+
+
+def check(index: AdjacencyIndex, reference: dict, generator: random.Random):
+    """
+    Compares the index with the reference dict: edge id -> (edge_type, from id, to id), in the order of adding
+    """
+    for node in NODES + ["unknown"]:
+        for edge_type in EDGE_TYPES:
+            outgoing = [to_id for _type, from_id, to_id in reference.values() if (_type, from_id) == (edge_type, node)]
+            incoming = [from_id for _type, from_id, to_id in reference.values() if (_type, to_id) == (edge_type, node)]
+            assert index.get_neighbours(node, edge_type, OUTGOING) == outgoing
+            assert index.get_neighbours(node, edge_type, INCOMING) == incoming
+
+    edge_types = generator.sample(EDGE_TYPES, generator.randint(1, len(EDGE_TYPES)))
+    start = generator.sample(NODES, 2)
+    hop = generator.randint(0, 3)
+    visited, frontier = set(start), set(start)
+    for _ in range(hop):
+        frontier = {node for _type, from_id, to_id in reference.values() if _type in edge_types
+                    for node, other in ((to_id, from_id), (from_id, to_id)) if other in frontier} - visited
+        visited |= frontier
+    assert index.get_reachable(start, hop, edge_types) == visited
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("minimum", [2, adjacency.REBUILD_MINIMUM])
+def test_index_matches_reference(seed, minimum, monkeypatch):
+    monkeypatch.setattr(adjacency, "REBUILD_MINIMUM", minimum)  # small minimum leads to frequent rebuilds
+    generator = random.Random(seed)
+    index = AdjacencyIndex(EDGE_TYPES)
+    reference = {}
+    for step in range(1500):
+        choice = generator.random()
+        if (choice < 0.55) or (not reference):
+            edge = f"e{step}"
+            reference[edge] = (generator.choice(EDGE_TYPES), generator.choice(NODES), generator.choice(NODES))
+            index.add(edge, *reference[edge])
+        elif choice < 0.95:
+            edge = generator.choice(list(reference))
+            del reference[edge]
+            index.remove(edge)
+            index.remove(edge)  # removing twice is ignored
+        else:
+            kept = set(generator.sample(list(reference), len(reference) // 2))
+            reference = {edge: value for edge, value in reference.items() if edge in kept}
+            index.retain(kept)
+        if step % 5 == 0:
+            check(index, reference, generator)
+    check(index, reference, generator)
+
+
+def test_overlay_and_rebuild():
+    index = AdjacencyIndex(["Relation"])
+    index.add("e0", "Relation", "a", "b")
+    assert index.get_neighbours("a", "Relation") == ["b"]  # arrays are built here
+    index.add("e1", "Relation", "a", "c")  # goes to the overlay, also with the new node
+    index.add("e2", "Relation", "c", "a")
+    index.remove("e0")
+    assert index.get_neighbours("a", "Relation") == ["c"]
+    assert index.get_neighbours("a", "Relation", INCOMING) == ["c"]
+    assert index.get_reachable(["b"], 5, ["Relation"]) == {"b"}
+    assert index.get_reachable(["c"], 1, ["Relation"]) == {"a", "c"}
+
+    for number in range(adjacency.REBUILD_MINIMUM + 1):  # exceeds the limit of the overlay
+        index.add(f"x{number}", "Relation", "b", f"n{number}")
+    neighbours = index.get_neighbours("b", "Relation")
+    assert index._overlay == 0
+    assert neighbours == [f"n{number}" for number in range(adjacency.REBUILD_MINIMUM + 1)]
+    assert index.get_neighbours("a", "Relation") == ["c"]
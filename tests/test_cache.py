@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from fastapi.responses import JSONResponse
+
+from expose.cache import ResultCache
+from expose.models import FocusModel
+from expose.operations import apply_focus, run_cached_operation, run_operation
+from expose.project.jsongraph import JSONGraph
+from tests.builder import build_sample_model
+
+
+class Computation:
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self._delay = delay
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return ResultCache.serialize({"result": self.calls, "data": "x" * 80})
+
+
+SIZE = len(ResultCache.serialize({"result": 1, "data": "x" * 80}))
+
+
+def test_results_are_kept_in_memory():
+    cache = ResultCache(memory_limit=2 * SIZE, disk_limit=0, directory="")
+    compute = Computation()
+
+    async def run():
+        first = await cache.get("first", compute)
+        assert await cache.get("first", compute) == first
+        await cache.get("second", compute)
+        await cache.get("first", compute)  # now the second one is least recently used
+        await cache.get("third", compute)
+        await cache.get("first", compute)
+        await cache.get("second", compute)  # computed again
+
+    asyncio.run(run())
+    assert compute.calls == 4
+    assert cache.get_stats() == {"hits": 3, "disk_hits": 0, "misses": 4, "entries": 2, "memory": 2 * SIZE}
+
+
+def test_large_result_is_not_kept():
+    cache = ResultCache(memory_limit=SIZE - 1, disk_limit=0, directory="")
+    compute = Computation()
+    result = asyncio.run(cache.get("key", compute))
+    assert json.loads(result)["result"] == 1
+    assert asyncio.run(cache.get("key", compute)) != result
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_identical_requests_are_computed_once():
+    cache = ResultCache(memory_limit=10 * SIZE, disk_limit=0, directory="")
+    compute = Computation(delay=0.05)
+
+    async def run():
+        first = asyncio.ensure_future(cache.get("key", compute))
+        second = asyncio.ensure_future(cache.get("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()  # the client of the first request is gone
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert json.loads(asyncio.run(run()))["result"] == 1
+    assert compute.calls == 1
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_failed_computation_is_not_kept():
+    cache = ResultCache(memory_limit=10 * SIZE, disk_limit=0, directory="")
+
+    async def fail() -> bytes:
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get("key", fail))
+    assert json.loads(asyncio.run(cache.get("key", Computation())))["result"] == 1
+
+
+def test_results_are_kept_on_disk(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = ResultCache(memory_limit=0, disk_limit=2 * SIZE, directory=directory)
+    compute = Computation()
+    first = asyncio.run(cache.get("first", compute))
+    asyncio.run(cache.get("second", compute))
+    assert sorted(os.listdir(directory)) == ["first.json", "second.json"]
+    os.utime(os.path.join(directory, "first.json"), (1, 1))  # least recently used
+
+    another = ResultCache(memory_limit=10 * SIZE, disk_limit=2 * SIZE, directory=directory)  # e.g. other worker
+    assert asyncio.run(another.get("first", compute)) == first
+    assert compute.calls == 2
+    assert another.get_stats()["disk_hits"] == 1
+
+    os.utime(os.path.join(directory, "second.json"), (1, 1))  # first was read after it
+    asyncio.run(cache.get("third", compute))
+    assert sorted(os.listdir(directory)) == ["first.json", "third.json"]
+
+
+def test_key_depends_on_parameters_only():
+    origin = {"id": "project", "model": {"id": "model", "contents": []}}
+    data = FocusModel(origin=origin, in_format="json", out_format="json", node="c0", hop=1)
+    key = ResultCache.get_key("apply_focus", data)
+    same = FocusModel(origin=dict(reversed(origin.items())), session_id="session", in_format="json",
+                      out_format="json", node="c0", hop=1)
+    assert ResultCache.get_key("apply_focus", same) == key
+    assert ResultCache.get_key("apply_cluster", data) != key
+    assert ResultCache.get_key("apply_focus", data.copy(update={"hop": 2})) != key
+    assert ResultCache.get_key("apply_focus", data.copy(update={"origin": {**origin, "id": "other"}})) != key
+
+
+def test_result_is_serialized_as_response():
+    model, ids = build_sample_model()
+    origin = JSONGraph(model).to_json()
+    data = FocusModel(origin=origin, in_format="json", out_format="json", node=ids["student"], hop=1)
+    result = run_cached_operation(apply_focus, data)  # is executed in the worker
+    assert result == JSONResponse(run_operation(apply_focus, data)).body
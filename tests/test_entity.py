@@ -0,0 +1,148 @@
+import copy
+import random
+
+import pytest
+
+from expose.project import GENERAL_TYPE, PART_OF_TYPE, RELATION_TYPE, RestDict
+from expose.project.entity import EdgeMap, EdgeSet, Entity, NO_EDGE_MAP, NO_EDGES
+from expose.project.jsongraph import JSONGraph
+from tests.builder import add_diagrams, build_random_model, get_changed_graphs
+
+
+@pytest.mark.parametrize("change", [
+    lambda edges: edges.add("r0"),
+    lambda edges: edges.remove("r0"),
+    lambda edges: edges.__setitem__("r0", None),
+    lambda edges: edges.__delitem__("r0"),
+    lambda edges: edges.update({"r0": None}),
+    lambda edges: edges.setdefault("r0"),
+    lambda edges: edges.pop("r0"),
+    lambda edges: edges.popitem(),
+    lambda edges: edges.clear(),
+    lambda edges: edges.__ior__({"r0": None}),
+])
+def test_shared_empty_edges_could_not_be_changed(change):
+    for shared in (NO_EDGES, NO_EDGE_MAP, NO_EDGE_MAP["PartOf"]):
+        with pytest.raises(TypeError):
+            change(shared)
+    assert (len(NO_EDGES), len(NO_EDGE_MAP)) == (0, 0)
+
+
+def test_edges_of_entities_are_independent():
+    first = Entity(Entity.init_entity("First", "kind"))
+    second = Entity(Entity.init_entity("Second", "kind"))
+    assert first.out_edges is second.out_edges is NO_EDGE_MAP
+    assert first.out_edges["PartOf"] is NO_EDGES
+
+    first.add_outgoing("PartOf", "r0")
+    first.add_incoming("Relation", "r1")
+    assert isinstance(first.out_edges, EdgeMap) and isinstance(first.out_edges["PartOf"], EdgeSet)
+    assert list(first.out_edges["PartOf"]) == ["r0"]
+    assert first.out_edges["Relation"] is NO_EDGES
+    assert (second.out_edges["PartOf"], second.in_edges["Relation"]) == (NO_EDGES, NO_EDGES)
+
+    first.del_outgoing("PartOf", "r0")
+    assert list(first.get_out_edges("PartOf")) == []
+    with pytest.raises(TypeError):
+        second.del_outgoing("PartOf", "r0")  # no relations of the type
+
+
+def test_edges_are_the_same_as_in_lists():
+    """
+    Edges of each type keep the order of the lists they replaced, also after removals
+    """
+    generator = random.Random(0)
+    entity = Entity(Entity.init_entity("Entity", "kind"))
+    types = [PART_OF_TYPE, RELATION_TYPE, GENERAL_TYPE]
+    lists = {(direction, _type): [] for direction in ("in", "out") for _type in types}
+    for step in range(2000):
+        direction, _type = key = generator.choice(list(lists))
+        if lists[key] and (generator.random() < 0.45):
+            relation_id = generator.choice(lists[key])
+            lists[key].remove(relation_id)
+            (entity.del_incoming if direction == "in" else entity.del_outgoing)(_type, relation_id)
+        else:
+            relation_id = f"r{step}"
+            lists[key].append(relation_id)
+            (entity.add_incoming if direction == "in" else entity.add_outgoing)(_type, relation_id)
+
+        for edge_type in types:
+            assert list(entity.get_in_edges(edge_type)) == lists[("in", edge_type)]
+            assert list(entity.get_out_edges(edge_type)) == lists[("out", edge_type)]
+        assert entity.get_in_edges() == sum((lists[("in", edge_type)] for edge_type in types), [])
+        assert list(entity.iter_out_edges()) == sum((lists[("out", edge_type)] for edge_type in types), [])
+        assert entity.get_number_of_edges() == sum(map(len, lists.values()))
+        assert entity.has_other_up_edges() == \
+            (len(lists[("out", PART_OF_TYPE)]) + len(lists[("out", GENERAL_TYPE)]) > 1)
+        if lists[key]:
+            idx = generator.randrange(len(lists[key]))
+            edges = entity.in_edges[_type] if direction == "in" else entity.out_edges[_type]
+            assert edges.nth(idx) == lists[key][idx]
+
+    kept = set(lists[("in", RELATION_TYPE)][::2])
+    entity.retain_edges(kept)
+    assert list(entity.in_edges[RELATION_TYPE]) == lists[("in", RELATION_TYPE)][::2]
+    assert list(entity.out_edges[PART_OF_TYPE]) == []
+    with pytest.raises(IndexError):
+        entity.in_edges[RELATION_TYPE].nth(len(kept))
+
+
+def test_rest_is_the_same_as_dict():
+    """
+    RestDict behaves as the dict that was copied from its base, the base is not changed
+    """
+    generator = random.Random(0)
+    for _ in range(300):
+        base = {f"key{number}": [number] for number in range(generator.randint(0, 6))}
+        origin = copy.deepcopy(base)
+        hidden = frozenset(generator.sample(list(base), generator.randint(0, len(base))))
+        rest = RestDict(base, hidden)
+        expected = {key: value for key, value in copy.deepcopy(base).items() if key not in hidden}
+        copies = []
+        for step in range(30):
+            key, action = f"key{generator.randrange(8)}", generator.random()
+            if action < 0.3:
+                rest[key] = [step]
+                expected[key] = [step]
+            elif action < 0.5:
+                if key in expected:
+                    del rest[key]
+                    del expected[key]
+                else:
+                    with pytest.raises(KeyError):
+                        del rest[key]
+            elif (action < 0.7) and (key in expected):
+                rest.own(key).append(step)
+                expected[key].append(step)
+            elif action < 0.8:
+                copies.append((rest.copy(), copy.deepcopy(expected)))
+            else:
+                assert rest.get(key) == expected.get(key)
+                assert (key in rest) == (key in expected)
+            assert list(rest.items()) == list(expected.items())
+            assert list(rest.to_json().items()) == list(expected.items())
+            assert len(rest) == len(expected)
+        assert base == origin
+        for rest_copy, expected_copy in copies:  # copies are not changed with the original
+            assert list(rest_copy.to_json().items()) == list(expected_copy.items())
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_graphs_do_not_change_the_model(seed):
+    model = add_diagrams(build_random_model(seed, bool(seed % 2)), 1)
+    origin = copy.deepcopy(model)
+    shared = JSONGraph(model)
+    expected = JSONGraph(copy.deepcopy(model)).to_json()
+    for graph in get_changed_graphs(seed, model=model):
+        graph.to_json()
+    for abstract in ("abstract_aspects", "abstract_parthoods", "abstract_hierarchies"):
+        graph = JSONGraph(model)
+        if abstract == "abstract_aspects":
+            graph.abstract_aspects(True, True, False)
+        else:
+            getattr(graph, abstract)(True, True)
+        for entity in list(graph._entity_ids.values())[:3]:
+            graph.expand(entity.id, graph.get_hierarchy(graph.get_node_index(entity.id)))
+        graph.to_json()
+    assert model == origin
+    assert shared.to_json() == expected  # graphs of the same model do not share changes
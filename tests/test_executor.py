@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fastapi import HTTPException
+
+from expose import ERR_NO_SESSION, ERR_QUEUE_FULL, ERR_TIMEOUT
+from expose import main
+from expose.executor import GraphExecutor, QueueFullError
+from expose.models import FocusModel
+from expose.operations import apply_focus, get_clusters
+from expose.session import SessionStorage
+
+
+@pytest.fixture
+def executor():
+    executor = GraphExecutor(worker_type="thread", workers=1, queue_size=1, timeout=1)
+    yield executor
+    executor.shutdown()
+
+
+def wait_for_pending(executor: GraphExecutor, pending: int):
+    deadline = time.monotonic() + 5
+    while (executor.pending != pending) and (time.monotonic() < deadline):
+        time.sleep(0.01)
+    assert executor.pending == pending
+
+
+def test_queue_is_bounded(executor):
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait, stateless=False))
+        waiting = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        assert executor.pending == 2  # one in the worker, one in the queue
+        with pytest.raises(QueueFullError):
+            await executor.run(release.wait)
+        release.set()
+        assert await running and await waiting
+        return await executor.run(sum, [1, 2])
+
+    assert asyncio.run(run()) == 3
+    wait_for_pending(executor, 0)
+
+
+def test_timed_out_task_is_pending_until_finished(executor):
+    executor._timeout = 0.05
+    release = threading.Event()
+    with pytest.raises(TimeoutError):
+        asyncio.run(executor.run(release.wait))
+    assert executor.pending == 1  # the worker is still busy
+    release.set()
+    wait_for_pending(executor, 0)
+
+
+def test_process_pool():
+    executor = GraphExecutor(worker_type="process", workers=1, queue_size=0, timeout=10)
+    try:
+        assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+        assert asyncio.run(executor.run(threading.get_ident, stateless=False)) != threading.get_ident()
+    finally:
+        executor.shutdown()
+    wait_for_pending(executor, 0)
+
+
+def test_errors_of_workers(executor, monkeypatch):
+    monkeypatch.setattr(main, "executor", executor)
+    release = threading.Event()
+
+    async def run_when_full():
+        running = asyncio.ensure_future(main.run_in_worker(release.wait))
+        waiting = asyncio.ensure_future(main.run_in_worker(release.wait))
+        await asyncio.sleep(0)
+        try:
+            await main.run_in_worker(release.wait)
+        finally:
+            release.set()
+            await asyncio.gather(running, waiting)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_when_full())
+    assert (error.value.status_code, error.value.detail) == (503, ERR_QUEUE_FULL)
+    wait_for_pending(executor, 0)
+
+    release.clear()
+    executor._timeout = 0.05
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.run_in_worker(release.wait))
+    assert (error.value.status_code, error.value.detail) == (504, ERR_TIMEOUT)
+    release.set()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.run_in_worker(int, "not a number"))
+    assert error.value.status_code == 400
+
+
+def test_removed_session_is_not_found(monkeypatch):
+    monkeypatch.setattr(main, "sessions", SessionStorage())
+    data = FocusModel(session_id="removed", in_format="json", out_format="json", node="c0", hop=1)
+    for run in (main.execute(apply_focus, data), main.execute_query(get_clusters, data)):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(run)
+        assert (error.value.status_code, error.value.detail) == (404, ERR_NO_SESSION)
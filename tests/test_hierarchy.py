@@ -0,0 +1,173 @@
+import pytest
+
+from benchmarks.models import generate_model
+from expose.project import GENERAL_TYPE
+from expose.project.jsongraph import JSONGraph
+from tests.builder import ModelBuilder
+
+
+def get_ends(graph: JSONGraph) -> list:
+    return sorted([(end["name"], end["cardinality"]) for end in element["properties"]]
+                  for element in graph.to_json()["model"]["contents"] if element["type"] == "Relation")
+
+
+@pytest.mark.parametrize("long_names", [False, True])
+def test_relations_of_folded_chain_are_merged(long_names):
+    """
+    Relations moved twice (Relator to Subkind, then Subkind to Phase) keep their role names and
+    cardinalities, as the cloned relations share live ends with the graph
+    """
+    builder = ModelBuilder()
+    phase = builder.add_class("Phase", "phase")
+    subkind = builder.add_class("Subkind", "subkind")
+    relator = builder.add_class("Relator", "relator")
+    builder.add_generalization(subkind, phase)
+    builder.add_generalization(relator, subkind)
+    builder.add_relation(subkind, relator, "material", "has", "1", "0..*")
+    builder.add_relation(phase, subkind, "material", None, "1", "1")
+    builder.add_relation(phase, relator, "material", None, "0..1", "1..*")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_hierarchies(long_names, True)
+    assert [entity.name for entity in graph._entity_ids.values()] == ["Phase"]
+    assert get_ends(graph) == [[(None, "0..1"), ("Relator", "1..*")],
+                               [(None, "0..1"), ("Subkind", "1")]]
+    assert graph.get_rule() == "H2"
+    # moved copies refer to the entities of the graph, not to their copies
+    for relation in graph._relation_ids.values():
+        assert graph._entity_ids[relation.from_entity.id] is relation.from_entity
+        assert graph._entity_ids[relation.to_entity.id] is relation.to_entity
+
+
+def test_recursive_non_sortal_is_pushed_down():
+    """
+    Non-sortal that is its own specific entity receives its relations while they are moved down,
+    such relations are not moved again
+    """
+    builder = ModelBuilder()
+    customer = builder.add_class("Customer", "roleMixin")
+    person = builder.add_class("Person")
+    shop = builder.add_class("Shop")
+    builder.add_generalization(customer, customer)
+    builder.add_generalization(person, customer)
+    builder.add_relation(shop, customer, "material", None, "1", "0..*")
+    builder.add_relation(customer, shop, "material", "buys", "0..*", "1")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_hierarchies(False, True)
+    assert [entity.name for entity in graph._entity_ids.values()] == ["Person", "Shop"]
+    assert [(relation.from_entity.name, relation.to_entity.name, relation.role_to)
+            for relation in graph._relation_ids.values()] == [("Shop", "Person", "Customer")]
+    assert graph.get_rule() == "H1"
+
+
+def test_general_entity_of_set_deleted_while_folded():
+    """
+    Subkind is its own specific entity, so it is abstracted while its generalization set is folded,
+    no enumeration is created for the deleted entity
+    """
+    builder = ModelBuilder()
+    subkind = builder.add_class("Subkind", "subkind")
+    quantity = builder.add_class("Quantity", "quantity")
+    builder.add_generalization_set([builder.add_generalization(subkind, subkind),
+                                    builder.add_generalization(quantity, subkind)], True, False)
+
+    graph = JSONGraph(builder.build())
+    graph.next_abstraction(False, True, False)
+    assert [(element["type"], element["name"]) for element in graph.to_json()["model"]["contents"]] == \
+           [("Class", "Quantity")]
+    assert graph.get_rule() == "H2"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_each_generalization_is_abstracted_once(seed):
+    """
+    Deep hierarchies are folded leaves-first, no generalization is abstracted twice
+    """
+    graph = JSONGraph(generate_model(seed, kinds=10, depth=10))
+    generalizations = set(graph._relations[GENERAL_TYPE])
+    abstracted = []
+    abstract = graph._abstract_generalization_steps
+
+    def counted(generalization, *args):
+        abstracted.append(generalization)
+        return abstract(generalization, *args)
+
+    graph._abstract_generalization_steps = counted
+    graph.abstract_hierarchies(False, True)
+    assert not graph._relations[GENERAL_TYPE]
+    assert len(abstracted) == len(set(abstracted))
+    assert set(abstracted) <= generalizations
+
+
+def get_closures(graph: JSONGraph) -> dict:
+    return {_id: (graph.get_ancestors(_id), graph.get_descendants(_id), set(graph.get_generalization_sets(_id)),
+                  graph._get_top_hierarchy(_id), graph._get_bottom_hierarchy(_id)) for _id in graph._entity_ids}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_closures_are_the_same_as_in_new_graph(seed):
+    """
+    Closures and GeneralizationSets kept in the index are updated after each change of the graph
+    """
+    graph = JSONGraph(generate_model(seed, kinds=6, depth=4))
+    for step in range(60):
+        closures = get_closures(graph)  # all of them are calculated before the next change
+        assert closures == get_closures(JSONGraph(graph.to_json())), step
+        if step % 5 == 4:
+            graph.delete_entity(list(graph._entity_ids)[step % len(graph._entity_ids)])
+        else:
+            try:
+                graph.next_abstraction(False, True, False)
+            except StopIteration:
+                break
+
+
+def test_hierarchy_of_diamond():
+    """
+    Specific entity of two general ones is visited once, the hierarchy contains its specific entity once
+    """
+    builder = ModelBuilder()
+    kind = builder.add_class("Kind")
+    left = builder.add_class("Left", "subkind")
+    right = builder.add_class("Right", "subkind")
+    bottom = builder.add_class("Bottom", "role")
+    leaf = builder.add_class("Leaf", "role")
+    builder.add_generalization_set([builder.add_generalization(left, kind),
+                                    builder.add_generalization(right, kind)], True, False)
+    builder.add_generalization(bottom, left)
+    builder.add_generalization(bottom, right)
+    builder.add_generalization(leaf, bottom)
+
+    graph = JSONGraph(builder.build())
+    hierarchy = graph.get_hierarchy(graph.get_node_index(kind))
+    assert hierarchy["nodes"] == {"kind :is_a: kind": ["left :is_a: subkind", "right :is_a: subkind"],
+                                  "left :is_a: subkind": ["bottom :is_a: role"],
+                                  "right :is_a: subkind": ["bottom :is_a: role"],
+                                  "bottom :is_a: role": ["leaf :is_a: role"],
+                                  "leaf :is_a: role": []}
+    assert list(hierarchy["sets"].values()) == [{"to": "kind :is_a: kind",
+                                                 "from": ["left :is_a: subkind", "right :is_a: subkind"],
+                                                 "complete": True, "disjoint": False}]
+    assert graph.get_descendants(kind) == {kind, left, right, bottom, leaf}
+    assert graph.get_ancestors(leaf) == {leaf, bottom, left, right, kind}
+
+
+def test_expand_does_not_create_cycles():
+    """
+    Generalizations of the expanded hierarchy that are opposite to the existing ones are skipped
+    """
+    builder = ModelBuilder()
+    person = builder.add_class("Person")
+    student = builder.add_class("Student", "role")
+    builder.add_generalization(student, person)
+
+    graph = JSONGraph(builder.build())
+    graph.expand(person, {"nodes": {"student :is_a: role": ["person :is_a: kind", "employee :is_a: role"],
+                                    "person :is_a: kind": [], "employee :is_a: role": []},
+                          "sets": {"gs": {"to": "student :is_a: role", "complete": False, "disjoint": True,
+                                          "from": ["person :is_a: kind", "employee :is_a: role"]}}})
+    assert sorted((relation.from_entity.name, relation.to_entity.name)
+                  for relation in graph._relations[GENERAL_TYPE]) == [("Employee", "Student"), ("Student", "Person")]
+    assert not graph._generalization_set_ids  # only one generalization is left in the set
+    assert graph.get_ancestors(student) == {student, person}
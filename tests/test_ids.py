@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from expose.project import generate_id
+from expose.project import ids
+from expose.project.ids import ALPHABET, DeterministicIdProvider, RandomIdProvider, create_id_provider, \
+    get_id_provider, use_id_provider
+from tests.conftest import ROOT
+
+
+def test_random_ids():
+    provider = RandomIdProvider(buffer_size=10)  # the buffer is refilled many times
+    generated = [provider.generate(length) for length in [16, 3, 25, 1] * 500]
+    assert [len(_id) for _id in generated[:4]] == [16, 3, 25, 1]
+    assert set("".join(generated)) <= set(ALPHABET)
+    long_ids = generated[::4]
+    assert len(set(long_ids)) == len(long_ids)
+
+
+def test_random_ids_after_fork():
+    provider = RandomIdProvider()
+    provider.generate()
+    buffer = provider._buffer
+    provider._pid = -1  # as in a forked worker
+    provider.generate()
+    assert (provider._pid == os.getpid()) and (provider._buffer != buffer)
+
+
+def test_deterministic_ids():
+    first, second = DeterministicIdProvider("model", "focus"), DeterministicIdProvider("model", "focus")
+    generated = [first.generate() for _ in range(100)]
+    assert generated == [second.generate() for _ in range(100)]
+    assert len(set(generated)) == len(generated) and set("".join(generated)) <= set(ALPHABET)
+    assert DeterministicIdProvider("model", "fold").generate() != generated[0]
+    assert DeterministicIdProvider("other", "focus").generate() != generated[0]
+    assert len(DeterministicIdProvider("model", "focus").generate(5)) == 5
+
+
+def test_provider_of_operation(monkeypatch):
+    def get_source():
+        calls.append(True)
+        return {"model": [1, 2]}
+
+    calls = []
+    assert create_id_provider("focus", get_source) is get_id_provider()  # random provider by default
+    assert not calls
+    monkeypatch.setattr(ids, "ID_MODE", "deterministic")
+    provider = create_id_provider("focus", get_source)
+    assert calls and isinstance(provider, DeterministicIdProvider)
+    expected = create_id_provider("focus", get_source).generate()
+    with use_id_provider(provider):
+        assert generate_id() == expected
+    assert get_id_provider() is not provider
+
+
+@pytest.mark.parametrize("hash_seed", ["1", "2"])
+def test_deterministic_output_does_not_depend_on_hash_seed(hash_seed):
+    script = "\n".join([
+        "import json",
+        "import tests.conftest",
+        "from expose.models import AbstractModel",
+        "from expose.operations import apply_abstract, run_operation",
+        "from tests.builder import build_random_model",
+        "for seed in range(20):",
+        "    data = AbstractModel(origin=build_random_model(seed, False), in_format='json', out_format='json',",
+        "                         abs_type=['parthood', 'hierarchy', 'aspects'])",
+        "    print(json.dumps(run_operation(apply_abstract, data), sort_keys=True))",
+    ])
+    outputs = []
+    for seed in ("0", hash_seed):
+        environment = {**os.environ, "PYTHONHASHSEED": seed, "ID_MODE": "deterministic", "PYTHONPATH": ROOT}
+        outputs.append(subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=environment, check=True,
+                                      capture_output=True, text=True).stdout)
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0].splitlines()) == 20 and json.loads(outputs[0].splitlines()[0])
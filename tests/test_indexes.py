@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from expose.project import ElementBucket
+from tests.builder import get_changed_graphs
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_relation_pairs(seed):
+    for graph in get_changed_graphs(seed):
+        pairs = {}
+        for relation in graph._relation_ids.values():
+            if relation.from_entity:  # prototypes of Generalizations are not indexed
+                key = graph._get_pair_key(relation.from_entity.id, relation.to_entity.id, relation.type)
+                pairs.setdefault(key, []).append(relation.id)
+        assert {key: list(relations) for key, relations in graph._relation_pairs.items()} == pairs
+        for relation in graph._relation_ids.values():
+            assert relation.name_tokens == (set(relation.name.lower().split(" ")) if relation.name else set())
+
+
+def test_element_bucket():
+    class Element:
+        def __init__(self, _id: str):
+            self.id = _id
+
+    generator = random.Random(0)
+    bucket, elements = ElementBucket(), []
+    for step in range(500):
+        if elements and (generator.random() < 0.4):
+            element = elements.pop(generator.randrange(len(elements)))
+            bucket.remove(element)
+            assert element not in bucket
+        else:
+            elements.append(Element(f"e{step}"))
+            bucket.add(elements[-1])
+        assert list(bucket) == elements
+        assert len(bucket) == len(elements)
+        if elements:
+            idx = generator.randrange(len(elements))
+            assert (bucket.nth(idx) is elements[idx]) and (elements[idx] in bucket)
+    with pytest.raises(IndexError):
+        bucket.nth(len(elements))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_buckets_of_entities_and_relations(seed):
+    for graph in get_changed_graphs(seed):
+        entities, relations = {}, {}
+        for entity in graph._entity_ids.values():
+            entities.setdefault(entity.stereotype, []).append(entity)
+        for relation in graph._relation_ids.values():
+            if relation.from_entity:
+                relations.setdefault(relation.type, []).append(relation)
+        assert {stereotype: list(bucket) for stereotype, bucket in graph._entities.items() if bucket} == entities
+        assert {_type: list(bucket) for _type, bucket in graph._relations.items() if bucket} == relations
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_views_of_elements(seed):
+    for graph in get_changed_graphs(seed, diagrams=3):
+        elements = [*graph._entity_ids.values(), *graph._relation_ids.values(),
+                    *graph._generalization_set_ids.values()]
+        for element in elements:
+            for diagram_id in graph._diagrams:
+                assert element.get_view(diagram_id) is \
+                       next((view for view in element.views if view.diagram_id == diagram_id), None)
+            for view in element.views:
+                assert element.has_view(view.id)
+                assert graph._diagrams[view.diagram_id].elements[view.id] is view  # no stale views
+            assert not element.has_view("unknown")
+            assert element.get_all_diagrams() == {view.diagram_id for view in element.views}
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from expose.project.jsongraph import JSONGraph
+from tests.builder import build_sample_model
+
+
+def clear_caches(graph: JSONGraph):
+    elements = [*graph._entity_ids.values(), *graph._relation_ids.values(),
+                *graph._generalization_set_ids.values()]
+    for element in elements:
+        element._json = None
+        for view in element.views:
+            view._json = None
+    for diagram in graph._diagrams.values():
+        for view in diagram.elements.values():
+            view._json = None
+
+
+def assert_fresh(graph: JSONGraph):
+    cached = json.dumps(graph.to_json(), sort_keys=True)
+    clear_caches(graph)
+    assert cached == json.dumps(graph.to_json(), sort_keys=True)
+
+
+def get_hierarchy(graph: JSONGraph, ids: dict) -> dict:
+    return JSONGraph(build_sample_model()[0]).get_hierarchy(graph.get_node_index(ids["person"]))
+
+
+OPERATIONS = {
+    "focus": lambda graph, ids: graph.focus(ids["student"], 1),
+    "cluster": lambda graph, ids: graph.cluster(ids["enrollment"]),
+    "delete_entity": lambda graph, ids: graph.delete_entity(ids["adult"]),
+    "delete_relation": lambda graph, ids: graph.delete_relation(ids["studies"]),
+    "fold": lambda graph, ids: graph.fold(ids["car"], True, False),
+    "expand": lambda graph, ids: graph.expand(ids["university"], get_hierarchy(graph, ids)),
+    "abstract_parthoods": lambda graph, ids: graph.abstract_parthoods(True, False),
+    "abstract_hierarchies": lambda graph, ids: graph.abstract_hierarchies(False, True),
+    "abstract_aspects": lambda graph, ids: graph.abstract_aspects(False, False, False),
+}
+
+
+@pytest.mark.parametrize("operation", OPERATIONS.keys())
+def test_cached_json_is_fresh(operation):
+    model, ids = build_sample_model()
+    graph = JSONGraph(model)
+    graph.to_json()  # fill the caches before changes
+    OPERATIONS[operation](graph, ids)
+    assert_fresh(graph)
+
+
+@pytest.mark.parametrize("long_names, mult_relations, keep_relators", [(False, True, False), (True, False, True)])
+def test_cached_json_is_fresh_after_each_abstraction(long_names, mult_relations, keep_relators):
+    graph = JSONGraph(build_sample_model()[0])
+    graph.to_json()
+    steps = 0
+    while True:
+        try:
+            graph.next_abstraction(long_names, mult_relations, keep_relators)
+        except StopIteration:
+            break
+        assert_fresh(graph)
+        steps += 1
+    assert steps > 1
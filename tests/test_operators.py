@@ -0,0 +1,166 @@
+import pytest
+
+from expose.project import GENERAL_TYPE, KINDS_STEREOTYPES, NON_SORTAL_STEREOTYPES, PART_OF_TYPE, RELATION_TYPE, \
+    SORTAL_STEREOTYPES, ClassStereotype, RelationStereotype
+from expose.project.jsongraph import JSONGraph
+from tests.builder import ModelBuilder, get_changed_graphs
+
+EDGE_TYPES = [PART_OF_TYPE, RELATION_TYPE, GENERAL_TYPE]
+
+
+def get_focus_nodes_by_scan(graph: JSONGraph, node: str, hop: int, edge_types: list) -> set:
+    """
+    Finds nodes in focus as it was done before the breadth-first search, all occurrences are expanded at each hop
+    """
+    nodes = [node]
+    idx = 0
+    while hop > 0:
+        length = len(nodes)
+        while idx < length:
+            for edge_type in edge_types:
+                for edge in graph._entity_ids[nodes[idx]].get_out_edges(edge_type):
+                    nodes.append(graph._relation_ids[edge].to_entity.id)
+                for edge in graph._entity_ids[nodes[idx]].get_in_edges(edge_type):
+                    nodes.append(graph._relation_ids[edge].from_entity.id)
+            idx += 1
+        hop -= 1
+    return set(nodes)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_focus_nodes_are_the_same_as_by_scan(seed):
+    for graph in get_changed_graphs(seed, 10):
+        for node in graph._entity_ids:
+            for hop in range(4):
+                assert graph._get_focus_nodes([node], hop) == get_focus_nodes_by_scan(graph, node, hop, EDGE_TYPES)
+            for edge_types in ([PART_OF_TYPE], [RELATION_TYPE, GENERAL_TYPE]):
+                assert graph._get_focus_nodes([node], 2, edge_types) == \
+                       get_focus_nodes_by_scan(graph, node, 2, edge_types)
+        nodes = list(graph._entity_ids)[:3]
+        assert graph._get_focus_nodes(nodes, 2) == \
+               set().union(*(get_focus_nodes_by_scan(graph, node, 2, EDGE_TYPES) for node in nodes))
+
+
+def test_focus_on_several_nodes():
+    graph = next(get_changed_graphs(2))
+    first, second = list(graph._entity_ids)[:2]
+    with pytest.raises(ValueError, match="unknown"):
+        graph.focus([first, "unknown"], 1)
+    nodes = graph._get_focus_nodes([first, second], 1)
+    graph.focus([first, second], 1)
+    assert set(graph._entity_ids) == nodes
+
+
+def delete_other_entities(graph: JSONGraph, nodes: set):
+    """
+    Keeps the given nodes as it was done before the extraction of subgraphs, by deleting all other entities
+    """
+    for node in [_id for _id in graph._entity_ids if _id not in nodes]:
+        graph.delete_entity(node)
+
+
+def get_state(graph: JSONGraph) -> tuple:
+    return (graph.to_json(), {key: list(relations) for key, relations in graph._relation_pairs.items()},
+            {kind: graph._worklist.first(kind) for kind in [PART_OF_TYPE, GENERAL_TYPE]},
+            {node: graph._get_focus_nodes([node], 1) for node in graph._entity_ids})
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_extracted_subgraph_is_the_same_as_after_deletion(seed):
+    for step, graph in enumerate(get_changed_graphs(seed, 10)):
+        model = graph.to_json()
+        for node in list(graph._entity_ids)[step % 3::3]:
+            focused, expected = JSONGraph(model), JSONGraph(model)
+            focused.focus(node, 1)
+            delete_other_entities(expected, expected._get_focus_nodes([node], 1))
+            assert get_state(focused) == get_state(expected)
+            if expected._entity_ids[node].stereotype == "relator":
+                clustered, expected = JSONGraph(model), JSONGraph(model)
+                clustered.cluster(node)
+                delete_other_entities(expected, expected._get_cluster_nodes(node, {}))
+                assert get_state(clustered) == get_state(expected)
+
+
+class ClusterByScan:
+    """
+    Relator-centric clustering as it was done before sets and memoisation, with lists and recursion
+    """
+    def __init__(self, graph: JSONGraph):
+        self.graph = graph
+
+    def get_cluster_nodes(self, relator: str) -> list:
+        nodes = self.get_bottom_hierarchy(relator)
+        mediated = []
+        for node in nodes:
+            for edge in self.graph._entity_ids[node].get_out_edges(edge_type=RELATION_TYPE):
+                if self.graph._relation_ids[edge].stereotype == RelationStereotype.MEDIATION.value:
+                    mediated.append(self.graph._relation_ids[edge].to_entity.id)
+        for node in mediated:
+            stereotype = self.graph._entity_ids[node].stereotype
+            if stereotype == ClassStereotype.RELATOR.value:
+                nodes.extend([n for n in self.get_cluster_nodes(node) if n not in nodes])
+            elif stereotype in NON_SORTAL_STEREOTYPES:
+                for new_node in self.get_bottom_hierarchy(node):
+                    nodes.extend([n for n in self.get_top_hierarchy(new_node) if n not in nodes])
+            elif stereotype in SORTAL_STEREOTYPES:
+                nodes.extend([n for n in self.get_top_hierarchy(node) if n not in nodes])
+        return nodes
+
+    def get_top_hierarchy(self, node: str) -> list:
+        nodes = [node]
+        idx = 0
+        while idx < len(nodes):
+            entity = self.graph._entity_ids[nodes[idx]]
+            if entity.stereotype and (entity.stereotype not in KINDS_STEREOTYPES):
+                for out_edge in entity.get_out_edges(edge_type=GENERAL_TYPE):
+                    top_concept = self.graph._relation_ids[out_edge].to_entity.id
+                    nodes.extend([n for n in self.get_bottom_hierarchy(top_concept, out_edge) if n not in nodes])
+            idx += 1
+        return nodes
+
+    def get_bottom_hierarchy(self, node: str, desc_edge: str = "") -> list:
+        nodes = [node]
+        if desc_edge:
+            set_id = self.graph._relation_ids[desc_edge].set
+            if set_id and self.graph._generalization_set_ids[set_id].is_complete_and_disjoint():
+                for generalization in self.graph._generalization_set_ids[set_id].generalizations:
+                    nodes.append(generalization.from_entity.id)
+            else:
+                nodes.append(self.graph._relation_ids[desc_edge].from_entity.id)
+        else:
+            idx = 0
+            while idx < len(nodes):
+                if self.graph._entity_ids[nodes[idx]].stereotype in \
+                        NON_SORTAL_STEREOTYPES + [ClassStereotype.RELATOR.value]:
+                    for edge in self.graph._entity_ids[nodes[idx]].get_in_edges(edge_type=GENERAL_TYPE):
+                        nodes.append(self.graph._relation_ids[edge].from_entity.id)
+                idx += 1
+        return nodes
+
+
+@pytest.mark.parametrize("seed", range(0, 200, 2))  # without cycles of generalizations
+def test_clusters_are_the_same_as_by_scan(seed):
+    for graph in get_changed_graphs(seed, 10):
+        clusters = graph.get_clusters()
+        for relator in clusters:
+            assert set(clusters[relator]) == graph._get_cluster_nodes(relator, {})
+            assert set(clusters[relator]) == set(ClusterByScan(graph).get_cluster_nodes(relator))
+
+
+def test_cluster_of_relators_mediating_each_other():
+    builder = ModelBuilder()
+    marriage = builder.add_class("Marriage", "relator")
+    wedding = builder.add_class("Wedding", "relator")
+    person = builder.add_class("Person")
+    husband = builder.add_class("Husband", "role")
+    builder.add_generalization(husband, person)
+    builder.add_relation(marriage, wedding, "mediation")
+    builder.add_relation(wedding, marriage, "mediation")
+    builder.add_relation(wedding, husband, "mediation")
+    builder.add_class("Other")
+
+    graph = JSONGraph(builder.build())
+    assert graph.get_clusters() == {marriage: [marriage, wedding, person, husband],
+                                    wedding: [marriage, wedding, person, husband]}
+    graph.cluster(marriage)
+    assert set(graph._entity_ids) == {marriage, wedding, person, husband}
@@ -0,0 +1,135 @@
+import copy
+import io
+import json
+import random
+import sys
+
+import ijson
+import pytest
+
+from benchmarks.models import nest_packages
+from expose.project import PACKAGE_TYPE
+from expose.project.element import Model
+from expose.project.jsongraph import JSONGraph
+from tests.builder import add_diagrams, build_random_model, build_sample_model
+
+
+def nest_randomly(model: dict, generator: random.Random) -> dict:
+    """
+    Spreads elements of the model over a random tree of Packages, with empty Packages and Packages without contents
+    """
+    packages = [model["model"]]
+    elements, model["model"]["contents"] = model["model"]["contents"], []
+    for number, element in enumerate(elements):
+        if generator.random() < 0.3:
+            package = {"id": f"package{number}", "name": f"Package{number}", "description": None,
+                       "type": PACKAGE_TYPE, "propertyAssignments": None, "contents": []}
+            if generator.random() < 0.5:  # contents before other keys
+                package = {"contents": [], **package}
+            generator.choice(packages)["contents"].append(package)
+            packages.append(package)
+        if generator.random() < 0.1:
+            generator.choice(packages)["contents"].append({"id": f"empty{number}", "name": "", "description": None,
+                                                           "type": PACKAGE_TYPE, "propertyAssignments": None,
+                                                           "contents": generator.choice([None, []])})
+        generator.choice(packages)["contents"].append(element)
+    return model
+
+
+def get_all_elements(contents: list) -> list:
+    """
+    Flattens the tree of Packages recursively, as it was done before the single walk
+    """
+    result = []
+    for content in contents or []:
+        if content["type"] == PACKAGE_TYPE:
+            result += get_all_elements(content["contents"])
+        else:
+            result += [content]
+    return result
+
+
+def get_packages(package: dict) -> tuple:
+    return package["id"], [get_packages(content) for content in package["contents"] or []
+                           if content["type"] == PACKAGE_TYPE]
+
+
+def get_elements(graph: JSONGraph) -> list:
+    return [element for element in graph.to_json()["model"]["contents"] if element["type"] != PACKAGE_TYPE]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_elements_and_packages_are_walked_once(seed):
+    flat = build_random_model(seed, bool(seed % 2))
+    nested = nest_randomly(copy.deepcopy(flat), random.Random(seed))
+    model = Model(nested["model"])
+    assert list(JSONGraph.iter_elements(model, nested["model"])) == get_all_elements(nested["model"]["contents"])
+    assert get_packages(model.to_json()) == get_packages(nested["model"])
+
+    graph = JSONGraph(copy.deepcopy(nested))
+    assert get_packages(graph.to_json()["model"]) == get_packages(nested["model"])
+    flat["model"]["contents"] = get_all_elements(copy.deepcopy(nested)["model"]["contents"])
+    assert get_elements(graph) == get_elements(JSONGraph(flat))
+
+
+def test_packages_deeper_than_recursion_limit():
+    model, ids = build_sample_model()
+    depth = sys.getrecursionlimit() + 100
+    graph = JSONGraph(nest_packages(model, depth))
+    assert set(graph._entity_ids) == {_id for name, _id in ids.items() if name != "studies"}
+    package, number = graph._model, 0  # export of the Packages is recursive, so only the skeleton is checked
+    while package._contents:
+        package, number = package._contents[-1], number + 1
+    assert number == depth
+
+
+def read(data: bytes) -> JSONGraph:
+    return JSONGraph.from_stream(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_stream_is_the_same_as_dict(seed):
+    generator = random.Random(seed)
+    model = nest_randomly(add_diagrams(build_random_model(seed, bool(seed % 2)), 2), generator)
+    expected = JSONGraph(copy.deepcopy(model)).to_json()
+    keys = list(model)
+    generator.shuffle(keys)  # diagrams and other keys before the model
+    data = json.dumps({key: model[key] for key in keys}, indent=generator.choice([None, 2])).encode()
+    graph = read(data)
+    assert graph.to_json() == expected
+    assert list(graph.to_json()) == list(expected)  # the same order of keys as in JSONGraph(dict)
+
+
+def test_stream_of_deep_packages():
+    limit = sys.getrecursionlimit()
+    model = nest_packages(build_sample_model()[0], limit + 100)
+    sys.setrecursionlimit(4 * limit)  # the encoder is recursive, but not the reader
+    try:
+        data = json.dumps(model).encode()
+    finally:
+        sys.setrecursionlimit(limit)
+    graph, expected = read(data), JSONGraph(model)
+    assert graph._entity_ids.keys() == expected._entity_ids.keys()
+    assert graph._relation_ids.keys() == expected._relation_ids.keys()
+
+
+@pytest.mark.parametrize("data, message", [
+    (b'[]', "Project should be a json object"),
+    (b'{"id": "p", "diagrams": []}', "Project does not contain the model"),
+    (b'{"model": []}', "Model should be a json object"),
+    (b'{"model": {"id": "m", "contents": 5}}', "Contents of the Package should be a list"),
+    ({"diagrams": {}}, "Diagrams should be a list"),
+    ({"diagrams": [{}], "model": 5}, "Model should be a json object"),
+])
+def test_stream_of_malformed_project(data, message):
+    if isinstance(data, dict):  # changes of the sample model
+        data = json.dumps({**build_sample_model()[0], **data}).encode()
+    with pytest.raises(ValueError, match=message):
+        read(data)
+
+
+def test_stream_is_truncated():
+    data = json.dumps(build_sample_model()[0]).encode()
+    for size in [0, 1, 100, len(data) // 2, len(data) - 1]:
+        with pytest.raises(ijson.JSONError):
+            read(data[:size])
@@ -0,0 +1,135 @@
+import copy
+
+import pytest
+
+from expose.project import GENERAL_TYPE, PART_OF_TYPE, RelationStereotype
+from expose.project.jsongraph import JSONGraph
+from tests.builder import ModelBuilder, build_random_model
+
+OPTIONS = [(False, True), (True, False)]  # (long_names, mult_relations)
+
+
+def get_names(graph: JSONGraph) -> list:
+    return sorted(entity["name"] for entity in graph.to_json()["model"]["contents"] if entity["type"] == "Class")
+
+
+def get_missing_ends(graph: JSONGraph) -> list:
+    """
+    Returns ids of relation and generalization ends that are not Classes of the exported model
+    """
+    contents = graph.to_json()["model"]["contents"]
+    ids = {element["id"] for element in contents if element["type"] == "Class"}
+    ends = [end["propertyType"]["id"] for element in contents if element["type"] == "Relation"
+            for end in element["properties"]]
+    ends += [element[end]["id"] for element in contents if element["type"] == "Generalization"
+             for end in ("general", "specific")]
+    return [_id for _id in ends if _id not in ids]
+
+
+@pytest.mark.parametrize("long_names, mult_relations", OPTIONS)
+def test_general_entity_deleted_while_part_is_folded(long_names, mult_relations):
+    """
+    Acyclic chain Member -> Group -> Whole, where Group is also a Member: folding of Group
+    abstracts Member together with the generalization, so Group keeps its relations and is abstracted to Whole
+    """
+    builder = ModelBuilder()
+    member = builder.add_class("Member", "subkind")
+    whole = builder.add_class("Whole")
+    group = builder.add_class("Group", "collective")
+    builder.add_generalization(group, member)
+    builder.add_part(whole, group, "subCollectionOf")
+    builder.add_part(group, member, "subCollectionOf")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_parthoods(long_names, mult_relations)
+    assert get_names(graph) == ["Whole"]
+    assert not graph.to_json()["model"]["contents"][0]["properties"]
+    assert graph.get_rule() == "P1"
+
+
+@pytest.mark.parametrize("long_names, mult_relations", OPTIONS)
+def test_whole_is_general_entity_of_its_part(long_names, mult_relations):
+    """
+    Whole is abstracted to Part before the generalization, which is then removed, Part keeps the relations
+    """
+    builder = ModelBuilder()
+    whole = builder.add_class("Whole", "phase")
+    part = builder.add_class("Part", "mixin")
+    builder.add_generalization(part, whole)
+    builder.add_part(part, whole, "subCollectionOf")
+    builder.add_relation(whole, part, "characterization")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_parthoods(long_names, mult_relations)
+    assert get_names(graph) == ["Part"]
+    assert [(relation.from_entity.name, relation.to_entity.name, relation.stereotype)
+            for relation in graph._relation_ids.values()] == [("Part", "Part", "characterization")]
+    assert set(graph.get_rule().split(", ")) == {"P1", "P2"}
+
+
+def test_parthood_chain():
+    builder = ModelBuilder()
+    entities = [builder.add_class(f"Part{i}") for i in range(5)]
+    for whole, part in zip(entities, entities[1:]):
+        builder.add_part(whole, part)
+    model = builder.build()
+
+    graph = JSONGraph(copy.deepcopy(model))
+    graph.abstract_parthoods(False, True)
+    assert get_names(graph) == ["Part0"]
+    attributes = graph.to_json()["model"]["contents"][0]["properties"]
+    assert [attribute["name"] for attribute in attributes] == ["Part1"]
+
+
+@pytest.mark.parametrize("long_names, mult_relations", OPTIONS)
+def test_cycle_of_parts(long_names, mult_relations):
+    """
+    The relation that closes the cycle (Car is a part of Piston) is removed by P1,
+    then the chain is abstracted from Piston to Engine, the root of the search
+    """
+    builder = ModelBuilder()
+    car = builder.add_class("Car")
+    engine = builder.add_class("Engine")
+    piston = builder.add_class("Piston")
+    oil = builder.add_class("Oil", "quantity")
+    builder.add_part(car, engine)
+    builder.add_part(engine, piston)
+    builder.add_part(piston, car)
+    builder.add_relation(piston, oil, "material", "uses")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_parthoods(long_names, mult_relations)
+    assert get_names(graph) == ["Engine", "Oil"]
+    engine_json = next(entity for entity in graph.to_json()["model"]["contents"] if entity["name"] == "Engine")
+    assert [attribute["name"] for attribute in engine_json["properties"]] == ["Piston"]
+    assert [(relation.from_entity.name, relation.to_entity.name, relation.name)
+            for relation in graph._relation_ids.values()] == \
+           [("Engine", "Oil", "Engine's Piston uses" if long_names else "uses")]
+    assert graph.get_rule() == "P1, P2"
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("long_names, mult_relations", OPTIONS)
+def test_random_models(cyclic, long_names, mult_relations):
+    """
+    Abstraction of parts and hierarchies, also step by step, keeps ends of all relations,
+    all parthood relations except memberOf are abstracted
+    """
+    for seed in range(150):
+        model = build_random_model(seed, cyclic)
+        graph = JSONGraph(copy.deepcopy(model))
+        graph.abstract_parthoods(long_names, mult_relations)
+        assert not get_missing_ends(graph), seed
+        assert all(relation.stereotype == RelationStereotype.MEMBER_OF.value
+                   for relation in graph._relation_ids.values() if relation.type == PART_OF_TYPE), seed
+
+        graph = JSONGraph(copy.deepcopy(model))
+        graph.abstract_hierarchies(long_names, mult_relations)
+        assert not get_missing_ends(graph), seed
+        assert not graph._relations[GENERAL_TYPE], seed
+
+        graph = JSONGraph(copy.deepcopy(model))
+        with pytest.raises(StopIteration):
+            for _ in range(100):
+                graph.next_abstraction(long_names, mult_relations, False)
+        assert not get_missing_ends(graph), seed
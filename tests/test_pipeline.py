@@ -0,0 +1,59 @@
+import copy
+
+import pytest
+
+from expose import ERR_UNKNOWN_OPERATION
+from expose.models import AbstractModel, DeleteModel, FocusModel, PipelineModel
+from expose.operations import apply_abstract, apply_delete, apply_focus, apply_pipeline, parse_pipeline
+from expose.project import GENERAL_TYPE
+from expose.project.ids import DeterministicIdProvider, use_id_provider
+from expose.project.jsongraph import JSONGraph
+from tests.builder import build_sample_model
+
+
+def create_pipeline(*operations: dict) -> PipelineModel:
+    return PipelineModel(in_format="json", out_format="expo", height=600, width=800, operations=list(operations))
+
+
+def test_parameters_are_merged_with_common_ones():
+    steps = parse_pipeline(create_pipeline(
+        {"operation": "focus", "parameters": {"node": "n", "hop": 2, "out_format": "json"}},
+        {"operation": "abstract", "parameters": {"abs_type": ["parthood"]}}))
+    assert [name for name, _ in steps] == ["focus", "abstract"]
+    focus, abstract = steps[0][1], steps[1][1]
+    assert isinstance(focus, FocusModel) and isinstance(abstract, AbstractModel)
+    assert (focus.node, focus.hop, focus.nodes) == ("n", 2, [])
+    for step in (focus, abstract):  # formats and size of the canvas are taken from the pipeline
+        assert (step.in_format, step.out_format, step.height, step.width) == ("json", "expo", 600, 800)
+    assert abstract.abs_type == ["parthood"]
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError, match=ERR_UNKNOWN_OPERATION + "expand"):
+        parse_pipeline(create_pipeline({"operation": "expand", "parameters": {"node": "n"}}))
+
+
+def test_parameters_are_validated_before_execution():
+    with pytest.raises(ValueError, match="hop"):  # ValidationError of pydantic
+        parse_pipeline(create_pipeline({"operation": "delete", "parameters": {"element_id": "n"}},
+                                       {"operation": "focus", "parameters": {"node": "n"}}))
+
+
+def test_pipeline_is_the_same_as_operations_one_by_one():
+    model, ids = build_sample_model()
+    operations = [
+        (apply_delete, {"operation": "delete", "parameters": {"element_id": ids["team"]}}),
+        (apply_focus, {"operation": "focus", "parameters": {"node": ids["person"], "hop": 2}}),
+        (apply_abstract, {"operation": "abstract", "parameters": {"abs_type": ["parthood", "hierarchy"]}}),
+    ]
+    with use_id_provider(DeterministicIdProvider("source", "pipeline")):
+        graph = JSONGraph(copy.deepcopy(model))
+        apply_pipeline(graph, create_pipeline(*[operation for _, operation in operations]))
+    with use_id_provider(DeterministicIdProvider("source", "pipeline")):
+        expected = JSONGraph(copy.deepcopy(model))
+        for apply, operation in operations:
+            data_model = {"delete": DeleteModel, "focus": FocusModel, "abstract": AbstractModel}[operation["operation"]]
+            apply(expected, data_model(in_format="json", out_format="expo", **operation["parameters"]))
+    assert graph.to_json() == expected.to_json()
+    assert ids["team"] not in graph._entity_ids
+    assert not graph._relations[GENERAL_TYPE]
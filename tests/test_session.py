@@ -0,0 +1,132 @@
+import pytest
+
+from expose import session as session_module
+from expose.models import DeleteModel
+from expose.operations import apply_delete, run_session_operation
+from expose.project.jsongraph import JSONGraph
+from expose.session import SessionStorage
+from expose.timeline import Timeline
+from tests.builder import ModelBuilder
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(session_module, "time", clock)
+    return clock
+
+
+def create_graph(number_of_classes: int = 2) -> JSONGraph:
+    builder = ModelBuilder()
+    for i in range(number_of_classes):
+        builder.add_class(f"Class{i}")
+    return JSONGraph(builder.build())
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    size = create_graph().get_number_of_elements() * session_module.SESSION_ELEMENT_SIZE
+    storage = SessionStorage(memory_limit=2 * size, ttl=60)
+    first = storage.add(create_graph())
+    second = storage.add(create_graph())
+    assert storage.memory == 2 * size
+
+    assert storage.get(first)  # now the second one is least recently used
+    third = storage.add(create_graph())
+    assert storage.get(second) is None
+    assert storage.get(first) and storage.get(third)
+    assert storage.memory == 2 * size
+
+
+def test_most_recent_session_is_kept_over_budget(clock):
+    storage = SessionStorage(memory_limit=1, ttl=60)
+    first = storage.add(create_graph())
+    second = storage.add(create_graph())
+    assert len(storage) == 1
+    assert storage.get(first) is None
+    assert storage.get(second)
+
+
+def test_idle_session_is_expired(clock):
+    storage = SessionStorage(memory_limit=10 ** 9, ttl=60)
+    first = storage.add(create_graph())
+    clock.now += 40
+    second = storage.add(create_graph())
+    clock.now += 30  # first is idle for 70 seconds, second for 30
+    assert storage.get(first) is None
+    assert storage.get(second)
+    clock.now += 59
+    assert storage.get(second)  # access prolongs the session
+    clock.now += 61
+    assert storage.get(second) is None
+    assert len(storage) == 0
+    assert storage.memory == 0
+
+
+def test_memory_is_updated_after_changes(clock):
+    storage = SessionStorage(memory_limit=10 ** 9, ttl=60)
+    graph = create_graph(3)
+    session_id = storage.add(graph)
+    memory = storage.memory
+
+    graph.delete_entity(next(iter(graph._entity_ids)))
+    storage.update(session_id)
+    assert storage.memory < memory
+
+    storage.set_timeline(session_id, Timeline(graph.to_json()))
+    assert storage.memory == storage.get_session(session_id).size
+    assert storage.memory == 2 * graph.get_number_of_elements() * session_module.SESSION_ELEMENT_SIZE
+
+    assert storage.delete(session_id)
+    assert not storage.delete(session_id)
+    assert storage.memory == 0
+
+
+def test_grown_session_evicts_others(clock):
+    size = create_graph().get_number_of_elements() * session_module.SESSION_ELEMENT_SIZE
+    storage = SessionStorage(memory_limit=5 * size // 2, ttl=60)
+    first = storage.add(create_graph())
+    graph = create_graph()
+    second = storage.add(graph)
+    assert len(storage) == 2
+
+    storage.set_timeline(second, Timeline(graph.to_json()))  # doubles the size of the second session
+    assert storage.get(first) is None
+    assert storage.get(second)
+    assert storage.memory == 2 * size
+
+
+def test_failed_operation_invalidates_session(clock):
+    storage = SessionStorage(memory_limit=10 ** 9, ttl=60)
+    graph = create_graph(3)
+    session_id = storage.add(graph)
+    entity_id = next(iter(graph._entity_ids))
+
+    def delete_and_fail(_graph: JSONGraph, data: DeleteModel):
+        apply_delete(_graph, data)
+        raise ValueError("failed")
+
+    data = DeleteModel(session_id=session_id, in_format="json", out_format="json", element_id=entity_id)
+    with pytest.raises(ValueError):
+        run_session_operation(delete_and_fail, storage.get_session(session_id), data)
+    assert storage.get_session(session_id) is None  # the graph is partially changed
+    assert len(storage) == 0
+    assert storage.memory == 0
+
+
+def test_successful_operation_keeps_session(clock):
+    storage = SessionStorage(memory_limit=10 ** 9, ttl=60)
+    graph = create_graph(3)
+    session_id = storage.add(graph)
+    entity_id = next(iter(graph._entity_ids))
+    data = DeleteModel(session_id=session_id, in_format="json", out_format="json", element_id=entity_id)
+    result = run_session_operation(apply_delete, storage.get_session(session_id), data)
+    assert entity_id not in [element["id"] for element in result["model"]["contents"]]
+    assert storage.get(session_id) is graph
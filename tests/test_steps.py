@@ -0,0 +1,71 @@
+import sys
+
+from expose.project.jsongraph import JSONGraph
+from tests.builder import ModelBuilder
+
+
+def test_steps_are_run_in_the_order_of_recursive_calls():
+    log = []
+
+    def steps(name: str, depth: int):
+        log.append(f"start {name}")
+        if depth:
+            for child in ("a", "b"):
+                yield steps(name + child, depth - 1)
+                log.append(f"back in {name}")
+        log.append(f"end {name}")
+
+    def call(name: str, depth: int):
+        expected.append(f"start {name}")
+        if depth:
+            for child in ("a", "b"):
+                call(name + child, depth - 1)
+                expected.append(f"back in {name}")
+        expected.append(f"end {name}")
+
+    expected = []
+    call("x", 3)
+    JSONGraph._run(steps("x", 3))
+    assert log == expected
+
+
+def test_fold_of_chain_deeper_than_recursion_limit():
+    builder = ModelBuilder()
+    car = whole = builder.add_class("Car")
+    for number in range(sys.getrecursionlimit() + 500):
+        part = builder.add_class(f"Part{number}")
+        builder.add_part(whole, part)
+        whole = part
+
+    graph = JSONGraph(builder.build())
+    graph.fold(car, False, True)
+    assert [entity.name for entity in graph._entity_ids.values()] == ["Car"]
+    assert not graph._relation_ids
+
+
+def test_abstraction_of_aspects_deeper_than_recursion_limit():
+    builder = ModelBuilder()
+    bearer = builder.add_class("Person")
+    for number in range(sys.getrecursionlimit() + 500):
+        mode = builder.add_class(f"Mode{number}", "mode", "intrinsic-mode")
+        builder.add_relation(mode, bearer, "characterization", None, "0..*", "1")
+        bearer = mode
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_aspects(False, True, True)
+    assert [entity.name for entity in graph._entity_ids.values()] == ["Person"]
+    assert not graph._relation_ids
+
+
+def test_abstraction_of_aspects_depending_on_each_other():
+    builder = ModelBuilder()
+    person = builder.add_class("Person")
+    skill = builder.add_class("Skill", "mode", "intrinsic-mode")
+    level = builder.add_class("Level", "quality", "intrinsic-mode")
+    builder.add_relation(skill, person, "characterization")
+    builder.add_relation(level, skill, "characterization")
+    builder.add_relation(skill, level, "externalDependence")
+
+    graph = JSONGraph(builder.build())
+    graph.abstract_aspects(False, True, True)
+    assert [entity.name for entity in graph._entity_ids.values()] == ["Person"]
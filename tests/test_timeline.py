@@ -0,0 +1,100 @@
+import copy
+
+import pytest
+
+from expose.models import TimelineModel
+from expose.operations import build_timeline
+from expose.project.jsongraph import JSONGraph
+from expose.timeline import Timeline
+from tests.builder import build_sample_model
+
+
+def get_states() -> (list, list):
+    """
+    Applies abstractions step by step in the same way as build_timeline
+    :return: models after each step, starting with the original one; applied rules
+    """
+    graph = JSONGraph(build_sample_model()[0])
+    states, rules = [copy.deepcopy(graph.to_json())], [""]
+    while True:
+        try:
+            graph.next_abstraction(False, True, False)
+        except StopIteration:
+            break
+        states.append(copy.deepcopy(graph.to_json()))
+        rules.append(graph.get_rule())
+        graph = JSONGraph(graph.to_json())
+    return states, rules
+
+
+@pytest.mark.parametrize("checkpoint", [1, 3, 100])
+def test_replay_forwards_and_backwards(checkpoint):
+    states, rules = get_states()
+    assert len(states) > 3
+    timeline = Timeline(states[0], checkpoint)
+    for state, rule in zip(states[1:], rules[1:]):
+        timeline.add(rule, copy.deepcopy(state))
+    assert len(timeline) == len(states)
+    assert timeline.rules == rules
+
+    for step in range(len(states)):
+        assert timeline.get_state(step) == states[step]
+    for step in reversed(range(len(states))):
+        assert timeline.get_state(step) == states[step]
+        assert timeline.get_rule(step) == rules[step]
+
+
+def get_state() -> dict:
+    """
+    Returns sample model in the exported format, where elements are grouped by their types
+    """
+    return JSONGraph(build_sample_model()[0]).to_json()
+
+
+def test_states_are_copies():
+    state = get_state()
+    timeline = Timeline(state, 2)
+    changed = copy.deepcopy(state)
+    changed["model"]["contents"][0]["name"] = "Changed"
+    timeline.add("H1", changed)
+
+    changed["model"]["contents"][0]["name"] = "Changed again"  # given states could be changed afterwards
+    restored = timeline.get_state(1)
+    assert restored["model"]["contents"][0]["name"] == "Changed"
+    restored["model"]["contents"].clear()  # restored states could be changed as well
+    assert timeline.get_state(1)["model"]["contents"][0]["name"] == "Changed"
+    assert timeline.get_state(0) == state
+
+
+def test_deleted_and_reordered_elements():
+    state = get_state()
+    timeline = Timeline(state, 3)
+    states = [state]
+    for step in range(5):
+        state = copy.deepcopy(state)
+        contents = state["model"]["contents"]
+        if step % 2:
+            contents.pop(0)
+            state["diagrams"][0]["contents"].pop()
+        else:
+            contents.insert(0, contents.pop(1))  # reorders classes
+        state["name"] = f"Step {step}"
+        timeline.add("", state)
+        states.append(state)
+
+    for step in reversed(range(len(states))):
+        assert timeline.get_state(step) == states[step]
+
+
+def test_build_timeline():
+    graph = JSONGraph(build_sample_model()[0])
+    origin = copy.deepcopy(graph.to_json())
+    data = TimelineModel(in_format="json", out_format="json", mult_relations=True, long_names=False,
+                         keep_relators=False)
+    timeline = build_timeline(graph, data)
+    assert len(timeline) > 3
+    assert timeline.get_state(0) == origin
+    assert "" not in timeline.rules[1:]
+    last = timeline.get_state(len(timeline) - 1)
+    with pytest.raises(StopIteration):  # nothing else could be abstracted
+        JSONGraph(last).next_abstraction(False, True, False)
@@ -0,0 +1,54 @@
+import pytest
+
+from expose.project import ASPECTS, GENERAL_TYPE, PART_OF_TYPE, RelationStereotype
+from expose.project.jsongraph import JSONGraph
+from expose.project.worklist import Worklist
+from tests.builder import build_random_model
+
+KINDS = [PART_OF_TYPE, GENERAL_TYPE] + ASPECTS
+
+
+def scan(graph: JSONGraph, kind: str) -> str | None:
+    """
+    Finds the candidate of next_abstraction by the full scan, as it was done before the worklist
+    """
+    if kind == PART_OF_TYPE:
+        return next((relation.id for relation in graph._relations[PART_OF_TYPE]
+                     if relation.stereotype != RelationStereotype.MEMBER_OF.value), None)
+    if kind == GENERAL_TYPE:
+        return graph._relations[GENERAL_TYPE].nth(0).id if graph._relations[GENERAL_TYPE] else None
+    return graph._entities[kind].nth(0).id if graph._entities.get(kind) else None
+
+
+def test_worklist():
+    worklist = Worklist(["a", "b"])
+    for _id in ["x", "y", "z"]:
+        worklist.add("a", _id)
+    worklist.add("c", "x")  # not tracked
+    worklist.add("a", "x")  # already there
+    assert (worklist.first("a"), worklist.first("b")) == ("x", None)
+    worklist.discard("a", "x")
+    worklist.discard("a", "unknown")
+    assert worklist.first("a") == "y"
+    worklist.add("a", "x")  # added again, goes to the end
+    worklist.discard("a", "y")
+    assert worklist.first("a") == "z"
+    worklist.discard("a", "z")
+    assert worklist.first("a") == "x"
+    worklist.clear()
+    assert worklist.first("a") is None
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+def test_candidates_are_the_same_as_by_scan(cyclic):
+    for seed in range(100):
+        graph = JSONGraph(build_random_model(seed, cyclic))
+        for step in range(100):
+            for kind in KINDS:
+                assert graph._worklist.first(kind) == scan(graph, kind), (seed, step, kind)
+            try:
+                graph.next_abstraction(False, True, False)
+            except StopIteration:
+                break
+            if step % 2:  # as in the timeline, where the graph is built again after each step
+                graph = JSONGraph(graph.to_json())